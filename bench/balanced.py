@@ -0,0 +1,48 @@
+"""
+Nodes emitted per second by the balanced layout for a single large file,
+written `batch` chunks at a time, with persistent and mutable state.
+
+    python -m bench.balanced [leaves] [width] [batch]
+"""
+
+import sys
+from time import perf_counter
+from typing import Any
+from ipld_unixfs.file.chunker.buffer import BufferView
+from ipld_unixfs.file.layout.api import LayoutEngine
+from ipld_unixfs.file.layout.balanced import BalancedLayout, MutableBalancedLayout
+
+
+def run(engine: LayoutEngine[Any], leaves: int, batch: int) -> tuple[int, int]:
+    chunks = [BufferView.create([b"\0"])] * batch
+    branches = 0
+    layout = engine.open()
+    offset = 0
+    while offset < leaves:
+        size = min(batch, leaves - offset)
+        result = engine.write(layout, chunks[0:size])
+        layout = result.layout
+        branches += len(result.nodes)
+        offset += size
+    closed = engine.close(layout)
+    branches += len(closed.nodes) + 1
+    return leaves + branches, branches
+
+
+def main(leaves: int = 1 << 22, width: int = 174, batch: int = 1) -> None:
+    print(f"{leaves} leaves, width {width}, {batch} chunks per write")
+    for name, engine in [
+        ("balanced", BalancedLayout(width)),
+        ("mutable", MutableBalancedLayout(width)),
+    ]:
+        start = perf_counter()
+        nodes, branches = run(engine, leaves, batch)
+        elapsed = perf_counter() - start
+        print(
+            f"{name:<10} {nodes / elapsed:>12.0f} nodes/s "
+            f"{branches:>10} branches {elapsed:>8.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
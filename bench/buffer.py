@@ -0,0 +1,48 @@
+"""
+Micro-benchmark for `BufferView.copy_to` and `BufferView.tobytes`, measured
+against a plain `memoryview` slice assignment of the same size which is as
+close to `memcpy` as we can get from Python.
+
+    python -m bench.buffer [total_mib] [segment_kib]
+"""
+
+import sys
+from time import perf_counter
+from typing import Callable
+from ipld_unixfs.file.chunker.buffer import BufferView
+
+
+def measure(label: str, size: int, rounds: int, fn: Callable[[], object]) -> None:
+    fn()
+    start = perf_counter()
+    for _ in range(rounds):
+        fn()
+    elapsed = perf_counter() - start
+    mib = size * rounds / (1024 * 1024)
+    print(f"{label:<24} {mib / elapsed:>10.1f} MiB/s")
+
+
+def main(total_mib: int = 64, segment_kib: int = 4) -> None:
+    size = total_mib * 1024 * 1024
+    segment_size = segment_kib * 1024
+    source = memoryview(bytearray(size))
+    segments = [
+        source[offset : offset + segment_size]
+        for offset in range(0, size, segment_size)
+    ]
+    buffer = BufferView.create(segments)
+    target = memoryview(bytearray(size))
+    rounds = 10
+
+    print(f"{total_mib} MiB in {len(segments)} segments of {segment_kib} KiB")
+
+    def memcpy() -> None:
+        target[0:size] = source
+
+    measure("memoryview (baseline)", size, rounds, memcpy)
+    measure("BufferView.copy_to", size, rounds, lambda: buffer.copy_to(target))
+    measure("BufferView.tobytes", size, rounds, buffer.tobytes)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,59 @@
+"""
+Throughput of importing a synthetic file with raw leaves straight into a CAR
+file, when sections are joined and written one by one into a buffered file
+versus handed to `os.writev` in batches without joining.
+
+    python -m bench.car [path] [total_mib]
+"""
+
+import io
+import os
+import sys
+from time import perf_counter
+from ipld_unixfs import car as CarWriter
+from ipld_unixfs.file import writer as FileWriter
+from ipld_unixfs.multiformats.block import Block
+from bench.writer import generate
+
+
+class JoinedWriter:
+    file: io.BufferedWriter
+
+    def __init__(self, file: io.BufferedWriter) -> None:
+        self.file = file
+        self.file.write(CarWriter.encode_header([CarWriter.PLACEHOLDER_ROOT]))
+
+    def write(self, block: Block, /) -> None:
+        data = block.bytes
+        content = data.tobytes() if isinstance(data, CarWriter.BufferView) else data
+        self.file.write(
+            CarWriter.section_prefix(block.cid, block.byte_length) + bytes(content)
+        )
+
+
+def main(path: str = "/tmp/ipld-unixfs-bench.car", total_mib: int = 1024) -> None:
+    total = total_mib * 1024 * 1024
+    config = FileWriter.configure(file_chunk_encoder=FileWriter.UnixFSRawLeaf)
+    print(f"{total_mib} MiB with raw leaves into {path}")
+
+    for name in ["joined", "writev"]:
+        with open(path, "wb") as fd:
+            start = perf_counter()
+            car = (
+                JoinedWriter(fd) if name == "joined" else CarWriter.create(fd.fileno())
+            )
+            file = FileWriter.create(car, config)
+            for data in generate(total, 1024 * 1024):
+                file.write(data)
+            link = file.close()
+            if isinstance(car, CarWriter.CarWriter):
+                car.close([link.cid])
+            fd.flush()
+            elapsed = perf_counter() - start
+        size = os.path.getsize(path)
+        print(f"{name:<8} {total_mib / elapsed:>8.1f} MiB/s {size:>12} bytes")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2], *(int(arg) for arg in sys.argv[2:]))
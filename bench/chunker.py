@@ -0,0 +1,56 @@
+"""
+Throughput of the streaming chunker driver over a generated stream. Reports
+the highest number of bytes held by the chunker between reads, which should
+stay under a chunk plus a read.
+
+    python -m bench.chunker [total_mib] [read_kib] [chunk_kib]
+"""
+
+import sys
+from time import perf_counter
+from typing import Iterator
+import ipld_unixfs.file.chunker as Chunker
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+
+
+def generate(total: int, read_size: int) -> Iterator[memoryview]:
+    block = bytes(range(256)) * (read_size // 256 + 1)
+    offset = 0
+    while offset < total:
+        size = min(read_size, total - offset)
+        # Copy so that every read is a fresh allocation like it would be when
+        # reading from a file or a socket.
+        yield memoryview(bytearray(block[0:size]))
+        offset += size
+
+
+def main(total_mib: int = 1024, read_kib: int = 64, chunk_kib: int = 256) -> None:
+    total = total_mib * 1024 * 1024
+    read_size = read_kib * 1024
+    chunker = FixedSizeChunker(chunk_kib * 1024)
+
+    state = Chunker.open(chunker)
+    peak = 0
+    byte_length = 0
+    count = 0
+    start = perf_counter()
+    for buf in generate(total, read_size):
+        state = Chunker.write(state, buf)
+        peak = max(peak, state.buffer.byte_length + len(buf))
+        for chunk in state.chunks:
+            byte_length += chunk.byte_length
+            count += 1
+    for chunk in Chunker.close(state).chunks:
+        byte_length += chunk.byte_length
+        count += 1
+    elapsed = perf_counter() - start
+
+    assert byte_length == total
+    print(f"{total_mib} MiB in {read_kib} KiB reads, {chunk_kib} KiB chunks")
+    print(f"chunks              {count:>10}")
+    print(f"throughput          {total_mib / elapsed:>10.1f} MiB/s")
+    print(f"peak buffered       {peak / 1024:>10.1f} KiB")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
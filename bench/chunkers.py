@@ -0,0 +1,53 @@
+"""
+Throughput of the chunkers over a random stream, driven through
+`ipld_unixfs.file.chunker.stream` the same way an importer would.
+
+    python -m bench.chunkers [total_mib] [read_kib]
+"""
+
+import random
+import sys
+from time import perf_counter
+from typing import Any, Iterator
+import ipld_unixfs.file.chunker as Chunker
+from ipld_unixfs.file.chunker.buzhash import BuzhashChunker
+from ipld_unixfs.file.chunker.fastcdc import FastCDCChunker
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.file.chunker.rabin import RabinChunker
+
+
+def generate(total: int, read_size: int) -> Iterator[memoryview]:
+    block = random.Random(0).randbytes(8 * 1024 * 1024)
+    offset = 0
+    while offset < total:
+        start = offset % len(block)
+        size = min(read_size, total - offset, len(block) - start)
+        yield memoryview(block)[start : start + size]
+        offset += size
+
+
+def measure(label: str, chunker: Any, total: int, read_size: int) -> None:
+    count = 0
+    start = perf_counter()
+    for _ in Chunker.stream(chunker, generate(total, read_size)):
+        count += 1
+    elapsed = perf_counter() - start
+    mib = total / (1024 * 1024)
+    print(f"{label:<24} {mib / elapsed:>10.1f} MiB/s {count:>8} chunks")
+
+
+def main(total_mib: int = 64, read_kib: int = 64) -> None:
+    total = total_mib * 1024 * 1024
+    read_size = read_kib * 1024
+    print(f"{total_mib} MiB in {read_kib} KiB reads")
+    measure("fixed", FixedSizeChunker(), total, read_size)
+    measure("fastcdc (numpy)", FastCDCChunker(vectorize=True), total, read_size)
+    measure("fastcdc (python)", FastCDCChunker(vectorize=False), total, read_size)
+    measure("rabin (numpy)", RabinChunker(vectorize=True), total, read_size)
+    measure("rabin (python)", RabinChunker(vectorize=False), total, read_size)
+    measure("buzhash (numpy)", BuzhashChunker(vectorize=True), total, read_size)
+    measure("buzhash (python)", BuzhashChunker(vectorize=False), total, read_size)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
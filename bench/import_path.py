@@ -0,0 +1,66 @@
+"""
+Import of a file from the local disk by reading it in a loop versus memory
+mapping it. File is created with the synthetic contents on the first run and
+is read once before measuring, so both paths read from the page cache.
+
+    python -m bench.import_path [path] [size_mib] [read_kib]
+"""
+
+import os
+import sys
+from time import perf_counter
+from typing import Callable
+from ipld_unixfs.file import writer as FileWriter
+from ipld_unixfs.unixfs import FileLink
+from bench.writer import Counter, generate
+
+
+def read_loop(path: str, config: FileWriter.Config, read_size: int) -> FileLink:
+    counter = Counter()
+    file = FileWriter.create(counter, config)
+    with open(path, "rb", buffering=0) as fd:
+        while True:
+            data = fd.read(read_size)
+            if not data:
+                break
+            file.write(data)
+    return file.close()
+
+
+def mapped(path: str, config: FileWriter.Config, read_size: int) -> FileLink:
+    return FileWriter.import_path(path, Counter(), config)
+
+
+def main(
+    path: str = "/tmp/ipld-unixfs-bench", size_mib: int = 2048, read_kib: int = 1024
+) -> None:
+    size = size_mib * 1024 * 1024
+    if not os.path.exists(path) or os.path.getsize(path) != size:
+        with open(path, "wb") as fd:
+            for data in generate(size, 1024 * 1024):
+                fd.write(data)
+    with open(path, "rb") as fd:
+        while fd.read(1024 * 1024):
+            pass
+
+    print(f"{size_mib} MiB file, {read_kib} KiB reads")
+    runs: list[tuple[str, Callable[[str, FileWriter.Config, int], FileLink]]] = [
+        ("read", read_loop),
+        ("mmap", mapped),
+    ]
+    for leaf_name, leaf in [
+        ("unixfs", FileWriter.UnixFSLeaf),
+        ("raw", FileWriter.UnixFSRawLeaf),
+    ]:
+        config = FileWriter.configure(file_chunk_encoder=leaf)
+        links = []
+        for name, run in runs:
+            start = perf_counter()
+            links.append(run(path, config, read_kib * 1024))
+            elapsed = perf_counter() - start
+            print(f"{leaf_name:<8} {name:<6} {size_mib / elapsed:>8.1f} MiB/s")
+        assert links[0] == links[1]
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2], *(int(arg) for arg in sys.argv[2:]))
@@ -0,0 +1,55 @@
+"""
+Compares flat, balanced and mutable balanced layouts on a small file heavy
+workload: files of 1 to `max_chunks` chunks, each chunk written to the layout
+as it is produced.
+Files that outgrow the width exercise the balanced fallback of the flat layout.
+
+    python -m bench.layout [files] [max_chunks] [width]
+"""
+
+import sys
+from random import Random
+from time import perf_counter
+from typing import Any, Sequence
+from ipld_unixfs.file.chunker.buffer import BufferView
+from ipld_unixfs.file.layout.api import LayoutEngine
+from ipld_unixfs.file.layout.balanced import BalancedLayout, MutableBalancedLayout
+from ipld_unixfs.file.layout.flat import FlatLayout
+
+
+def run(engine: LayoutEngine[Any], files: Sequence[int], chunk: BufferView) -> int:
+    nodes = 0
+    for count in files:
+        layout = engine.open()
+        for _ in range(count):
+            result = engine.write(layout, [chunk])
+            layout = result.layout
+            nodes += len(result.nodes) + len(result.leaves)
+        closed = engine.close(layout)
+        nodes += len(closed.nodes) + len(closed.leaves) + 1
+    return nodes
+
+
+def main(files: int = 20000, max_chunks: int = 174, width: int = 174) -> None:
+    random = Random(0)
+    counts = [random.randint(1, max_chunks) for _ in range(files)]
+    chunk = BufferView.create([b"\0"])
+    total = sum(counts)
+
+    print(f"{files} files, {total} chunks, width {width}")
+    for name, engine in [
+        ("balanced", BalancedLayout(width)),
+        ("mutable", MutableBalancedLayout(width)),
+        ("flat", FlatLayout(width)),
+    ]:
+        start = perf_counter()
+        nodes = run(engine, counts, chunk)
+        elapsed = perf_counter() - start
+        print(
+            f"{name:<10} {files / elapsed:>10.0f} files/s "
+            f"{total / elapsed:>12.0f} chunks/s {nodes:>10} nodes"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,57 @@
+"""
+Scaling of the parallel file writer, which hashes and encodes leaves on a
+thread pool, over the number of workers. Serial writer is the baseline and
+root of every run is checked against it.
+
+    python -m bench.parallel [total_mib] [chunk_kib] [workers...]
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Optional
+from ipld_unixfs.file import writer as FileWriter
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.unixfs import FileLink
+from bench.writer import Counter, generate
+
+
+def run(
+    total: int, config: FileWriter.Config, workers: Optional[int]
+) -> tuple[FileLink, float]:
+    counter = Counter()
+    executor = None if workers is None else ThreadPoolExecutor(workers)
+    start = perf_counter()
+    file = FileWriter.create(counter, config, executor=executor)
+    for data in generate(total, 1024 * 1024):
+        file.write(data)
+    link = file.close()
+    elapsed = perf_counter() - start
+    if executor is not None:
+        executor.shutdown()
+    return link, elapsed
+
+
+def main(total_mib: int = 512, chunk_kib: int = 256, *workers: int) -> None:
+    total = total_mib * 1024 * 1024
+    print(f"{total_mib} MiB in {chunk_kib} KiB chunks")
+    for name, leaf in [
+        ("unixfs", FileWriter.UnixFSLeaf),
+        ("raw", FileWriter.UnixFSRawLeaf),
+    ]:
+        config = FileWriter.configure(
+            chunker=FixedSizeChunker(chunk_kib * 1024), file_chunk_encoder=leaf
+        )
+        expect, baseline = run(total, config, None)
+        print(f"{name:<8} {'serial':>9} {total_mib / baseline:>8.1f} MiB/s")
+        for count in workers or (1, 2, 4, 8):
+            link, elapsed = run(total, config, count)
+            assert link == expect
+            print(
+                f"{name:<8} {count:>2} workers {total_mib / elapsed:>8.1f} MiB/s "
+                f"{baseline / elapsed:>6.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
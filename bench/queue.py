@@ -0,0 +1,69 @@
+"""
+Time to resolve `leaves` links through the layout queue when nodes are added
+first and links arrive in random order, so the queue holds up to `leaves`
+pending links. Functional queue copies its tables on every update, which
+makes it quadratic, while `MutableQueue` stays linear.
+
+    python -m bench.queue [width] [leaves...]
+"""
+
+import sys
+from random import Random
+from time import perf_counter
+from typing import Callable
+from multiformats import CID, multihash
+import ipld_unixfs.file.layout.queue as Queue
+from ipld_unixfs.file.layout.api import Branch
+from ipld_unixfs.unixfs import FileLink
+
+
+def workload(width: int, leaves: int) -> tuple[list[Branch], list[int]]:
+    nodes = [
+        Branch(
+            leaves + offset // width,
+            list(range(offset, min(offset + width, leaves))),
+        )
+        for offset in range(0, leaves, width)
+    ]
+    order = list(range(leaves))
+    Random(0).shuffle(order)
+    return nodes, order
+
+
+def functional(nodes: list[Branch], order: list[int], link: FileLink) -> int:
+    queue = Queue.add_nodes(nodes, Queue.empty())
+    for id in order:
+        queue = Queue.add_link(id, link, queue)
+    return len(queue.linked)
+
+
+def mutable(nodes: list[Branch], order: list[int], link: FileLink) -> int:
+    queue = Queue.MutableQueue()
+    queue.add_nodes(nodes)
+    for id in order:
+        queue.add_link(id, link)
+    return len(queue.drain())
+
+
+def main(width: int = 174, *sizes: int) -> None:
+    cid = CID("base32", 1, "raw", multihash.digest(b"", "sha2-256"))
+    link = FileLink(cid, 0, 0)
+    runs: list[tuple[str, Callable[[list[Branch], list[int], FileLink], int]]] = [
+        ("functional", functional),
+        ("mutable", mutable),
+    ]
+    for leaves in sizes or (1000, 4000, 16000):
+        nodes, order = workload(width, leaves)
+        for name, run in runs:
+            start = perf_counter()
+            linked = run(nodes, order, link)
+            elapsed = perf_counter() - start
+            assert linked == len(nodes)
+            print(
+                f"{name:<10} {leaves:>8} links {elapsed * 1000:>10.1f} ms "
+                f"{leaves / elapsed:>12.0f} links/s"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,49 @@
+"""
+Time to update a single file in a large directory tree and flush it, compared
+to the time to build and flush the whole tree. Files are put into directories
+of `width` files, which are grouped into directories of `width` directories.
+
+    python -m bench.tree [files] [width] [updates]
+"""
+
+import sys
+from random import Random
+from time import perf_counter
+from multiformats import CID, multihash
+from ipld_unixfs import tree as DirectoryTree
+from ipld_unixfs.unixfs import DAGLink
+from bench.writer import Counter
+
+
+def main(files: int = 1_000_000, width: int = 1000, updates: int = 100) -> None:
+    cid = CID("base32", 1, "raw", multihash.digest(b"", "sha2-256"))
+    link = DAGLink(cid, 0)
+    counter = Counter()
+    tree = DirectoryTree.create(counter)
+
+    def path(n: int) -> str:
+        return f"a{n // width // width}/b{n // width % width}/f{n % width}"
+
+    start = perf_counter()
+    for n in range(files):
+        tree.set(path(n), link)
+    tree.flush()
+    elapsed = perf_counter() - start
+    print(f"build {files} files {elapsed:>10.2f} s {counter.blocks:>8} blocks")
+
+    random = Random(0)
+    blocks = counter.blocks
+    start = perf_counter()
+    for n in range(updates):
+        update = CID("base32", 1, "raw", multihash.digest(str(n).encode(), "sha2-256"))
+        tree.set(path(random.randrange(files)), DAGLink(update, 0))
+        tree.flush()
+    elapsed = perf_counter() - start
+    print(
+        f"update {updates} files {elapsed / updates * 1000:>8.2f} ms per update "
+        f"{(counter.blocks - blocks) / updates:>5.1f} blocks per update"
+    )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
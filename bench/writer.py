@@ -0,0 +1,66 @@
+"""
+Throughput of the file writer importing a synthetic file into blocks which are
+counted and dropped, with either UnixFS or raw leaves.
+
+    python -m bench.writer [total_mib] [read_kib] [chunk_kib]
+"""
+
+import sys
+from time import perf_counter
+from typing import Iterator
+from ipld_unixfs.file import writer as FileWriter
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.multiformats.block import Block
+
+
+class Counter:
+    blocks: int
+    byte_length: int
+
+    def __init__(self) -> None:
+        self.blocks = 0
+        self.byte_length = 0
+
+    def write(self, block: Block, /) -> None:
+        self.blocks += 1
+        self.byte_length += block.byte_length
+
+
+def generate(total: int, read_size: int) -> Iterator[bytes]:
+    block = bytes(range(251)) * (read_size // 251 + 1)
+    offset = 0
+    while offset < total:
+        size = min(read_size, total - offset)
+        # Copy so that every read is a fresh allocation like it would be when
+        # reading from a file or a socket.
+        yield bytes(block[0:size])
+        offset += size
+
+
+def main(total_mib: int = 512, read_kib: int = 1024, chunk_kib: int = 256) -> None:
+    total = total_mib * 1024 * 1024
+    chunker = FixedSizeChunker(chunk_kib * 1024)
+    print(f"{total_mib} MiB in {read_kib} KiB reads, {chunk_kib} KiB chunks")
+    for name, leaf in [
+        ("unixfs", FileWriter.UnixFSLeaf),
+        ("raw", FileWriter.UnixFSRawLeaf),
+    ]:
+        config = FileWriter.configure(chunker=chunker, file_chunk_encoder=leaf)
+        counter = Counter()
+        start = perf_counter()
+        file = FileWriter.create(counter, config)
+        for data in generate(total, read_kib * 1024):
+            file.write(data)
+        link = file.close()
+        elapsed = perf_counter() - start
+
+        assert link.contentByteLength == total
+        assert link.dagByteLength == counter.byte_length
+        print(
+            f"{name:<8} {total_mib / elapsed:>8.1f} MiB/s "
+            f"{counter.blocks:>8} blocks"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
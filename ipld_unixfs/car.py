@@ -0,0 +1,417 @@
+"""
+Writer of [CARv1] archives, which takes blocks as they are produced by the
+file and directory writers and writes them into a sink.
+
+Archive starts with a varint length prefixed DAG-CBOR header listing the roots,
+followed by the varint length prefixed `cid || bytes` sections of the blocks.
+Since roots are usually known only after all the blocks are written, header
+can be written with placeholder roots and rewritten on close, as long as the
+encoded header stays the same size, which holds for the CIDs of the same
+version, codec and hash function.
+
+Sections are not joined, instead pieces of the buffered sections (including
+segments of the file chunks, which reference written memory) are handed to
+the sink together. When writing into a file descriptor they are written by a
+single `os.writev` call, so block bytes are copied only by the kernel.
+
+```py
+from ipld_unixfs import car as CarWriter
+
+with open("file.car", "wb") as fd:
+    car = CarWriter.create(fd.fileno())
+    file = FileWriter.create(car)
+    file.write(content)
+    link = file.close()
+    car.close([link.cid])
+```
+
+Blocks can also be split across CARs of a bounded size with the
+`ShardedCarWriter`, which hands each CAR over as soon as it is full. E.g. to
+upload CARs from an event loop while blocks are written on an executor thread:
+
+```py
+shards = asyncio.Queue(2)
+
+def on_shard(shard):
+    # Blocks the writer thread while two shards are waiting to be uploaded.
+    asyncio.run_coroutine_threadsafe(shards.put(shard), loop).result()
+
+car = CarWriter.shard(CarWriter.files("/tmp/upload"), on_shard, 4 * 1024**3)
+```
+
+[CARv1]:https://ipld.io/specs/transport/car/carv1/
+"""
+
+import io
+import os
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Optional, Protocol, Sequence, Union
+import dag_cbor
+from multiformats import CID, varint
+from ipld_unixfs import codec
+from ipld_unixfs.multiformats.block import Block
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+PLACEHOLDER_ROOT = CID("base32", 1, "dag-pb", ("sha2-256", bytes(32)))
+"""
+Placeholder for the root, which has the same size as CIDv1 of DAG-PB or raw
+blocks hashed with sha2-256.
+"""
+
+DEFAULT_BUFFER_SIZE = 4 * 1024 * 1024
+"""Number of bytes of sections buffered before they are written."""
+
+IOV_MAX = (
+    os.sysconf("SC_IOV_MAX")
+    if "SC_IOV_MAX" in getattr(os, "sysconf_names", {})
+    else 1024
+)
+"""Maximum number of buffers `os.writev` accepts at once."""
+
+
+class Sink(Protocol):
+    """
+    Destination of the archive bytes.
+    """
+
+    def writelines(self, buffers: Sequence[Buffer], /) -> None:
+        """Appends buffers to the end of the archive."""
+
+    def pwrite(self, data: bytes, offset: int, /) -> None:
+        """Overwrites archive bytes at the given offset."""
+
+
+class DescriptorSink:
+    """
+    Sink writing into the file descriptor with `os.writev`.
+    """
+
+    fd: int
+    iov_max: int
+
+    def __init__(self, fd: int, iov_max: int = IOV_MAX) -> None:
+        self.fd = fd
+        self.iov_max = iov_max
+
+    def writelines(self, buffers: Sequence[Buffer], /) -> None:
+        if not hasattr(os, "writev"):
+            for buffer in buffers:
+                write_all(self.fd, memoryview(buffer))
+            return
+
+        offset = 0
+        while offset < len(buffers):
+            batch = buffers[offset : offset + self.iov_max]
+            written = os.writev(self.fd, batch)
+            # Kernel may write fewer bytes than asked for, in which case we
+            # skip buffers that were written and continue from where it
+            # stopped.
+            for buffer in batch:
+                view = memoryview(buffer)
+                if written < view.nbytes:
+                    if written > 0:
+                        write_all(self.fd, view.cast("B")[written:])
+                        offset += 1
+                    break
+                written -= view.nbytes
+                offset += 1
+
+    def pwrite(self, data: bytes, offset: int, /) -> None:
+        if hasattr(os, "pwrite"):
+            os.pwrite(self.fd, data, offset)
+        else:
+            end = os.lseek(self.fd, 0, os.SEEK_CUR)
+            os.lseek(self.fd, offset, os.SEEK_SET)
+            write_all(self.fd, memoryview(data))
+            os.lseek(self.fd, end, os.SEEK_SET)
+
+
+class FileSink:
+    """
+    Sink writing into the binary file object.
+    """
+
+    file: BinaryIO
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+
+    def writelines(self, buffers: Sequence[Buffer], /) -> None:
+        self.file.writelines(buffers)
+
+    def pwrite(self, data: bytes, offset: int, /) -> None:
+        end = self.file.tell()
+        self.file.seek(offset)
+        self.file.write(data)
+        self.file.seek(end)
+
+
+class CarWriter:
+    """
+    Writer of a single CAR. Implements `BlockWriter`, so it can be passed to
+    the file and directory writers directly.
+    """
+
+    sink: Sink
+    roots: Sequence[CID]
+    header: bytes
+    buffer_size: int
+    buffers: list[Buffer]
+    buffered: int
+    """Number of bytes in `buffers`."""
+    byte_length: int
+    """Number of bytes written into the archive, including buffered ones."""
+    closed: bool
+
+    def __init__(
+        self,
+        sink: Sink,
+        roots: Sequence[CID] = (PLACEHOLDER_ROOT,),
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> None:
+        self.sink = sink
+        self.roots = roots
+        self.header = encode_header(roots)
+        self.buffer_size = buffer_size
+        self.buffers = [self.header]
+        self.buffered = len(self.header)
+        self.byte_length = len(self.header)
+        self.closed = False
+
+    def write(self, block: Block, /) -> None:
+        if self.closed:
+            raise ValueError("Can not write into a closed CAR")
+        data = block.bytes
+        length = block.byte_length
+        prefix = section_prefix(block.cid, length)
+        self.buffers.append(prefix)
+        if isinstance(data, (bytes, bytearray)):
+            self.buffers.append(data)
+        else:
+            self.buffers.extend(data.segments)
+        size = len(prefix) + length
+        self.buffered += size
+        self.byte_length += size
+        if self.buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes buffered sections into the sink.
+        """
+        if len(self.buffers) > 0:
+            self.sink.writelines(self.buffers)
+            self.buffers = []
+            self.buffered = 0
+
+    def close(self, roots: Optional[Sequence[CID]] = None) -> int:
+        """
+        Flushes remaining sections and, if `roots` are given, rewrites the
+        header with them. Returns the size of the archive.
+        """
+        header = None
+        if roots is not None and list(roots) != list(self.roots):
+            header = encode_header(roots)
+            if len(header) != len(self.header):
+                raise ValueError(
+                    "Can not update CAR header with roots of a different size"
+                )
+        if not self.closed:
+            self.flush()
+            self.closed = True
+        if roots is not None and header is not None:
+            self.sink.pwrite(header, 0)
+            self.header = header
+            self.roots = roots
+        return self.byte_length
+
+
+@dataclass
+class CarShard:
+    """
+    CAR written by the `ShardedCarWriter`.
+    """
+
+    index: int
+    """Position of the CAR in the sequence of shards."""
+    file: BinaryIO
+    """File the CAR was written into, which is left open."""
+    roots: Sequence[CID]
+    """Roots of the CAR, which is the placeholder unless the CAR is the last."""
+    byte_length: int
+    blocks: list[tuple[CID, int, int]]
+    """Blocks of the CAR with offsets and lengths of their bytes in the CAR."""
+
+
+class ShardedCarWriter:
+    """
+    Writer splitting blocks across CARs of at most `shard_size` bytes.
+
+    Once the next block does not fit the current CAR, its header is rewritten
+    and the CAR is passed to `on_shard` before the next one is started, so
+    only the buffer of the current CAR and its index are held in memory.
+
+    Every CAR is started with the placeholder root, which can only be replaced
+    by a single root of the same size, i.e. a CIDv1 with a 32 byte digest.
+    Blocks are written as they are produced, so a block of the CAR is not
+    necessarily a node of the DAG, let alone its root. CARs other than the
+    last keep the placeholder root and the last one gets the root given to
+    `close`.
+    """
+
+    open_shard: Callable[[int], BinaryIO]
+    on_shard: Callable[[CarShard], None]
+    shard_size: int
+    buffer_size: int
+    shards: int
+    """Number of CARs started."""
+    car: Optional[CarWriter]
+    file: Optional[BinaryIO]
+    blocks: list[tuple[CID, int, int]]
+    closed: bool
+
+    def __init__(
+        self,
+        open_shard: Callable[[int], BinaryIO],
+        on_shard: Callable[[CarShard], None],
+        shard_size: int,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> None:
+        self.open_shard = open_shard
+        self.on_shard = on_shard
+        self.shard_size = shard_size
+        self.buffer_size = buffer_size
+        self.shards = 0
+        self.car = None
+        self.file = None
+        self.blocks = []
+        self.closed = False
+
+    def write(self, block: Block, /) -> None:
+        if self.closed:
+            raise ValueError("Can not write into a closed CAR")
+        length = block.byte_length
+        size = section_size(block.cid, length)
+        if len(PLACEHOLDER_HEADER) + size > self.shard_size:
+            raise ValueError(
+                f"Block {block.cid} of {length} bytes does not fit into a CAR "
+                f"of {self.shard_size} bytes"
+            )
+        car = self.car
+        if car is not None and car.byte_length + size > self.shard_size:
+            self.finish(None)
+            car = None
+        if car is None:
+            car = self.start()
+        car.write(block)
+        self.blocks.append((block.cid, car.byte_length - length, length))
+
+    def close(self, roots: Sequence[CID]) -> int:
+        """
+        Finishes the last CAR with the given roots and returns number of CARs
+        written. Roots must encode to the same size as the placeholder root,
+        which in practice means a single CIDv1 with a 32 byte digest.
+        """
+        if not self.closed:
+            if len(encode_header(roots)) != len(PLACEHOLDER_HEADER):
+                raise ValueError(
+                    "CAR shards can only be rooted at a single CIDv1 with a "
+                    "32 byte digest"
+                )
+            if self.car is None:
+                # No blocks were written, but the roots still need a CAR.
+                self.start()
+            self.finish(roots)
+            self.closed = True
+        return self.shards
+
+    def start(self) -> CarWriter:
+        file = self.open_shard(self.shards)
+        self.shards += 1
+        sink: Sink
+        try:
+            sink = DescriptorSink(file.fileno())
+        except (AttributeError, io.UnsupportedOperation):
+            sink = FileSink(file)
+        self.file = file
+        self.car = CarWriter(sink, (PLACEHOLDER_ROOT,), self.buffer_size)
+        return self.car
+
+    def finish(self, roots: Optional[Sequence[CID]]) -> None:
+        car = self.car
+        file = self.file
+        if car is None or file is None:
+            return
+        byte_length = car.close(roots)
+        file.flush()
+        shard = CarShard(self.shards - 1, file, car.roots, byte_length, self.blocks)
+        self.car = None
+        self.file = None
+        self.blocks = []
+        self.on_shard(shard)
+
+
+def encode_header(roots: Sequence[CID]) -> bytes:
+    header = dag_cbor.encode({"roots": list(roots), "version": 1})
+    return varint.encode(len(header)) + header
+
+
+PLACEHOLDER_HEADER = encode_header([PLACEHOLDER_ROOT])
+"""Header every CAR of the `ShardedCarWriter` starts with."""
+
+def section_size(cid: CID, byte_length: int) -> int:
+    length = len(codec.cid_prefix(cid)) + len(cid.digest) + byte_length
+    return codec.varint_size(length) + length
+
+
+def section_prefix(cid: CID, byte_length: int) -> bytes:
+    """
+    Encodes section length followed by the binary CID.
+    """
+    prefix = codec.cid_prefix(cid)
+    digest = cid.digest
+    length = len(prefix) + len(digest) + byte_length
+    return varint.encode(length) + prefix + digest
+
+
+def write_all(fd: int, data: memoryview) -> None:
+    while len(data) > 0:
+        data = data[os.write(fd, data) :]
+
+
+def create(
+    target: Union[int, BinaryIO],
+    roots: Sequence[CID] = (PLACEHOLDER_ROOT,),
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> CarWriter:
+    """
+    Creates CAR writer writing into the file descriptor or a binary file
+    object. Header is rewritten on close, so they need to be seekable if the
+    roots are given to `close`.
+    """
+    sink: Sink = DescriptorSink(target) if isinstance(target, int) else FileSink(target)
+    return CarWriter(sink, roots, buffer_size)
+
+
+def files(directory: str, prefix: str = "shard") -> Callable[[int], BinaryIO]:
+    """
+    Returns `open_shard` function creating CAR files in the given directory.
+    """
+
+    def open_shard(index: int) -> BinaryIO:
+        return open(os.path.join(directory, f"{prefix}-{index}.car"), "wb")
+
+    return open_shard
+
+
+def shard(
+    open_shard: Callable[[int], BinaryIO],
+    on_shard: Callable[[CarShard], None],
+    shard_size: int,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> ShardedCarWriter:
+    """
+    Creates writer splitting blocks across CARs of at most `shard_size` bytes.
+    """
+    return ShardedCarWriter(open_shard, on_shard, shard_size, buffer_size)
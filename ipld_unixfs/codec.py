@@ -0,0 +1,399 @@
+"""
+Encoder for the UnixFS nodes, which are [DAG-PB] blocks carrying UnixFS `Data`
+protobuf message. Encoded size of the block is computed up front, after which
+it is written into a single `bytearray`, without intermediate allocations.
+
+Output is byte identical to the one of js-ipfs (and go-ipfs), which requires
+following their choices where protobuf allows several encodings:
+
+- Links are written before `Data` (as required by DAG-PB spec).
+- Links to file parts have empty (but present) `Name`.
+- Directory links are written in the order of entries, which callers keep
+  sorted by name.
+- `blocksizes` are not packed.
+- `Data` field is omitted when content is empty and `filesize` is always
+  present in file nodes.
+- `mode` is omitted when it is the default for the node type.
+- `mtime.FractionalNanoseconds` is omitted when it is `0`.
+
+[DAG-PB]:https://ipld.io/specs/codecs/dag-pb/spec/
+"""
+
+from typing import Optional, Sequence, Union
+from multiformats import CID, varint
+from ipld_unixfs.file.layout.api import PB
+from ipld_unixfs.multiformats.codecs.api import BlockEncoder
+from ipld_unixfs.unixfs import (
+    AdvancedFile,
+    Content,
+    Directory,
+    DirectoryEntryLink,
+    DirectoryShard,
+    FlatDirectory,
+    File,
+    FileChunk,
+    FileLink,
+    FileShard,
+    Metadata,
+    Mode,
+    MTime,
+    NodeType,
+    SimpleFile,
+)
+
+name = "UnixFS"
+code: PB = 0x70
+
+DEFAULT_FILE_MODE = 0o644
+DEFAULT_DIRECTORY_MODE = 0o755
+
+MAX_NSECS = 999_999_999
+"""Largest fractional nanoseconds of the mtime."""
+
+PBLink = tuple[CID, bytes, int]
+"""DAG-PB link as `(cid, name, tsize)` tuple."""
+
+EMPTY_NAME = b""
+
+
+class Data:
+    """
+    UnixFS `Data` message. Fields that are `None` (or empty) are omitted.
+    """
+
+    __slots__ = (
+        "type",
+        "content",
+        "filesize",
+        "blocksizes",
+        "hash_type",
+        "fanout",
+        "mode",
+        "mtime",
+    )
+
+    type: NodeType
+    content: Optional[Content]
+    filesize: Optional[int]
+    blocksizes: Sequence[int]
+    hash_type: Optional[int]
+    fanout: Optional[int]
+    mode: Optional[Mode]
+    mtime: Optional[MTime]
+
+    def __init__(
+        self,
+        type: NodeType,
+        content: Optional[Content] = None,
+        filesize: Optional[int] = None,
+        blocksizes: Sequence[int] = (),
+        hash_type: Optional[int] = None,
+        fanout: Optional[int] = None,
+        mode: Optional[Mode] = None,
+        mtime: Optional[MTime] = None,
+    ) -> None:
+        self.type = type
+        self.content = content
+        self.filesize = filesize
+        self.blocksizes = blocksizes
+        self.hash_type = hash_type
+        self.fanout = fanout
+        self.mode = mode
+        self.mtime = mtime
+
+
+class UnixFSEncoder(BlockEncoder[PB, File]):
+    """
+    Implements `FileEncoder` for the `File` nodes.
+    """
+
+    name = name
+    code: PB = code
+
+    def encode(self, file: File) -> bytearray:
+        return encode_file(file)
+
+
+encoder = UnixFSEncoder()
+
+
+def encode_file(node: Union[File, FileChunk, FileShard]) -> bytearray:
+    if node.layout == "simple":
+        if isinstance(node, SimpleFile):
+            return encode_simple_file(node.content, node.metadata)
+        return encode_file_chunk(node.content)
+    if isinstance(node, AdvancedFile):
+        return encode_advanced_file(node.parts, node.metadata)
+    return encode_file_shard(node.parts)
+
+
+def encode_simple_file(
+    content: Content, metadata: Optional[Metadata] = None
+) -> bytearray:
+    return encode_pb(file_data(content, metadata), ())
+
+
+def encode_file_chunk(content: Content) -> bytearray:
+    return encode_pb(file_data(content, None), ())
+
+
+def encode_file_shard(parts: Sequence[FileLink]) -> bytearray:
+    return encode_advanced_file(parts, None)
+
+
+def encode_advanced_file(
+    parts: Sequence[FileLink], metadata: Optional[Metadata] = None
+) -> bytearray:
+    filesize = 0
+    blocksizes: list[int] = []
+    links: list[PBLink] = []
+    for part in parts:
+        filesize += part.contentByteLength
+        blocksizes.append(part.contentByteLength)
+        links.append((part.cid, EMPTY_NAME, part.dagByteLength))
+
+    data = Data(NodeType.File, filesize=filesize, blocksizes=blocksizes)
+    set_metadata(data, metadata, DEFAULT_FILE_MODE)
+    return encode_pb(data, links)
+
+
+def encode_directory(node: Directory) -> bytearray:
+    if isinstance(node, DirectoryShard):
+        return encode_directory_shard(node)
+    return encode_flat_directory(node)
+
+
+def encode_flat_directory(node: FlatDirectory) -> bytearray:
+    data = Data(NodeType.Directory)
+    set_metadata(data, node.metadata, DEFAULT_DIRECTORY_MODE)
+    return encode_pb(data, directory_links(node.entries))
+
+
+def encode_directory_shard(node: DirectoryShard) -> bytearray:
+    data = Data(
+        NodeType.HAMTShard,
+        content=node.bitfield if len(node.bitfield) > 0 else None,
+        hash_type=node.hash_type,
+        fanout=node.fanout,
+    )
+    set_metadata(data, node.metadata, DEFAULT_DIRECTORY_MODE)
+    return encode_pb(data, directory_links(node.entries))
+
+
+def directory_links(entries: Sequence[DirectoryEntryLink]) -> list[PBLink]:
+    return [(entry.cid, entry.name.encode(), entry.dagByteLength) for entry in entries]
+
+
+def file_data(content: Content, metadata: Optional[Metadata]) -> Data:
+    length = content_length(content)
+    data = Data(
+        NodeType.File, content=content if length > 0 else None, filesize=length
+    )
+    set_metadata(data, metadata, DEFAULT_FILE_MODE)
+    return data
+
+
+def set_metadata(data: Data, metadata: Optional[Metadata], default_mode: Mode) -> None:
+    if metadata is not None:
+        data.mode = encode_mode(metadata.mode, default_mode)
+        data.mtime = metadata.mtime
+        nsecs = None if metadata.mtime is None else metadata.mtime.nsecs
+        if nsecs is not None and not 0 <= nsecs <= MAX_NSECS:
+            raise ValueError(
+                f"mtime nanoseconds must be between 0 and {MAX_NSECS}, got {nsecs}"
+            )
+
+
+def encode_mode(mode: Optional[Mode], default: Mode) -> Optional[Mode]:
+    """
+    Preserves all 32 bits of the mode, but omits it if it is the default.
+    """
+    return None if mode == default else mode
+
+
+def encode_pb(data: Data, links: Sequence[PBLink]) -> bytearray:
+    """
+    Encodes DAG-PB node with given `Data` message and links.
+    """
+    link_sizes = [link_size(link) for link in links]
+    data_length = data_size(data)
+    size = 1 + varint_size(data_length) + data_length
+    for length in link_sizes:
+        size += 1 + varint_size(length) + length
+
+    buffer = bytearray(size)
+    offset = 0
+    for link, length in zip(links, link_sizes):
+        cid, name, tsize = link
+        prefix = cid_prefix(cid)
+        digest = cid.digest
+        # PBNode.Links = 2 (length delimited)
+        buffer[offset] = 0x12
+        offset = write_varint(buffer, offset + 1, length)
+        # PBLink.Hash = 1 (length delimited), binary CID is written as prefix
+        # followed by the multihash to avoid concatenating them.
+        buffer[offset] = 0x0A
+        offset = write_varint(buffer, offset + 1, len(prefix) + len(digest))
+        buffer[offset : offset + len(prefix)] = prefix
+        offset += len(prefix)
+        buffer[offset : offset + len(digest)] = digest
+        offset += len(digest)
+        # PBLink.Name = 2 (length delimited)
+        buffer[offset] = 0x12
+        offset = write_varint(buffer, offset + 1, len(name))
+        buffer[offset : offset + len(name)] = name
+        offset += len(name)
+        # PBLink.Tsize = 3 (varint)
+        buffer[offset] = 0x18
+        offset = write_varint(buffer, offset + 1, tsize)
+
+    # PBNode.Data = 1 (length delimited)
+    buffer[offset] = 0x0A
+    offset = write_varint(buffer, offset + 1, data_length)
+    write_data(buffer, offset, data)
+    return buffer
+
+
+PREFIXES: dict[tuple[int, int], bytes] = {}
+
+
+def cid_prefix(cid: CID) -> bytes:
+    """
+    Returns bytes preceding multihash in the binary representation of the CID.
+    """
+    version = cid.version
+    if version == 0:
+        return b""
+    code = cid.codec.code
+    prefix = PREFIXES.get((version, code))
+    if prefix is None:
+        prefix = varint.encode(version) + varint.encode(code)
+        PREFIXES[(version, code)] = prefix
+    return prefix
+
+
+def link_size(link: PBLink) -> int:
+    cid, name, tsize = link
+    hash_length = len(cid_prefix(cid)) + len(cid.digest)
+    return (
+        1
+        + varint_size(hash_length)
+        + hash_length
+        + 1
+        + varint_size(len(name))
+        + len(name)
+        + 1
+        + varint_size(tsize)
+    )
+
+
+def content_length(content: Content) -> int:
+    if isinstance(content, (bytes, bytearray)):
+        return len(content)
+    if isinstance(content, memoryview):
+        return content.nbytes
+    return content.byte_length
+
+
+def mtime_size(mtime: MTime) -> int:
+    size = 1 + varint_size(mtime.secs)
+    if mtime.nsecs:
+        size += 5
+    return size
+
+
+def data_size(data: Data) -> int:
+    size = 1 + varint_size(data.type.value)
+    if data.content is not None:
+        length = content_length(data.content)
+        size += 1 + varint_size(length) + length
+    if data.filesize is not None:
+        size += 1 + varint_size(data.filesize)
+    for blocksize in data.blocksizes:
+        size += 1 + varint_size(blocksize)
+    if data.hash_type is not None:
+        size += 1 + varint_size(data.hash_type)
+    if data.fanout is not None:
+        size += 1 + varint_size(data.fanout)
+    if data.mode is not None:
+        size += 1 + varint_size(data.mode)
+    if data.mtime is not None:
+        length = mtime_size(data.mtime)
+        size += 1 + varint_size(length) + length
+    return size
+
+
+def write_data(buffer: bytearray, offset: int, data: Data) -> int:
+    # Type = 1 (varint)
+    buffer[offset] = 0x08
+    offset = write_varint(buffer, offset + 1, data.type.value)
+    if data.content is not None:
+        # Data = 2 (length delimited)
+        content = data.content
+        length = content_length(content)
+        buffer[offset] = 0x12
+        offset = write_varint(buffer, offset + 1, length)
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            buffer[offset : offset + length] = content
+        else:
+            content.copy_to(memoryview(buffer), offset)
+        offset += length
+    if data.filesize is not None:
+        # filesize = 3 (varint)
+        buffer[offset] = 0x18
+        offset = write_varint(buffer, offset + 1, data.filesize)
+    for blocksize in data.blocksizes:
+        # blocksizes = 4 (varint, not packed)
+        buffer[offset] = 0x20
+        offset = write_varint(buffer, offset + 1, blocksize)
+    if data.hash_type is not None:
+        # hashType = 5 (varint)
+        buffer[offset] = 0x28
+        offset = write_varint(buffer, offset + 1, data.hash_type)
+    if data.fanout is not None:
+        # fanout = 6 (varint)
+        buffer[offset] = 0x30
+        offset = write_varint(buffer, offset + 1, data.fanout)
+    if data.mode is not None:
+        # mode = 7 (varint)
+        buffer[offset] = 0x38
+        offset = write_varint(buffer, offset + 1, data.mode)
+    if data.mtime is not None:
+        # mtime = 8 (length delimited)
+        mtime = data.mtime
+        buffer[offset] = 0x42
+        offset = write_varint(buffer, offset + 1, mtime_size(mtime))
+        # UnixTime.Seconds = 1 (varint)
+        buffer[offset] = 0x08
+        offset = write_varint(buffer, offset + 1, mtime.secs)
+        if mtime.nsecs:
+            # UnixTime.FractionalNanoseconds = 2 (fixed32)
+            buffer[offset] = 0x15
+            buffer[offset + 1 : offset + 5] = mtime.nsecs.to_bytes(4, "little")
+            offset += 5
+    return offset
+
+
+def varint_size(value: int) -> int:
+    """
+    Number of bytes value takes when encoded as a protobuf varint. Negative
+    values are encoded as 64 bit two's complement which always takes 10 bytes.
+    """
+    if value < 0:
+        return 10
+    return max((value.bit_length() + 6) // 7, 1)
+
+
+def write_varint(buffer: bytearray, offset: int, value: int) -> int:
+    """
+    Writes value as a protobuf varint at the given offset and returns offset
+    right after it.
+    """
+    if value < 0:
+        value += 1 << 64
+    while value >= 0x80:
+        buffer[offset] = (value & 0x7F) | 0x80
+        value >>= 7
+        offset += 1
+    buffer[offset] = value
+    return offset + 1
@@ -0,0 +1,228 @@
+"""
+Directory writer collects named links to files and other directories and
+once closed encodes them into a UnixFS directory. Directories are encoded into
+a single block, unless their estimated size reaches the sharding threshold, in
+which case they are encoded as a HAMT (see `sharded_directory`). Size is
+estimated the same way as in kubo, as the sum of the name and binary CID
+lengths of the entries, so that both pick the same representation.
+
+```py
+from ipld_unixfs import directory as DirectoryWriter
+from ipld_unixfs.file import writer as FileWriter
+
+blocks = FileWriter.BlockList()
+directory = DirectoryWriter.create(blocks)
+directory.set("hello.txt", file_link)
+directory.set("docs", docs_link)
+link = directory.close()
+```
+"""
+
+from itertools import groupby
+from typing import Iterator, Optional
+from ipld_unixfs import codec
+from ipld_unixfs import sharded_directory as ShardedDirectory
+from ipld_unixfs.file.writer import BlockWriter
+from ipld_unixfs.multiformats import block as Block
+from ipld_unixfs.multiformats.hasher import MultihashHasher, sha256
+from ipld_unixfs.unixfs import DAGLink, DirectoryEntryLink, FlatDirectory, Metadata
+
+
+DEFAULT_SHARD_THRESHOLD = 256 * 1024
+"""Estimated size at which directories get sharded, same as in kubo."""
+
+
+class DirectoryWriter:
+    """
+    Writer of a directory.
+
+    Entries are kept in a dict by name, along with the list of names which is
+    sorted lazily. Names added since the last sort are appended to the sorted
+    ones, so the next sort merges two runs instead of sorting from scratch,
+    which keeps the total cost at `O(n log n)` however sets and reads of the
+    entries are interleaved. Cumulative size of the entries is updated on
+    every change, so closing does not need to revisit them.
+
+    Once directory reaches the sharding threshold its entries are also added
+    into a HAMT, which from then on is updated along with the dict. HAMT is
+    dropped if removals bring directory back under the threshold.
+    """
+
+    writer: BlockWriter
+    metadata: Optional[Metadata]
+    hasher: MultihashHasher
+    entries: dict[str, DirectoryEntryLink]
+    names: list[str]
+    """Names of the entries, sorted up to `sorted_length` and possibly stale."""
+    sorted_length: int
+    stale: bool
+    """Whether `names` may contain removed or repeated names."""
+    dag_byte_length: int
+    """Cumulative size of all the entries."""
+    estimated_size: int
+    """Estimated size of the flat directory block."""
+    shard_threshold: Optional[int]
+    """Estimated size at which directory is sharded, `None` to never shard."""
+    options: ShardedDirectory.Options
+    """Options of the HAMT."""
+    shard: Optional[ShardedDirectory.Shard]
+    """Root of the HAMT, once the directory got sharded."""
+    link: Optional[DAGLink]
+    """Link to the directory, unless it changed since it was last flushed."""
+    closed: bool
+
+    def __init__(
+        self,
+        writer: BlockWriter,
+        metadata: Optional[Metadata] = None,
+        hasher: MultihashHasher = sha256,
+        shard_threshold: Optional[int] = DEFAULT_SHARD_THRESHOLD,
+        fanout: int = ShardedDirectory.DEFAULT_FANOUT,
+    ) -> None:
+        self.writer = writer
+        self.metadata = metadata
+        self.hasher = hasher
+        self.entries = {}
+        self.names = []
+        self.sorted_length = 0
+        self.stale = False
+        self.dag_byte_length = 0
+        self.estimated_size = 0
+        self.shard_threshold = shard_threshold
+        self.options = ShardedDirectory.Options(fanout)
+        self.shard = None
+        self.link = None
+        self.closed = False
+
+    def set(self, name: str, link: DAGLink, overwrite: bool = False) -> None:
+        """
+        Adds an entry to the directory. Raises `ValueError` if entry with the
+        same name exists, unless `overwrite` is set.
+        """
+        self.assert_open()
+        previous = self.entries.get(name)
+        if previous is None:
+            self.names.append(name)
+        elif not overwrite:
+            raise ValueError(f"Directory already contains entry with name {name!r}")
+        else:
+            self.dag_byte_length -= previous.dagByteLength
+            self.estimated_size -= estimated_link_size(previous)
+
+        entry = DirectoryEntryLink(link.cid, link.dagByteLength, name)
+        self.entries[name] = entry
+        self.dag_byte_length += entry.dagByteLength
+        self.estimated_size += estimated_link_size(entry)
+        if self.is_sharded():
+            shard = self.shard
+            if shard is None:
+                self.shard = self.create_shard()
+            else:
+                hash = ShardedDirectory.hash_name(name)
+                shard.set(ShardedDirectory.Entry(hash, entry))
+        self.link = None
+
+    def remove(self, name: str) -> None:
+        self.assert_open()
+        entry = self.entries.pop(name, None)
+        if entry is not None:
+            self.dag_byte_length -= entry.dagByteLength
+            self.estimated_size -= estimated_link_size(entry)
+            self.stale = True
+            self.link = None
+            if self.shard is not None:
+                if self.is_sharded():
+                    self.shard.remove(name, ShardedDirectory.hash_name(name))
+                else:
+                    # HAMT would have to be updated on every change while
+                    # under the threshold, instead it is recreated if needed.
+                    self.shard = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[DirectoryEntryLink]:
+        """
+        Iterates over the entries sorted by name.
+        """
+        entries = self.entries
+        return (entries[name] for name in self.sorted_names())
+
+    def sorted_names(self) -> list[str]:
+        names = self.names
+        if self.sorted_length < len(names) or self.stale:
+            names.sort()
+            if self.stale:
+                # Removed and then added again names occur more than once.
+                entries = self.entries
+                names[:] = [name for name, _ in groupby(names) if name in entries]
+                self.stale = False
+            self.sorted_length = len(names)
+        return names
+
+    def close(self) -> DAGLink:
+        """
+        Flushes the directory and closes it for changes. Calling close again
+        returns the same link.
+        """
+        link = self.flush()
+        self.closed = True
+        return link
+
+    def flush(self) -> DAGLink:
+        """
+        Writes blocks of the directory and returns link to it. Directory can be
+        changed and flushed again, in which case only blocks that changed are
+        written, which for sharded directories are the shards on the paths to
+        the changed entries.
+        """
+        if self.link is not None:
+            return self.link
+
+        if self.is_sharded():
+            shard = self.shard
+            if shard is None:
+                # Only empty directories get here, with the threshold of 0.
+                shard = self.shard = self.create_shard()
+            self.link = shard.encode(self.writer, self.hasher, self.metadata)
+            return self.link
+
+        node = FlatDirectory(list(self), self.metadata)
+        block = Block.create(codec.encode_directory(node), codec.code, self.hasher)
+        self.writer.write(block)
+        self.link = DAGLink(block.cid, block.byte_length + self.dag_byte_length)
+        return self.link
+
+    def is_sharded(self) -> bool:
+        threshold = self.shard_threshold
+        return threshold is not None and self.estimated_size >= threshold
+
+    def create_shard(self) -> ShardedDirectory.Shard:
+        shard = ShardedDirectory.Shard(self.options)
+        hash_name = ShardedDirectory.hash_name
+        for name, entry in self.entries.items():
+            shard.set(ShardedDirectory.Entry(hash_name(name), entry))
+        return shard
+
+    def assert_open(self) -> None:
+        if self.closed:
+            raise ValueError("Can not change a closed directory")
+
+
+def estimated_link_size(entry: DirectoryEntryLink) -> int:
+    cid = entry.cid
+    return len(entry.name.encode()) + len(codec.cid_prefix(cid)) + len(cid.digest)
+
+
+def create(
+    writer: BlockWriter,
+    metadata: Optional[Metadata] = None,
+    hasher: MultihashHasher = sha256,
+    shard_threshold: Optional[int] = DEFAULT_SHARD_THRESHOLD,
+    fanout: int = ShardedDirectory.DEFAULT_FANOUT,
+) -> DirectoryWriter:
+    """
+    Creates a directory writer. Pass `shard_threshold=0` to always shard the
+    directory or `None` to never shard it.
+    """
+    return DirectoryWriter(writer, metadata, hasher, shard_threshold, fanout)
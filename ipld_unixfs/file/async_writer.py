@@ -0,0 +1,151 @@
+"""
+Asynchronous counterpart of the file `writer` for use from an event loop.
+Written bytes are encoded by the synchronous writer, optionally on an executor
+so that chunking, encoding and hashing do not block the loop, and produced
+blocks are put into a bounded `asyncio.Queue`. Once the queue reaches its high
+water mark `write` waits for the consumer, so a slow consumer throttles the
+producer instead of blocks piling up in memory.
+
+```py
+from concurrent.futures import ThreadPoolExecutor
+from ipld_unixfs.file import async_writer as AsyncFileWriter
+
+file = AsyncFileWriter.create(high_water_mark=32, executor=ThreadPoolExecutor(1))
+
+async def ingest(stream):
+    async for data in stream:
+        await file.write(data)
+    return await file.close()
+
+async def upload(car):
+    async for block in file:
+        await car.write(block)
+
+link, _ = await asyncio.gather(ingest(stream), upload(car))
+```
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import AsyncIterator, Callable, Optional, TypeVar, Union
+from ipld_unixfs.file import writer as FileWriter
+from ipld_unixfs.multiformats.block import Block
+from ipld_unixfs.unixfs import FileLink, Metadata
+
+T = TypeVar("T")
+
+DEFAULT_HIGH_WATER_MARK = 16
+"""Default number of blocks buffered before `write` waits on the consumer."""
+
+
+class AsyncFileWriter:
+    """
+    Writer of a single file which emits blocks into an `asyncio.Queue`.
+
+    Writes are applied in the order they were made. Blocks of each write are
+    enqueued before the next write is encoded, so at most `high_water_mark`
+    blocks plus the blocks of a single write are held at any time. After the
+    file is closed `None` is put into the queue to signal the end of blocks.
+
+    Writer should be created from the event loop it is used on, since on older
+    Pythons the queue binds to the loop it was created on.
+    """
+
+    writer: FileWriter.FileWriter
+    blocks: "asyncio.Queue[Optional[Block]]"
+    executor: Optional[Executor]
+    lock: asyncio.Lock
+    pending: FileWriter.BlockList
+    link: Optional[FileLink]
+
+    def __init__(
+        self,
+        config: Optional[FileWriter.Config] = None,
+        metadata: Optional[Metadata] = None,
+        high_water_mark: int = DEFAULT_HIGH_WATER_MARK,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        if high_water_mark < 1:
+            raise ValueError("High water mark must be a positive number")
+        self.pending = FileWriter.BlockList()
+        self.writer = FileWriter.create(self.pending, config, metadata)
+        self.blocks = asyncio.Queue(high_water_mark)
+        self.executor = executor
+        self.lock = asyncio.Lock()
+        self.link = None
+
+    async def write(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        """
+        Writes bytes into the file and waits until produced blocks fit the
+        queue. Bytes may still be written if the write is cancelled, in which
+        case blocks that did not fit are enqueued by the next write or close.
+        """
+        async with self.lock:
+            if self.link is not None:
+                raise ValueError("Can not write into a closed file")
+            await self.run(self.writer.write, data)
+            await self.enqueue()
+
+    async def close(self) -> FileLink:
+        """
+        Flushes remaining blocks and returns link to the file. Calling close
+        again returns the same link.
+        """
+        async with self.lock:
+            if self.link is not None:
+                return self.link
+            link = await self.run(self.writer.close)
+            await self.enqueue()
+            await self.blocks.put(None)
+            self.link = link
+            return link
+
+    async def run(self, task: Callable[..., T], *args: object) -> T:
+        if self.executor is None:
+            return task(*args)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, task, *args)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Task can not be stopped once it is running on the executor, so
+            # we hold on to the lock until it is done for the next write not
+            # to use the writer at the same time.
+            await asyncio.wait([future])
+            raise
+
+    async def enqueue(self) -> None:
+        # Blocks are only removed from `pending` once they are in the queue,
+        # so that if waiting on the queue is cancelled remaining blocks are
+        # enqueued by the next write or close instead of being lost.
+        pending = self.pending
+        count = 0
+        try:
+            for block in pending:
+                await self.blocks.put(block)
+                count += 1
+        finally:
+            del pending[:count]
+
+    def __aiter__(self) -> AsyncIterator[Block]:
+        return self.read()
+
+    async def read(self) -> AsyncIterator[Block]:
+        """
+        Iterates over blocks of the file until it is closed. There should be
+        only one reader, as each block is delivered once.
+        """
+        while True:
+            block = await self.blocks.get()
+            if block is None:
+                return
+            yield block
+
+
+def create(
+    config: Optional[FileWriter.Config] = None,
+    metadata: Optional[Metadata] = None,
+    high_water_mark: int = DEFAULT_HIGH_WATER_MARK,
+    executor: Optional[Executor] = None,
+) -> AsyncFileWriter:
+    return AsyncFileWriter(config, metadata, high_water_mark, executor)
@@ -1,4 +1,4 @@
-from typing import Generic, Sequence, TypeVar
+from typing import Generic, Iterable, Iterator, Sequence, TypeVar
 from .api import Chunk, Chunker, ChunkerBase, StatefulChunker, StatelessChunker
 from .buffer import BufferView
 
@@ -24,7 +24,7 @@ def open(chunker: Chunker[T]) -> State[T]:
 
 def write(state: State[T], buf: memoryview) -> State[T]:
     if len(buf) > 0:
-        return split(state.chunker, state.buffer, False)
+        return split(state.chunker, state.buffer.extend(buf), False)
     else:
         return State(state.chunker, state.buffer, [])
 
@@ -46,3 +46,18 @@ def split(chunker: Chunker[T], buffer: BufferView, end: bool) -> State[T]:
             offset += size
 
     return State(chunker, buffer[offset:], chunks)
+
+
+def stream(chunker: Chunker[T], source: Iterable[memoryview]) -> Iterator[Chunk]:
+    """
+    Chunks given stream of bytes, yielding chunks as soon as the chunker is able
+    to cut them. Reads are added to the buffer without copying and only the
+    remaining bytes that did not make it into a chunk are carried over, so
+    at most a chunk worth of bytes plus a read is held in memory (unless the
+    consumer holds on to the yielded chunks).
+    """
+    state = open(chunker)
+    for buf in source:
+        state = write(state, buf)
+        yield from state.chunks
+    yield from close(state).chunks
@@ -1,4 +1,8 @@
-from typing import Any, Generator, Protocol, overload
+import re
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Generator, Optional, Protocol, Sequence, TypeVar, overload
 from typing_extensions import Self
 
 
@@ -8,15 +12,27 @@ class BufferSlice(Protocol):
     byte_length: int
 
 
+class Hash(Protocol):
+    def update(self, data: memoryview, /) -> None: ...
+
+
+H = TypeVar("H", bound=Hash)
+
+
 class BufferView:
     segments: list[memoryview]
     byte_offset: int
     byte_length: int
+    _index: Optional["array[int]"]
+    """
+    Lazily computed prefix sums of segment lengths, see `index`.
+    """
 
     def __init__(self) -> None:
         self.segments = []
         self.byte_offset = 0
         self.byte_length = 0
+        self._index = None
 
     @classmethod
     def create(cls, segments: list[memoryview], byte_offset: int = 0) -> Self:
@@ -45,10 +61,9 @@ class BufferView:
     def __eq__(self, other: Any) -> bool:
         if self is other:
             return True
-        for i in range(len(self)):
-            if self[i] != other[i]:
-                return False
-        return True
+        if not isinstance(other, (BufferView, bytes, bytearray, memoryview, Sequence)):
+            return NotImplemented
+        return equals(self, other)
 
     @overload
     def __getitem__(self, index: int) -> int: ...
@@ -63,12 +78,15 @@ class BufferView:
             return get(self, index)
         raise TypeError("unsupported buffer slice arguments")
 
+    def __bytes__(self) -> bytes:
+        return tobytes(self)
+
     def __iter__(self) -> Generator[int, None, None]:
         for segment in self.segments:
             yield from segment
 
     def __len__(self) -> int:
-        return total_byte_length(self.segments)
+        return self.byte_length
 
     def copy_to(self, target: memoryview, offset: int = 0) -> memoryview:
         """
@@ -76,6 +94,32 @@ class BufferView:
         """
         return copy_to(self, target, offset)
 
+    def startswith(self, prefix: Any) -> bool:
+        """
+        Return `True` if the buffer starts with the specified prefix.
+        """
+        return startswith(self, prefix)
+
+    def find(self, sub: Any, start: int = 0, end: Optional[int] = None) -> int:
+        """
+        Return the lowest index in the buffer where `sub` is found within the
+        `[start:end]` range, or `-1` if it is not found.
+        """
+        return find(self, sub, start, end)
+
+    def update_hash(self, hasher: H) -> H:
+        """
+        Feed the buffer content into the passed `hashlib` style hasher segment
+        by segment, without joining them, and return the hasher.
+        """
+        return update_hash(self, hasher)
+
+    def tobytes(self) -> bytes:
+        """
+        Join all the segments into a single contiguous block of bytes.
+        """
+        return tobytes(self)
+
     def extend(self, bytes: memoryview) -> Self:
         """
         Add the specified bytes to the end of the buffer.
@@ -88,26 +132,156 @@ class BufferView:
 
 def copy_to(buffer: BufferView, target: memoryview, offset: int = 0) -> memoryview:
     for segment in buffer.segments:
-        for i in range(len(segment)):
-            target[offset + i] = segment[i]
-        offset += len(segment)
+        # Slice assignment copies whole segment via buffer protocol, which is
+        # effectively a `memcpy` as opposed to byte by byte copy.
+        end = offset + len(segment)
+        target[offset:end] = segment
+        offset = end
 
     return target
 
 
+def tobytes(buffer: BufferSlice) -> bytes:
+    """
+    Joins all the segments of the buffer into a single `bytes` object. Size of
+    the result is known upfront so it is allocated only once.
+    """
+    return b"".join(buffer.segments)
+
+
+def equals(buffer: BufferSlice, other: Any) -> bool:
+    """
+    Compares buffer content with the other buffer or bytes-like object. Both
+    sides are walked segment by segment comparing largest overlapping ranges
+    so that the actual comparison happens over `memoryview`s. Other sequences
+    are compared element by element.
+    """
+    if isinstance(other, BufferView):
+        other_segments = other.segments
+        other_length = other.byte_length
+    elif not isinstance(other, (bytes, bytearray, memoryview)):
+        if buffer.byte_length != len(other):
+            return False
+        content = (byte for segment in buffer.segments for byte in segment)
+        return all(a == b for a, b in zip(content, other))
+    else:
+        other_segments = [memoryview(other)]
+        other_length = other_segments[0].nbytes
+
+    if buffer.byte_length != other_length:
+        return False
+
+    # Lengths are equal so we will never run out of right segments before we
+    # run out of left ones.
+    right = iter(other_segments)
+    b: Any = b""
+    for a in buffer.segments:
+        while len(a) > 0:
+            while len(b) == 0:
+                b = next(right)
+            size = min(len(a), len(b))
+            if a[:size] != b[:size]:
+                return False
+            a = a[size:]
+            b = b[size:]
+    return True
+
+
+def startswith(buffer: BufferSlice, prefix: Any) -> bool:
+    size = prefix.byte_length if isinstance(prefix, BufferView) else len(prefix)
+    if size > buffer.byte_length:
+        return False
+    return equals(slice_(buffer, slice(0, size)), prefix)
+
+
+def find(buffer: BufferSlice, sub: Any, start: int = 0, end: Optional[int] = None) -> int:
+    """
+    Finds the first occurrence of `sub` in the buffer. Each segment is searched
+    with a compiled pattern, which operates over the `memoryview` without
+    copying it. Matches that span across segments are found by searching the
+    bytes around the segment boundary. Integer `sub` is a single byte, same
+    as with `bytes.find`.
+    """
+    if isinstance(sub, int):
+        if not 0 <= sub < 256:
+            raise ValueError("byte must be in range(0, 256)")
+        needle = bytes((sub,))
+    else:
+        needle = bytes(sub)
+    byte_length = buffer.byte_length
+    if start < 0:
+        start = max(byte_length + start, 0)
+    if end is None or end > byte_length:
+        end = byte_length
+    elif end < 0:
+        end = max(byte_length + end, 0)
+    if start > end:
+        return -1
+    if len(needle) == 0:
+        return start
+    view = slice_(buffer, slice(start, end))
+    if len(needle) > view.byte_length:
+        return -1
+
+    pattern = re.compile(re.escape(needle))
+    overlap = len(needle) - 1
+    # Last `overlap` bytes preceding the current segment.
+    tail = b""
+    offset = start
+    for segment in view.segments:
+        if len(tail) > 0:
+            window = tail + bytes(segment[:overlap])
+            index = window.find(needle)
+            if index >= 0:
+                return offset - len(tail) + index
+
+        match = pattern.search(segment)
+        if match is not None:
+            return offset + match.start()
+
+        if overlap > 0:
+            tail = (tail + bytes(segment[-overlap:]))[-overlap:]
+        offset += len(segment)
+
+    return -1
+
+
+def update_hash(buffer: BufferSlice, hasher: H) -> H:
+    for segment in buffer.segments:
+        hasher.update(segment)
+    return hasher
+
+
 def get(buffer: BufferSlice, index: int) -> int:
-    if index >= buffer.byte_length or index <= -buffer.byte_length:
+    if index >= buffer.byte_length or index < -buffer.byte_length:
         raise IndexError("index out of range")
     if index < 0:
         index = buffer.byte_length + index
 
-    offset = 0
-    for segment in buffer.segments:
-        if index < offset + len(segment):
-            return segment[index - offset]
-        offset += len(segment)
+    offsets = index_of(buffer)
+    n = bisect_right(offsets, index)
+    if n == len(offsets):
+        raise Exception("did not find index in segments")
+    start = offsets[n - 1] if n > 0 else 0
+    return buffer.segments[n][index - start]
 
-    raise Exception("did not find index in segments")
+
+def index_of(buffer: BufferSlice) -> "array[int]":
+    """
+    Returns the offset index of the buffer, that is an array where each item
+    is the offset at which the corresponding segment ends. It is computed on
+    first use and cached by `BufferView` instances so that `get` and `slice_`
+    can locate segments via binary search.
+    """
+    if isinstance(buffer, BufferView):
+        if buffer._index is None:
+            buffer._index = create_index(buffer.segments)
+        return buffer._index
+    return create_index(buffer.segments)
+
+
+def create_index(segments: list[memoryview]) -> "array[int]":
+    return array("Q", accumulate(map(len, segments)))
 
 
 def extend(buffer: BufferSlice, bytes: memoryview) -> BufferView:
@@ -123,10 +297,14 @@ def extend(buffer: BufferSlice, bytes: memoryview) -> BufferView:
                 buffer.segments, buffer.byte_offset, buffer.byte_length
             )
         )
-    view = BufferView._create(
-        list(buffer.segments), buffer.byte_offset, buffer.byte_length + len(bytes)
-    )
+    byte_length = buffer.byte_length + len(bytes)
+    view = BufferView._create(list(buffer.segments), buffer.byte_offset, byte_length)
     view.segments.append(bytes)
+    # If the index of the source buffer was already computed we can derive new
+    # one from it, otherwise we leave it to be computed on demand.
+    if isinstance(buffer, BufferView) and buffer._index is not None:
+        view._index = array("Q", buffer._index)
+        view._index.append(byte_length)
     return view
 
 
@@ -135,15 +313,18 @@ def slice_(buffer: BufferSlice, bounds: slice) -> BufferView:
     Zero copy slice of a buffer. Creates a new BufferView referencing the shared
     segments.
     """
-    segments: list[memoryview] = []
-    start_offset = bounds.start if bounds.start is not None else 0
-    end_offset = bounds.stop if bounds.stop is not None else buffer.byte_length
-    start = start_offset if start_offset >= 0 else buffer.byte_length - start_offset
-    end = end_offset if end_offset >= 0 else buffer.byte_length - end_offset
+    byte_length = buffer.byte_length
+    start = bounds.start if bounds.start is not None else 0
+    end = bounds.stop if bounds.stop is not None else byte_length
+    if start < 0:
+        start = max(byte_length + start, 0)
+    if end < 0:
+        end = byte_length + end
+    end = min(end, byte_length)
 
     # If start at 0 offset and end is past buffer range it is effectively
     # as same buffer.
-    if start == 0 and end >= buffer.byte_length:
+    if start == 0 and end >= byte_length:
         return (
             buffer
             if isinstance(buffer, BufferView)
@@ -153,53 +334,28 @@ def slice_(buffer: BufferSlice, bounds: slice) -> BufferView:
         )
 
     # If range is not within the current buffer just create an empty slice.
-    if start > end or start > buffer.byte_length or end <= 0:
+    if start >= end:
         return BufferView()
 
-    byte_length = 0
-    offset = 0
-    for segment in buffer.segments:
-        next_offset = offset + len(segment)
-        # Have not found a start yet
-        if byte_length == 0:
-            # If end offset is within the current segment we know start is also,
-            # because it preceeds the end & we had not found start yet.
-            # In such case we create a view with only single segment of bytes
-            # in the range.
-            if end <= next_offset:
-                range_ = segment[start - offset : end - offset]
-                segments.append(range_)
-                byte_length = len(range_)
-                break
-
-            # If start offeset falls with in current range (but not the end)
-            # we save matching buffer slice and update byteLength.
-            elif start < next_offset:
-                range_ = segment if start == offset else segment[start - offset :]
-                segments.append(range_)
-                byte_length = len(range_)
-
-        # Otherwise we already started collecting matching segments and are
-        # looking for the end of the slice. If it is with in the current range
-        # capture the segment and create a view.
-        elif end <= next_offset:
-            range = segment if end == next_offset else segment[0 : end - offset]
-            segments.append(range)
-            byte_length += len(range)
-            break
-
-        # If end is past current range we just save the segment and continue.
-        else:
-            segments.append(segment)
-            byte_length += len(segment)
-
-        offset = next_offset
-
-    return BufferView._create(segments, buffer.byte_offset + start, byte_length)
+    # Find segments holding the first and the last byte of the range and
+    # take all the segments in between.
+    offsets = index_of(buffer)
+    first = bisect_right(offsets, start)
+    last = bisect_right(offsets, end - 1, first)
+    segments = buffer.segments[first : last + 1]
+
+    # Trim the last segment first, because in case of single segment trimming
+    # the first one would shift offsets.
+    last_start = offsets[last - 1] if last > 0 else 0
+    if end < offsets[last]:
+        segments[-1] = segments[-1][: end - last_start]
+
+    first_start = offsets[first - 1] if first > 0 else 0
+    if start > first_start:
+        segments[0] = segments[0][start - first_start :]
+
+    return BufferView._create(segments, buffer.byte_offset + start, end - start)
 
 
 def total_byte_length(segments: list[memoryview]) -> int:
-    byte_length = 0
-    for segment in segments:
-        byte_length += len(segment)
-    return byte_length
+    return sum(map(len, segments))
@@ -0,0 +1,177 @@
+from hashlib import sha256
+from itertools import chain, islice
+from typing import Any, Optional, Sequence
+from ipld_unixfs.file.chunker.api import Chunk, StatelessChunker
+from ipld_unixfs.file.chunker.buffer import BufferView, slice_
+from ipld_unixfs.file.chunker import rolling
+from ipld_unixfs.file.chunker.rolling import BLOCK_SIZE, np, window
+
+default_min_chunk_size = 131072
+default_max_chunk_size = 524288
+default_mask_bits = 17
+
+WINDOW = 32
+"""
+Every byte is rotated once per step, so after 32 steps (for 32 bit hash) it is
+back in the original position and is removed from the hash by XOR.
+"""
+
+U32 = (1 << 32) - 1
+
+TABLE: Sequence[int] = tuple(
+    int.from_bytes(sha256(bytes([n])).digest()[8:12], "big") for n in range(256)
+)
+"""
+Default table mapping bytes to random 32 bit integers, derived from sha256 of
+the byte value. It is **not** the table used by kubo, to produce same chunks
+as kubo pass its `bytehash` table to the chunker.
+"""
+
+
+class BuzhashContext:
+    min_chunk_size: int
+    max_chunk_size: int
+    mask: int
+    table: Sequence[int]
+    vectorize: bool
+    """Whether NumPy is used to compute hashes."""
+    array: Any
+    """`table` as a NumPy array, when vectorized."""
+
+    def __init__(
+        self,
+        min_chunk_size: int = default_min_chunk_size,
+        max_chunk_size: int = default_max_chunk_size,
+        mask_bits: int = default_mask_bits,
+        table: Sequence[int] = TABLE,
+        vectorize: Optional[bool] = None,
+    ) -> None:
+        if min_chunk_size < WINDOW:
+            raise ValueError(f"min_chunk_size must be at least {WINDOW}")
+        if min_chunk_size > max_chunk_size:
+            raise ValueError("min_chunk_size must not be larger than max_chunk_size")
+        if len(table) != 256:
+            raise ValueError("table must have an entry for every byte value")
+        if vectorize and np is None:
+            raise ImportError("NumPy must be installed to vectorize buzhash chunker")
+
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.mask = (1 << mask_bits) - 1
+        self.table = tuple(table)
+        self.vectorize = np is not None if vectorize is None else vectorize
+        self.array = np.array(self.table, dtype=np.uint32) if self.vectorize else None
+
+
+class BuzhashChunker(StatelessChunker[BuzhashContext]):
+    """
+    Content defined chunker using [buzhash] (cyclic polynomial) rolling hash
+    over a 32 byte window, following the `buzhash` chunker of kubo. Chunk is
+    cut at the first size (no smaller than `min_chunk_size`) for which hash of
+    the last 32 bytes of the chunk has `mask_bits` low bits clear. Chunks never
+    exceed `max_chunk_size`.
+
+    Hash only depends on the bytes in the window, so chunker does not carry any
+    state across calls and waits for `max_chunk_size` bytes to be buffered (or
+    the end) before cutting.
+
+    [buzhash]:https://en.wikipedia.org/wiki/Rolling_hash#Cyclic_polynomial
+    """
+
+    name = "buzhash"
+    type = "Stateless"
+
+    def __init__(
+        self,
+        min_chunk_size: int = default_min_chunk_size,
+        max_chunk_size: int = default_max_chunk_size,
+        mask_bits: int = default_mask_bits,
+        table: Sequence[int] = TABLE,
+        vectorize: Optional[bool] = None,
+    ) -> None:
+        self.context = BuzhashContext(
+            min_chunk_size, max_chunk_size, mask_bits, table, vectorize
+        )
+
+    def cut(
+        self, context: BuzhashContext, buffer: Chunk, end: bool = False
+    ) -> list[int]:
+        if not isinstance(buffer, BufferView):
+            raise TypeError("buzhash chunker can only cut a BufferView")
+        return cut(context, buffer, end)
+
+
+def cut(context: BuzhashContext, buffer: BufferView, end: bool = False) -> list[int]:
+    return rolling.cut(context, buffer, end, find_boundary, find_boundary_vectorized)
+
+
+def find_boundary(
+    context: BuzhashContext, buffer: BufferView, offset: int, limit: int
+) -> int:
+    """
+    Returns the size of the chunk starting at `offset`, which is no larger than
+    `limit`.
+    """
+    min_size = context.min_chunk_size
+    if limit <= min_size:
+        return limit
+
+    view = slice_(buffer, slice(offset + min_size - WINDOW, offset + limit))
+    data = chain.from_iterable(view.segments)
+    outgoing = chain.from_iterable(view.segments)
+    table = context.table
+    mask = context.mask
+
+    hash = 0
+    for byte in islice(data, WINDOW):
+        hash = (((hash << 1) | (hash >> 31)) & U32) ^ table[byte]
+    if not hash & mask:
+        return min_size
+
+    size = min_size
+    for byte, out in zip(data, outgoing):
+        hash = (((hash << 1) | (hash >> 31)) & U32) ^ table[out] ^ table[byte]
+        size += 1
+        if not hash & mask:
+            return size
+
+    return limit
+
+
+def find_boundary_vectorized(
+    context: BuzhashContext, buffer: BufferView, offset: int, limit: int
+) -> int:
+    """
+    Same as `find_boundary` except that hashes are computed with NumPy for a
+    block of positions at a time. Hash for every position of the block is
+    computed in log2(32) passes by doubling the window covered by each hash:
+    `h(i) ^= rotl(h(i - n), n)` for `n` in 1, 2, 4, 8, 16.
+    """
+    min_size = context.min_chunk_size
+    if limit <= min_size:
+        return limit
+
+    table = context.array
+    mask = np.uint32(context.mask)
+    position = offset + min_size - 1
+    end = offset + limit
+    while position < end:
+        stop = min(position + BLOCK_SIZE, end)
+        data = np.frombuffer(window(buffer, position - WINDOW + 1, stop), np.uint8)
+        hashes = np.take(table, data)
+        shift = 1
+        while shift < WINDOW:
+            previous = hashes[:-shift]
+            hashes[shift:] ^= (previous << np.uint32(shift)) | (
+                previous >> np.uint32(32 - shift)
+            )
+            shift *= 2
+        hashes = hashes[WINDOW - 1 :]
+
+        matches = np.flatnonzero((hashes & mask) == 0)
+        if len(matches) > 0:
+            return position + int(matches[0]) - offset + 1
+
+        position += len(hashes)
+
+    return limit
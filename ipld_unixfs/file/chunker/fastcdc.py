@@ -0,0 +1,211 @@
+from hashlib import sha256
+from itertools import chain, islice
+from typing import Optional, Sequence
+from ipld_unixfs.file.chunker.api import Chunk, StatelessChunker
+from ipld_unixfs.file.chunker.buffer import BufferView, slice_
+from ipld_unixfs.file.chunker import rolling
+from ipld_unixfs.file.chunker.rolling import BLOCK_SIZE, np, window
+
+default_min_chunk_size = 65536
+default_avg_chunk_size = 262144
+default_max_chunk_size = 1048576
+default_normalization = 2
+
+WINDOW = 64
+"""
+Gear hash is shifted left on every byte, so after 64 bytes contribution of the
+oldest byte is shifted out. Hash at any given position is therefore defined
+by the 64 bytes ending at that position.
+"""
+
+U64 = (1 << 64) - 1
+
+GEAR: Sequence[int] = tuple(
+    int.from_bytes(sha256(bytes([n])).digest()[0:8], "big") for n in range(256)
+)
+"""
+Table mapping bytes to random 64 bit integers. It is derived from sha256 of the
+byte value so it can be reproduced by other implementations.
+"""
+
+GEAR_ARRAY = None if np is None else np.array(GEAR, dtype=np.uint64)
+"""`GEAR` table as a NumPy array used by `find_boundary_vectorized`."""
+
+
+def mask(bits: int) -> int:
+    """
+    Creates a mask with given number of bits set, evenly spread across the
+    upper 48 bits of the hash. Lower bits of the gear hash depend only on the
+    last few bytes, so they make poor boundary candidates.
+    """
+    value = 0
+    for n in range(bits):
+        value |= 1 << (63 - (n * 48) // bits)
+    return value
+
+
+class FastCDCContext:
+    min_chunk_size: int
+    avg_chunk_size: int
+    max_chunk_size: int
+    mask_s: int
+    """Harder to satisfy mask used for chunks smaller than average size."""
+    mask_l: int
+    """Easier to satisfy mask used for chunks larger than average size."""
+    vectorize: bool
+    """Whether NumPy is used to find boundary candidates."""
+
+    def __init__(
+        self,
+        min_chunk_size: int = default_min_chunk_size,
+        avg_chunk_size: int = default_avg_chunk_size,
+        max_chunk_size: int = default_max_chunk_size,
+        normalization: int = default_normalization,
+        vectorize: Optional[bool] = None,
+    ) -> None:
+        if min_chunk_size < WINDOW:
+            raise ValueError(f"min_chunk_size must be at least {WINDOW}")
+        if not min_chunk_size <= avg_chunk_size <= max_chunk_size:
+            raise ValueError(
+                "chunk sizes must satisfy min_chunk_size <= avg_chunk_size <= max_chunk_size"
+            )
+        if vectorize and np is None:
+            raise ImportError("NumPy must be installed to vectorize FastCDC")
+
+        bits = avg_chunk_size.bit_length() - 1
+        self.min_chunk_size = min_chunk_size
+        self.avg_chunk_size = avg_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.mask_s = mask(min(bits + normalization, 48))
+        self.mask_l = mask(max(bits - normalization, 1))
+        self.vectorize = np is not None if vectorize is None else vectorize
+
+
+class FastCDCChunker(StatelessChunker[FastCDCContext]):
+    """
+    Content defined chunker implementing [FastCDC] with normalized chunking.
+    Chunk boundary is placed after the first byte at which gear hash matches
+    `mask_s` (while chunk is smaller than average size) or `mask_l` (once it
+    is larger) and chunk is at least `min_chunk_size` long. Chunks never exceed
+    `max_chunk_size`.
+
+    Boundary only depends on the content of the chunk, so chunker does not need
+    to carry any state across calls. It also defers cutting until it has
+    `max_chunk_size` bytes to look at (or the end is reached), so every byte is
+    scanned once no matter how small the writes are.
+
+    [FastCDC]:https://www.usenix.org/conference/atc16/technical-sessions/presentation/xia
+    """
+
+    name = "fastcdc"
+    type = "Stateless"
+
+    def __init__(
+        self,
+        min_chunk_size: int = default_min_chunk_size,
+        avg_chunk_size: int = default_avg_chunk_size,
+        max_chunk_size: int = default_max_chunk_size,
+        normalization: int = default_normalization,
+        vectorize: Optional[bool] = None,
+    ) -> None:
+        self.context = FastCDCContext(
+            min_chunk_size, avg_chunk_size, max_chunk_size, normalization, vectorize
+        )
+
+    def cut(
+        self, context: FastCDCContext, buffer: Chunk, end: bool = False
+    ) -> list[int]:
+        if not isinstance(buffer, BufferView):
+            raise TypeError("fastcdc chunker can only cut a BufferView")
+        return cut(context, buffer, end)
+
+
+def cut(context: FastCDCContext, buffer: BufferView, end: bool = False) -> list[int]:
+    return rolling.cut(context, buffer, end, find_boundary, find_boundary_vectorized)
+
+
+def find_boundary(
+    context: FastCDCContext, buffer: BufferView, offset: int, limit: int
+) -> int:
+    """
+    Returns the size of the chunk starting at `offset`, which is no larger than
+    `limit`.
+    """
+    min_size = context.min_chunk_size
+    if limit <= min_size:
+        return limit
+
+    # Start hashing a window before the minimum size, so that hash at the first
+    # candidate position covers a full window.
+    view = slice_(buffer, slice(offset + min_size - WINDOW, offset + limit))
+    data = chain.from_iterable(view.segments)
+    gear = GEAR
+    hash = 0
+    for byte in islice(data, WINDOW - 1):
+        hash = ((hash << 1) + gear[byte]) & U64
+
+    size = min_size - 1
+    mask_s = context.mask_s
+    for byte in islice(data, max(min(context.avg_chunk_size, limit + 1) - min_size, 0)):
+        hash = ((hash << 1) + gear[byte]) & U64
+        size += 1
+        if not hash & mask_s:
+            return size
+
+    mask_l = context.mask_l
+    for byte in data:
+        hash = ((hash << 1) + gear[byte]) & U64
+        size += 1
+        if not hash & mask_l:
+            return size
+
+    return limit
+
+
+def find_boundary_vectorized(
+    context: FastCDCContext, buffer: BufferView, offset: int, limit: int
+) -> int:
+    """
+    Same as `find_boundary` except that gear hashes are computed with NumPy for
+    a block of positions at a time. Hash for every position of the block is
+    computed in log2(64) passes by doubling the window covered by each hash:
+    `h(i) += h(i - n) << n` for `n` in 1, 2, 4 .. 32.
+    """
+    min_size = context.min_chunk_size
+    if limit <= min_size:
+        return limit
+
+    table = GEAR_ARRAY
+    mask_s = np.uint64(context.mask_s)
+    mask_l = np.uint64(context.mask_l)
+    # Chunk of `size` bytes ends at `offset + size - 1`, positions from `normal`
+    # are checked against `mask_l`.
+    normal = offset + min(context.avg_chunk_size, limit + 1) - 1
+    position = offset + min_size - 1
+    end = offset + limit
+    while position < end:
+        # Every block is preceded by a window worth of bytes so that hashes
+        # for all the positions in the block cover a full window.
+        data = window(buffer, position - WINDOW + 1, min(position + BLOCK_SIZE, end))
+        hashes = np.take(table, np.frombuffer(data, dtype=np.uint8))
+        shift = 1
+        while shift < WINDOW:
+            hashes[shift:] += hashes[:-shift] << np.uint64(shift)
+            shift *= 2
+        hashes = hashes[WINDOW - 1 :]
+
+        if position < normal:
+            small = hashes[0 : normal - position] & mask_s
+            matches = np.flatnonzero(small == 0)
+            if len(matches) > 0:
+                return position + int(matches[0]) - offset + 1
+
+        if position + len(hashes) > normal:
+            start = max(normal - position, 0)
+            matches = np.flatnonzero((hashes[start:] & mask_l) == 0)
+            if len(matches) > 0:
+                return position + start + int(matches[0]) - offset + 1
+
+        position += len(hashes)
+
+    return limit
@@ -1,4 +1,5 @@
-from math import floor
+from itertools import chain, repeat
+from typing import Any, Iterator, Optional, Sequence, Union, overload
 from ipld_unixfs.file.chunker.api import Chunk, StatelessChunker
 
 default_max_chunk_size = 262144
@@ -11,6 +12,75 @@ class FixedSizeContext:
         self.max_chunk_size = max_chunk_size
 
 
+class FixedSizes(Sequence[int]):
+    """
+    Chunk sizes produced by the fixed size chunker: `chunk_count` chunks of
+    `size` bytes optionally followed by a `tail` chunk. Sizes are computed on
+    demand, so cutting a buffer takes the same time regardless of how many
+    chunks fit.
+    """
+
+    __slots__ = ("chunk_count", "size", "tail")
+
+    chunk_count: int
+    size: int
+    tail: Optional[int]
+
+    def __init__(self, chunk_count: int, size: int, tail: Optional[int] = None) -> None:
+        self.chunk_count = chunk_count
+        self.size = size
+        self.tail = tail
+
+    def __len__(self) -> int:
+        return self.chunk_count if self.tail is None else self.chunk_count + 1
+
+    @overload
+    def __getitem__(self, index: int) -> int: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[int]: ...
+    def __getitem__(self, index: Union[int, slice]) -> Union[int, list[int]]:
+        if isinstance(index, slice):
+            return [self[n] for n in range(len(self))[index]]
+        length = len(self)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("index out of range")
+        if index < self.chunk_count:
+            return self.size
+        return self.tail if self.tail is not None else self.size
+
+    def __iter__(self) -> Iterator[int]:
+        sizes = repeat(self.size, self.chunk_count)
+        return sizes if self.tail is None else chain(sizes, (self.tail,))
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, FixedSizes):
+            return self.normalize() == other.normalize()
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def normalize(self) -> tuple[int, int, Optional[int]]:
+        """
+        Returns `(chunk_count, size, tail)` which is the same for all the
+        instances with the same sizes, e.g. tail of `size` bytes is counted as
+        one more chunk.
+        """
+        count, size, tail = self.chunk_count, self.size, self.tail
+        if count == 0:
+            return (0, 0, None) if tail is None else (1, tail, None)
+        if tail == size:
+            return (count + 1, size, None)
+        return (count, size, tail)
+
+    def __repr__(self) -> str:
+        return (
+            f"FixedSizes(chunk_count={self.chunk_count}, "
+            f"size={self.size}, tail={self.tail})"
+        )
+
+
 class FixedSizeChunker(StatelessChunker[FixedSizeContext]):
     name = "fixed"
     type = "Stateless"
@@ -20,10 +90,8 @@ class FixedSizeChunker(StatelessChunker[FixedSizeContext]):
 
     def cut(
         self, context: FixedSizeContext, buffer: Chunk, end: bool = False
-    ) -> list[int]:
+    ) -> FixedSizes:
         # number of fixed size chunks that would fit
-        n = floor(buffer.byte_length / context.max_chunk_size)
-        chunks = list(map(lambda _: context.max_chunk_size, range(n)))
-        if end:
-            chunks.append(buffer.byte_length - n * context.max_chunk_size)
-        return chunks
+        n = buffer.byte_length // context.max_chunk_size
+        tail = buffer.byte_length - n * context.max_chunk_size if end else None
+        return FixedSizes(n, context.max_chunk_size, tail)
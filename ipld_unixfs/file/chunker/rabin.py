@@ -0,0 +1,237 @@
+from itertools import chain, islice
+from typing import Any, Optional, Sequence
+from ipld_unixfs.file.chunker.api import Chunk, StatelessChunker
+from ipld_unixfs.file.chunker.buffer import BufferView, slice_
+from ipld_unixfs.file.chunker import rolling
+from ipld_unixfs.file.chunker.rolling import BLOCK_SIZE, np, window
+
+default_avg_chunk_size = 262144
+default_min_chunk_size = default_avg_chunk_size // 3
+default_max_chunk_size = default_avg_chunk_size + default_avg_chunk_size // 2
+
+default_polynomial = 17437180132763653
+"""
+Irreducible polynomial used by go-ipfs and js-ipfs rabin chunkers.
+"""
+
+default_window_size = 16
+
+
+def degree(polynomial: int) -> int:
+    return polynomial.bit_length() - 1
+
+
+def mod(value: int, polynomial: int) -> int:
+    """
+    Remainder of the division of two polynomials over GF(2).
+    """
+    k = degree(polynomial)
+    while degree(value) >= k:
+        value ^= polynomial << (degree(value) - k)
+    return value
+
+
+class RabinContext:
+    min_chunk_size: int
+    avg_chunk_size: int
+    max_chunk_size: int
+    polynomial: int
+    window_size: int
+    mask: int
+    shift: int
+    """Shift leaving just top 8 bits of the fingerprint."""
+    mod_table: Sequence[int]
+    """
+    Reduces fingerprint after appending a byte. Indexed by the top 8 bits of
+    the fingerprint, entry holds those bits (so XOR clears them) along with
+    their value modulo polynomial.
+    """
+    out_table: Sequence[int]
+    """
+    Removes the byte leaving the window from the fingerprint. Indexed by the
+    byte, entry holds fingerprint of the byte followed by `window_size - 1`
+    zeros.
+    """
+    vectorize: bool
+    """Whether NumPy is used to compute fingerprints."""
+    tables: Sequence[Any]
+    """
+    Fingerprints of every byte value followed by `n` zero bytes, for each `n`
+    in the window, as NumPy arrays. Only computed when vectorizing.
+    """
+
+    def __init__(
+        self,
+        min_chunk_size: int = default_min_chunk_size,
+        avg_chunk_size: int = default_avg_chunk_size,
+        max_chunk_size: int = default_max_chunk_size,
+        polynomial: int = default_polynomial,
+        window_size: int = default_window_size,
+        vectorize: Optional[bool] = None,
+    ) -> None:
+        if min_chunk_size < window_size:
+            raise ValueError(f"min_chunk_size must be at least {window_size}")
+        if not min_chunk_size <= avg_chunk_size <= max_chunk_size:
+            raise ValueError(
+                "chunk sizes must satisfy min_chunk_size <= avg_chunk_size <= max_chunk_size"
+            )
+        if vectorize and np is None:
+            raise ImportError("NumPy must be installed to vectorize rabin chunker")
+
+        k = degree(polynomial)
+        self.min_chunk_size = min_chunk_size
+        self.avg_chunk_size = avg_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.polynomial = polynomial
+        self.window_size = window_size
+        self.mask = (1 << (avg_chunk_size.bit_length() - 1)) - 1
+        self.shift = k - 8
+        self.mod_table = tuple(mod(n << k, polynomial) | (n << k) for n in range(256))
+        self.out_table = tuple(
+            mod(n << (8 * (window_size - 1)), polynomial) for n in range(256)
+        )
+        self.vectorize = np is not None if vectorize is None else vectorize
+        self.tables = (
+            [
+                np.array(
+                    [mod(byte << (8 * n), polynomial) for byte in range(256)],
+                    dtype=np.uint64,
+                )
+                for n in range(window_size)
+            ]
+            if self.vectorize
+            else []
+        )
+
+
+class RabinChunker(StatelessChunker[RabinContext]):
+    """
+    Content defined chunker computing a rolling [Rabin fingerprint] over a
+    sliding window, same as the `rabin-[min]-[avg]-[max]` chunker of go-ipfs.
+    Chunk boundary is placed after the first byte at which the fingerprint
+    of the window ending at that byte has `log2(avg)` low bits clear, once
+    chunk is at least `min_chunk_size` long. Chunks never exceed
+    `max_chunk_size`.
+
+    Fingerprint only depends on the bytes in the window, so chunker does not
+    carry any state across calls. Just like `FastCDCChunker` it waits for
+    `max_chunk_size` bytes to be buffered (or the end) before cutting.
+
+    [Rabin fingerprint]:https://en.wikipedia.org/wiki/Rabin_fingerprint
+    """
+
+    name = "rabin"
+    type = "Stateless"
+
+    def __init__(
+        self,
+        min_chunk_size: int = default_min_chunk_size,
+        avg_chunk_size: int = default_avg_chunk_size,
+        max_chunk_size: int = default_max_chunk_size,
+        polynomial: int = default_polynomial,
+        window_size: int = default_window_size,
+        vectorize: Optional[bool] = None,
+    ) -> None:
+        self.context = RabinContext(
+            min_chunk_size,
+            avg_chunk_size,
+            max_chunk_size,
+            polynomial,
+            window_size,
+            vectorize,
+        )
+
+    def cut(self, context: RabinContext, buffer: Chunk, end: bool = False) -> list[int]:
+        if not isinstance(buffer, BufferView):
+            raise TypeError("rabin chunker can only cut a BufferView")
+        return cut(context, buffer, end)
+
+
+def with_avg(avg_chunk_size: int) -> RabinChunker:
+    """
+    Creates chunker with the same sizes go-ipfs derives from the average size.
+    """
+    return RabinChunker(
+        avg_chunk_size // 3, avg_chunk_size, avg_chunk_size + avg_chunk_size // 2
+    )
+
+
+def cut(context: RabinContext, buffer: BufferView, end: bool = False) -> list[int]:
+    return rolling.cut(context, buffer, end, find_boundary, find_boundary_vectorized)
+
+
+def find_boundary(
+    context: RabinContext, buffer: BufferView, offset: int, limit: int
+) -> int:
+    """
+    Returns the size of the chunk starting at `offset`, which is no larger than
+    `limit`.
+    """
+    min_size = context.min_chunk_size
+    if limit <= min_size:
+        return limit
+
+    # Fingerprint of the first window is computed by appending its bytes to
+    # an empty window, after that each byte also slides one out.
+    window_size = context.window_size
+    view = slice_(buffer, slice(offset + min_size - window_size, offset + limit))
+    data = chain.from_iterable(view.segments)
+    outgoing = chain.from_iterable(view.segments)
+    mod_table = context.mod_table
+    out_table = context.out_table
+    shift = context.shift
+    mask = context.mask
+
+    digest = 0
+    for byte in islice(data, window_size):
+        digest = ((digest << 8) | byte) ^ mod_table[digest >> shift]
+    if not digest & mask:
+        return min_size
+
+    size = min_size
+    for byte, out in zip(data, outgoing):
+        digest ^= out_table[out]
+        digest = ((digest << 8) | byte) ^ mod_table[digest >> shift]
+        size += 1
+        if not digest & mask:
+            return size
+
+    return limit
+
+
+def find_boundary_vectorized(
+    context: RabinContext, buffer: BufferView, offset: int, limit: int
+) -> int:
+    """
+    Same as `find_boundary` except that fingerprints are computed with NumPy
+    for a block of positions at a time. Fingerprint is linear over GF(2), so
+    fingerprint of a window is the XOR of fingerprints of each of its bytes
+    shifted into place, which are looked up from per offset tables.
+    """
+    min_size = context.min_chunk_size
+    if limit <= min_size:
+        return limit
+
+    window_size = context.window_size
+    tables = context.tables
+    mask = np.uint64(context.mask)
+    position = offset + min_size - 1
+    end = offset + limit
+    while position < end:
+        stop = min(position + BLOCK_SIZE, end)
+        data = np.frombuffer(window(buffer, position - window_size + 1, stop), np.uint8)
+        count = len(data) - window_size + 1
+        digests = np.zeros(count, dtype=np.uint64)
+        for n in range(window_size):
+            # Byte `n` positions before the end of the window
+            start = window_size - 1 - n
+            digests ^= np.take(tables[n], data[start : start + count])
+
+        matches = np.flatnonzero((digests & mask) == 0)
+        if len(matches) > 0:
+            return position + int(matches[0]) - offset + 1
+
+        position += count
+
+    return limit
+
@@ -0,0 +1,74 @@
+"""
+Parts shared by the content defined chunkers, which find chunk boundaries
+with a rolling hash over a window of bytes. Hash only depends on the bytes in
+the window, so chunkers do not carry any state across calls and wait for
+`max_chunk_size` bytes to be buffered (or the end) before cutting.
+"""
+
+from typing import Callable, Protocol, TypeVar, Union
+from ipld_unixfs.file.chunker.buffer import BufferView, slice_, tobytes
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+__all__ = ["BLOCK_SIZE", "RollingContext", "cut", "np", "window"]
+
+BLOCK_SIZE = 65536
+"""
+Number of positions hashed per vectorized pass. Hashing stops at the first
+boundary, so this is also the most work wasted per chunk.
+"""
+
+
+class RollingContext(Protocol):
+    max_chunk_size: int
+    vectorize: bool
+    """Whether NumPy is used to find boundaries."""
+
+
+C = TypeVar("C", bound=RollingContext)
+
+FindBoundary = Callable[[C, BufferView, int, int], int]
+"""
+Returns the size of the chunk starting at the given offset, which is no larger
+than the given limit.
+"""
+
+
+def cut(
+    context: C,
+    buffer: BufferView,
+    end: bool,
+    find_boundary: FindBoundary[C],
+    find_boundary_vectorized: FindBoundary[C],
+) -> list[int]:
+    """
+    Cuts buffer into chunks with the boundary search of the chunker. Unless
+    it is the `end`, bytes after the last full `max_chunk_size` are left for
+    the next call, as their boundary may depend on the bytes yet to come.
+    """
+    sizes: list[int] = []
+    remaining = buffer.byte_length
+    if remaining < context.max_chunk_size and not end:
+        return sizes
+
+    find = find_boundary_vectorized if context.vectorize else find_boundary
+    offset = 0
+    while remaining >= context.max_chunk_size or (end and remaining > 0):
+        size = find(context, buffer, offset, min(remaining, context.max_chunk_size))
+        sizes.append(size)
+        offset += size
+        remaining -= size
+
+    return sizes
+
+
+def window(buffer: BufferView, start: int, end: int) -> Union[memoryview, bytes]:
+    """
+    Returns buffer bytes in the given range, only joining segments if the
+    range spans more than one.
+    """
+    view = slice_(buffer, slice(start, end))
+    return view.segments[0] if len(view.segments) == 1 else tobytes(view)
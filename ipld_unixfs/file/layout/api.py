@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from typing import Generic, Literal, Optional, Protocol, Sequence, TypeVar, Union
 from ipld_unixfs.multiformats.codecs.api import BlockEncoder
 from ipld_unixfs.file.chunker.api import Chunk
+from ipld_unixfs.file.chunker.buffer import BufferView
 from ipld_unixfs.unixfs import Metadata, File, FileLink
 
 Layout = TypeVar("Layout")
@@ -43,13 +44,16 @@ class CloseResult:
 PB = Literal[0x70]
 RAW = Literal[0x55]
 
-FileChunkEncoder = Union[BlockEncoder[PB, bytes], BlockEncoder[RAW, bytes]]
+FileChunkEncoder = Union[
+    BlockEncoder[PB, Union[bytes, BufferView]],
+    BlockEncoder[RAW, Union[bytes, BufferView]],
+]
 
 
 class FileEncoder(Protocol):
     code: PB
 
-    def encode(self, file: File) -> bytes: ...
+    def encode(self, file: File) -> Union[bytes, bytearray]: ...
 
 
 class LayoutEngine(Protocol, Generic[Layout]):
@@ -140,10 +140,68 @@ class BalancedLayout(LayoutEngine[Balanced]):
         return close(layout, metadata)
 
 
+class MutableBalanced:
+    """
+    Same as `Balanced` except that state is updated in place by `write_mutable`
+    and `close_mutable` instead of being copied, so that writing a chunk takes
+    amortized constant time. Use it when no earlier state is reused after
+    write, which is the case when file is imported in a single pass.
+    """
+
+    __slots__ = ("width", "head", "leaf_index", "node_index", "last_id")
+
+    width: int
+    head: Optional[Chunk]
+    leaf_index: list[int]
+    node_index: list[list[int]]
+    last_id: int
+
+    def __init__(
+        self,
+        width: int,
+        head: Optional[Chunk] = None,
+        leaf_index: Optional[list[int]] = None,
+        node_index: Optional[list[list[int]]] = None,
+        last_id: int = 0,
+    ):
+        self.width = width
+        self.head = head
+        self.leaf_index = [] if leaf_index is None else leaf_index
+        self.node_index = [] if node_index is None else node_index
+        self.last_id = last_id
+
+
+class MutableBalancedLayout(LayoutEngine[MutableBalanced]):
+    width: int
+
+    def __init__(self, width: int):
+        self.width = width
+
+    def open(self) -> MutableBalanced:
+        return open_mutable(self.width)
+
+    def write(
+        self, layout: MutableBalanced, chunks: Sequence[Chunk]
+    ) -> WriteResult[MutableBalanced]:
+        return write_mutable(layout, chunks)
+
+    def close(
+        self, layout: MutableBalanced, metadata: Optional[Metadata] = None
+    ) -> CloseResult:
+        return close_mutable(layout, metadata)
+
+
 def with_width(width: int) -> LayoutEngine[Balanced]:
     return BalancedLayout(width)
 
 
+def mutable(width: int) -> LayoutEngine[MutableBalanced]:
+    """
+    Creates balanced layout engine that updates its state in place.
+    """
+    return MutableBalancedLayout(width)
+
+
 @dataclass(frozen=True)
 class Options:
     width: int
@@ -160,132 +218,151 @@ def write(layout: Balanced, chunks: Sequence[Chunk]) -> WriteResult[Balanced]:
     if len(chunks) == 0:
         return WriteResult(layout, EMPTY, EMPTY)
 
-    last_id = layout.last_id
+    result = write_mutable(thaw(layout), chunks)
+    return WriteResult(freeze(result.layout), result.nodes, result.leaves)
 
-    # We need to hold on to the first chunk until we either get a second chunk
-    # (at which point we know our layout will have branches) or until we close
-    # (at which point our layout will be single leaf or node depneding on
-    # metadata)
-    head: Optional[Chunk] = None
-    slices: list[Chunk] = []
 
-    if layout.head is not None:
-        # If we had a head we have more then two chunks (we already checked
-        # chunks weren't empty) so we process head along with other chunks.
-        slices.append(layout.head)
-        slices.extend(chunks)
-    elif len(chunks) == 1 and len(layout.leaf_index) == 0:
-        # If we have no head no leaves and got only one chunk we have to save it
-        # until we can decide what to do with it.
-        head = chunks[0]
-    else:
-        # Otherwise we have no head but got enough chunks to know we'll have a
-        # node.
-        slices.extend(chunks)
-
-    if len(slices) == 0:
-        return WriteResult(
-            Balanced(
-                layout.width,
-                head,
-                layout.leaf_index,
-                layout.node_index,
-                layout.last_id,
-            ),
-            EMPTY,
-            EMPTY,
-        )
+def flush(
+    state: Balanced,
+    leaves: Sequence[Leaf] = [],
+    nodes: Sequence[Branch] = [],
+    close: bool = False,
+) -> WriteResult[Balanced]:
+    layout = thaw(state)
+    created = flush_mutable(layout, close)
+    return WriteResult(freeze(layout), [*nodes, *created], leaves)
 
-    leaf_index: list[int] = []
-    leaf_index.extend(layout.leaf_index)
-    leaves = []
 
-    for chunk in slices:
-        last_id += 1
-        leaf = Leaf(last_id, chunk, None)
-        leaves.append(leaf)
-        leaf_index.append(leaf.id)
+def close(layout: Balanced, metadata: Optional[Metadata] = None) -> CloseResult:
+    return close_mutable(thaw(layout), metadata)
 
-    if len(leaf_index) > layout.width:
-        return flush(
-            Balanced(layout.width, head, leaf_index, layout.node_index, last_id),
-            leaves,
-        )
 
-    return WriteResult(
-        Balanced(layout.width, head, leaf_index, layout.node_index, last_id),
-        EMPTY,
-        leaves,
+def thaw(state: Balanced) -> MutableBalanced:
+    """
+    Copies `state` into a mutable layout, so that `state` remains intact when
+    the copy is updated.
+    """
+    return MutableBalanced(
+        state.width,
+        state.head,
+        list(state.leaf_index),
+        [list(row) for row in state.node_index],
+        state.last_id,
     )
 
 
-def _grow(index: list[list[int]], length: int) -> None:
-    while len(index) < length:
-        index.append([])
+def freeze(layout: MutableBalanced) -> Balanced:
+    return Balanced(
+        layout.width,
+        layout.head,
+        layout.leaf_index,
+        layout.node_index,
+        layout.last_id,
+    )
 
 
-def flush(
-    state: Balanced,
-    leaves: Sequence[Leaf] = [],
-    nodes: Sequence[Branch] = [],
-    close: bool = False,
-) -> WriteResult[Balanced]:
-    last_id = state.last_id
-    node_index: list[list[int]] = []
-    for row in state.node_index:
-        node_index.append(list(row))
-    leaf_index = list(state.leaf_index)
-    width = state.width
-    nodes = list(nodes)
-
-    # Move leaves into nodes
-    while len(leaf_index) > width or (len(leaf_index) > 0 and close):
-        _grow(node_index, 1)
-        last_id += 1
-        node = Branch(last_id, leaf_index[0:width], None)
-        leaf_index = leaf_index[width:]
-        node_index[0].append(node.id)
-        nodes.append(node)
+def open_mutable(width: int = defaults.width) -> MutableBalanced:
+    return MutableBalanced(width)
+
+
+def write_mutable(
+    layout: MutableBalanced, chunks: Sequence[Chunk]
+) -> WriteResult[MutableBalanced]:
+    """
+    Same as `write` except that `layout` is updated in place and returned.
+    """
+    if len(chunks) == 0:
+        return WriteResult(layout, EMPTY, EMPTY)
+
+    if layout.head is None and len(chunks) == 1 and len(layout.leaf_index) == 0:
+        layout.head = chunks[0]
+        return WriteResult(layout, EMPTY, EMPTY)
 
+    leaf_index = layout.leaf_index
+    leaves: list[Leaf] = []
+    if layout.head is not None:
+        layout.last_id += 1
+        leaves.append(Leaf(layout.last_id, layout.head, None))
+        leaf_index.append(layout.last_id)
+        layout.head = None
+
+    for chunk in chunks:
+        layout.last_id += 1
+        leaves.append(Leaf(layout.last_id, chunk, None))
+        leaf_index.append(layout.last_id)
+
+    if len(leaf_index) > layout.width:
+        return WriteResult(layout, flush_mutable(layout), leaves)
+
+    return WriteResult(layout, EMPTY, leaves)
+
+
+def flush_mutable(layout: MutableBalanced, close: bool = False) -> list[Branch]:
+    """
+    Packs overflowing rows (or all but the top row on `close`) of the `layout`
+    into branch nodes which are added to the row above. Returns created nodes.
+
+    Rows are processed bottom up and every row is visited at most once. Unless
+    closing, we stop at the first row that got no new nodes, as rows above it
+    are within width since the last flush.
+    """
+    width = layout.width
+    node_index = layout.node_index
+    nodes: list[Branch] = []
+    row = layout.leaf_index
+    # Depth of the row nodes packed from `row` are added to, leaves are packed
+    # into row `0`.
     depth = 0
-    while depth < len(node_index):
+    while True:
+        length = len(row)
+        # On close leaves and all but the top row are packed entirely. Top row
+        # is only packed if it overflows, at which point it is no longer top.
+        limit = (
+            0
+            if close and (depth == 0 or depth < len(node_index) or length > width)
+            else width
+        )
+        offset = 0
+        while length - offset > limit:
+            if depth == len(node_index):
+                node_index.append([])
+            layout.last_id += 1
+            node = Branch(layout.last_id, row[offset : offset + width], None)
+            offset += width
+            node_index[depth].append(node.id)
+            nodes.append(node)
+
+        if offset > 0:
+            del row[0:offset]
+        elif not close:
+            break
+
+        if depth == len(node_index):
+            break
         row = node_index[depth]
         depth += 1
 
-        while len(row) > width or (len(row) > 0 and depth < len(node_index)):
-            last_id += 1
-            node = Branch(last_id, row[0:width], None)
-            row = row[width:]
-            _grow(node_index, depth + 1)
-            nodes.append(node)
-
-    return WriteResult(
-        Balanced(state.width, state.head, leaf_index, node_index, last_id),
-        nodes,
-        leaves,
-    )
+    return nodes
 
 
-def close(layout: Balanced, metadata: Optional[Metadata] = None) -> CloseResult:
+def close_mutable(
+    layout: MutableBalanced, metadata: Optional[Metadata] = None
+) -> CloseResult:
+    """
+    Same as `close` except that `layout` is consumed in the process.
+    """
     if layout.head is not None:
         return CloseResult(Leaf(1, layout.head, metadata), EMPTY, EMPTY)
 
     if len(layout.leaf_index) == 0:
         return CloseResult(Leaf(1, None, metadata), EMPTY, EMPTY)
 
-    # Flush with width 1 so all the items will be propagate up the tree
-    # and height of `depth-1` so we propagate nodes all but from the top
-    # most level.
-    result = flush(layout, EMPTY, EMPTY, True)
-    nodes = result.nodes
-    node_index = result.layout.node_index
-    height = len(node_index) - 1
-    top = node_index[height]
+    nodes = flush_mutable(layout, True)
+    top = layout.node_index[-1]
 
     if len(top) == 1:
-        root = nodes[len(nodes) - 1]
-        nodes = nodes[0:-1]
+        root = nodes.pop()
         return CloseResult(root, nodes, EMPTY)
 
-    root = Branch(result.layout.last_id + 1, top, metadata)
+    root = Branch(layout.last_id + 1, list(top), metadata)
     return CloseResult(root, nodes, EMPTY)
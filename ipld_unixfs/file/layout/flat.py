@@ -0,0 +1,121 @@
+from typing import Optional, Sequence
+from ipld_unixfs.file.chunker.api import Chunk
+from ipld_unixfs.file.layout.api import (
+    Branch,
+    CloseResult,
+    LayoutEngine,
+    Leaf,
+    WriteResult,
+)
+from ipld_unixfs.file.layout import balanced as Balanced
+from ipld_unixfs.unixfs import Metadata
+
+EMPTY = ()
+
+
+class Flat:
+    """
+    Type representing a state of the flat layout, where a single root links all
+    the leaves. Leaves are assigned consecutive ids starting from `1`, so the
+    state only needs to track the last id, root links `range(1, last_id + 1)`.
+
+    Once number of leaves exceeds `width` layout no longer fits a single node
+    and it switches to the balanced layout (`balanced` holds its state), which
+    produces exactly the same tree balanced layout would have produced.
+    """
+
+    width: int
+    head: Optional[Chunk]
+    last_id: int
+    balanced: Optional[Balanced.Balanced]
+
+    def __init__(
+        self,
+        width: int,
+        head: Optional[Chunk] = None,
+        last_id: int = 0,
+        balanced: Optional[Balanced.Balanced] = None,
+    ):
+        self.width = width
+        self.head = head
+        self.last_id = last_id
+        self.balanced = balanced
+
+
+class FlatLayout(LayoutEngine[Flat]):
+    width: int
+
+    def __init__(self, width: int):
+        self.width = width
+
+    def open(self) -> Flat:
+        return open(self.width)
+
+    def write(self, layout: Flat, chunks: Sequence[Chunk]) -> WriteResult[Flat]:
+        return write(layout, chunks)
+
+    def close(self, layout: Flat, metadata: Optional[Metadata] = None) -> CloseResult:
+        return close(layout, metadata)
+
+
+def with_width(width: int) -> LayoutEngine[Flat]:
+    return FlatLayout(width)
+
+
+defaults = Balanced.defaults
+
+
+def open(width: int = defaults.width) -> Flat:
+    return Flat(width)
+
+
+def write(layout: Flat, chunks: Sequence[Chunk]) -> WriteResult[Flat]:
+    if layout.balanced is not None:
+        result = Balanced.write(layout.balanced, chunks)
+        return WriteResult(
+            Flat(layout.width, None, 0, result.layout), result.nodes, result.leaves
+        )
+
+    if len(chunks) == 0:
+        return WriteResult(layout, EMPTY, EMPTY)
+
+    # Just like balanced layout we hold on to the first chunk until we know
+    # whether we need a root node.
+    if layout.head is None and len(chunks) == 1 and layout.last_id == 0:
+        return WriteResult(Flat(layout.width, chunks[0]), EMPTY, EMPTY)
+
+    last_id = layout.last_id
+    leaves: list[Leaf] = []
+    if layout.head is not None:
+        last_id += 1
+        leaves.append(Leaf(last_id, layout.head, None))
+    for chunk in chunks:
+        last_id += 1
+        leaves.append(Leaf(last_id, chunk, None))
+
+    if last_id > layout.width:
+        # Leaves no longer fit a single node, so we carry on as balanced layout
+        # which would have accumulated the same leaves up to this point.
+        state = Balanced.Balanced(
+            layout.width, None, list(range(1, last_id + 1)), [], last_id
+        )
+        result = Balanced.flush(state, leaves)
+        return WriteResult(
+            Flat(layout.width, None, 0, result.layout), result.nodes, result.leaves
+        )
+
+    return WriteResult(Flat(layout.width, None, last_id), EMPTY, leaves)
+
+
+def close(layout: Flat, metadata: Optional[Metadata] = None) -> CloseResult:
+    if layout.balanced is not None:
+        return Balanced.close(layout.balanced, metadata)
+
+    if layout.head is not None:
+        return CloseResult(Leaf(1, layout.head, metadata), EMPTY, EMPTY)
+
+    if layout.last_id == 0:
+        return CloseResult(Leaf(1, None, metadata), EMPTY, EMPTY)
+
+    root = Branch(layout.last_id + 1, range(1, layout.last_id + 1), metadata)
+    return CloseResult(root, EMPTY, EMPTY)
@@ -7,6 +7,7 @@ from typing import (
     Sequence,
     TypeVar,
     TypedDict,
+    cast,
 )
 from ipld_unixfs.file.layout.api import Branch, NodeID
 from ipld_unixfs.file.layout.queue.api import (
@@ -14,6 +15,7 @@ from ipld_unixfs.file.layout.queue.api import (
     FileLink,
     LinkedNode,
     PendingChildren,
+    PendingSlots,
     PropertyKey,
     Queue,
     Result,
@@ -230,6 +232,115 @@ def collect(
     return {"has": has, "wants": wants, "ready": ready}
 
 
+class MutableQueue:
+    """
+    Queue that applies updates in place. Every pending node has a slot for
+    each of its children and every link it needs maps to its slot, so arriving
+    link is written straight into place and node is linked without rescanning
+    its children once the last slot is filled. That makes `add_link` constant
+    time and `add_node` proportional to the number of node children regardless
+    of the queue size. Nodes that got all of their links are accumulated in
+    `linked` until they are taken off with `drain`.
+    """
+
+    __slots__ = ("needs", "nodes", "links", "linked")
+
+    needs: dict[NodeID, tuple[PendingSlots, int]]
+    """Maps link IDs to the nodes that need them and the slot for the link."""
+    nodes: dict[NodeID, PendingSlots]
+    """Maps node IDs to the nodes waiting on links."""
+    links: dict[NodeID, FileLink]
+    """Links that arrived before the node that needs them."""
+    linked: list[LinkedNode]
+    """List of file nodes that are ready."""
+
+    def __init__(self, queue: Optional[Queue] = None) -> None:
+        self.needs = {}
+        self.nodes = {}
+        self.links = {}
+        self.linked = []
+        if queue is not None:
+            self.links.update(queue.links)
+            for id, node in queue.nodes.items():
+                self.add_node(Branch(id, node.children))
+            if queue.linked is not None:
+                self.linked[0:0] = queue.linked
+
+    def add_node(self, node: Branch) -> None:
+        links = self.links
+        pending = PendingSlots(node.id, node.children)
+        slots = pending.slots
+        position = 0
+        for child in node.children:
+            link = links.pop(child, None)
+            if link is None:
+                self.needs[child] = (pending, position)
+            else:
+                slots[position] = link
+                pending.count -= 1
+            position += 1
+
+        if pending.count == 0:
+            self.linked.append(LinkedNode(node.id, cast("list[FileLink]", slots)))
+        else:
+            self.nodes[node.id] = pending
+
+    def add_nodes(self, nodes: Sequence[Branch]) -> None:
+        for node in nodes:
+            self.add_node(node)
+
+    def add_link(self, id: NodeID, link: FileLink) -> None:
+        need = self.needs.pop(id, None)
+        if need is None:
+            self.links[id] = link
+            return
+
+        pending, position = need
+        pending.slots[position] = link
+        pending.count -= 1
+        if pending.count == 0:
+            del self.nodes[pending.id]
+            links = cast("list[FileLink]", pending.slots)
+            self.linked.append(LinkedNode(pending.id, links))
+
+    def add_links(self, entries: Sequence[tuple[NodeID, FileLink]]) -> None:
+        add_link = self.add_link
+        for id, link in entries:
+            add_link(id, link)
+
+    def drain(self) -> list[LinkedNode]:
+        """
+        Returns nodes that got linked since the last call.
+        """
+        linked = self.linked
+        self.linked = []
+        return linked
+
+    def is_empty(self) -> bool:
+        return len(self.nodes) == 0 and len(self.links) == 0
+
+    def to_result(self) -> Result:
+        """
+        Returns immutable snapshot of the queue in the form used by the
+        functional API.
+        """
+        links = dict(self.links)
+        nodes: dict[NodeID, PendingChildren] = {}
+        for id, node in self.nodes.items():
+            nodes[id] = PendingChildren(node.children, node.count)
+            for child, link in zip(node.children, node.slots):
+                if link is not None:
+                    links[child] = link
+
+        return Result(
+            mutable=False,
+            needs={id: node.id for id, (node, _) in self.needs.items()},
+            nodes=nodes,
+            links=links,
+            linked=list(self.linked),
+        )
+
+
 EMPTY: list[Any] = []
 
 BLANK: dict[Any, Any] = {}
@@ -19,6 +19,28 @@ class PendingChildren:
     count: int
 
 
+class PendingSlots:
+    """
+    Node waiting on links of its children. Links are written into `slots` at
+    the position of the child as they arrive, so once `count` drops to zero
+    `slots` are the links of the node.
+    """
+
+    __slots__ = ("id", "children", "slots", "count")
+
+    id: NodeID
+    children: Sequence[NodeID]
+    slots: list[Optional[FileLink]]
+    count: int
+    """Number of empty slots."""
+
+    def __init__(self, id: NodeID, children: Sequence[NodeID]) -> None:
+        self.id = id
+        self.children = children
+        self.slots = [None] * len(children)
+        self.count = len(children)
+
+
 @dataclass
 class Queue:
     mutable: bool
@@ -0,0 +1,222 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence
+from ipld_unixfs.file.chunker.api import Chunk
+from ipld_unixfs.file.layout.api import (
+    Branch,
+    CloseResult,
+    LayoutEngine,
+    Leaf,
+    NodeID,
+    WriteResult,
+)
+from ipld_unixfs.unixfs import Metadata
+
+EMPTY = ()
+
+
+@dataclass(frozen=True)
+class Options:
+    max_direct_leaves: int
+    """Number of leaves linked directly from every node."""
+    layer_repeat: int
+    """Number of subtrees of each depth linked from a node."""
+
+
+defaults = Options(174, 4)
+
+
+class Frame:
+    """
+    Node of the trickle tree that is still being filled. Node first links up to
+    `max_direct_leaves` leaves, after which it links `layer_repeat` subtrees of
+    depth 1, then `layer_repeat` subtrees of depth 2 etc... up until (but not
+    including) its own `max_depth`.
+    """
+
+    __slots__ = ("max_depth", "children", "leaves", "depth", "repeat")
+
+    max_depth: Optional[int]
+    """Depth of the subtree, root has no depth limit."""
+    children: list[NodeID]
+    leaves: int
+    """Number of leaves directly linked."""
+    depth: int
+    """Depth of the next subtree to be linked."""
+    repeat: int
+    """Number of subtrees of `depth` already linked."""
+
+    def __init__(
+        self,
+        max_depth: Optional[int],
+        children: Optional[list[NodeID]] = None,
+        leaves: int = 0,
+        depth: int = 1,
+        repeat: int = 0,
+    ) -> None:
+        self.max_depth = max_depth
+        self.children = [] if children is None else children
+        self.leaves = leaves
+        self.depth = depth
+        self.repeat = repeat
+
+    def copy(self) -> "Frame":
+        return Frame(
+            self.max_depth, list(self.children), self.leaves, self.depth, self.repeat
+        )
+
+
+class Trickle:
+    """
+    Type representing a state of the trickle DAG. Unlike balanced DAG where
+    leaves are at the same depth, trickle DAG is filled in depth first order so
+    that first leaves are close to the root and subtrees of increasing depth
+    follow. For illustration let's assume `max_direct_leaves: 2` and
+    `layer_repeat: 1`, after 8 leaves were added tree will look as follows
+
+    ```
+    #                          (root)
+    #                            |
+    #      -----------------------------------------
+    #      |        |        |                     |
+    #    (leaf1) (leaf2)  (node1)               (node3)
+    #                        |                     |
+    #                    ---------         -----------------
+    #                    |       |         |       |       |
+    #                 (leaf3) (leaf4)  (leaf5) (leaf6)  (node2)
+    #                                                      |
+    #                                                  ---------
+    #                                                  |       |
+    #                                               (leaf7) (leaf8)
+    ```
+
+    State only holds the nodes on the path from the root to the last leaf
+    (`stack`), nodes are emitted as soon as they are complete. Unlike balanced
+    DAG, root is a node even if the file fits a single leaf or has none, same
+    as `trickle.Layout` of go-unixfs produces.
+    """
+
+    options: Options
+    stack: Sequence[Frame]
+    last_id: int
+
+    def __init__(
+        self, options: Options, stack: Sequence[Frame] = (), last_id: int = 0
+    ) -> None:
+        self.options = options
+        self.stack = stack if len(stack) > 0 else (Frame(None),)
+        self.last_id = last_id
+
+
+class TrickleLayout(LayoutEngine[Trickle]):
+    options: Options
+
+    def __init__(
+        self,
+        max_direct_leaves: int = defaults.max_direct_leaves,
+        layer_repeat: int = defaults.layer_repeat,
+    ) -> None:
+        self.options = Options(max_direct_leaves, layer_repeat)
+
+    def open(self) -> Trickle:
+        return open(self.options)
+
+    def write(self, layout: Trickle, chunks: Sequence[Chunk]) -> WriteResult[Trickle]:
+        return write(layout, chunks)
+
+    def close(
+        self, layout: Trickle, metadata: Optional[Metadata] = None
+    ) -> CloseResult:
+        return close(layout, metadata)
+
+
+def configure(
+    max_direct_leaves: int = defaults.max_direct_leaves,
+    layer_repeat: int = defaults.layer_repeat,
+) -> LayoutEngine[Trickle]:
+    return TrickleLayout(max_direct_leaves, layer_repeat)
+
+
+def open(options: Options = defaults) -> Trickle:
+    return Trickle(options)
+
+
+def write(layout: Trickle, chunks: Sequence[Chunk]) -> WriteResult[Trickle]:
+    if len(chunks) == 0:
+        return WriteResult(layout, EMPTY, EMPTY)
+
+    options = layout.options
+    stack = list(layout.stack)
+    # Frames below `shared` are also on the stack of the passed layout and are
+    # copied before they are changed.
+    shared = len(stack)
+    last_id = layout.last_id
+    leaves: list[Leaf] = []
+    nodes: list[Branch] = []
+
+    for chunk in chunks:
+        last_id += 1
+        leaf = Leaf(last_id, chunk, None)
+        leaves.append(leaf)
+
+        # Descend into new subtrees until we find a node with room for a leaf.
+        shared = unshare(stack, shared)
+        top = stack[-1]
+        while top.leaves == options.max_direct_leaves:
+            frame = Frame(top.depth)
+            top.repeat += 1
+            if top.repeat == options.layer_repeat:
+                top.depth += 1
+                top.repeat = 0
+            stack.append(frame)
+            top = frame
+
+        top.children.append(leaf.id)
+        top.leaves += 1
+
+        # Emit all the nodes that got completed with this leaf.
+        while len(stack) > 1 and is_complete(stack[-1], options):
+            frame = stack.pop()
+            last_id += 1
+            node = Branch(last_id, frame.children, None)
+            nodes.append(node)
+            shared = unshare(stack, shared)
+            stack[-1].children.append(node.id)
+
+    return WriteResult(Trickle(options, stack, last_id), nodes, leaves)
+
+
+def unshare(stack: list[Frame], shared: int) -> int:
+    """
+    Replaces the top frame with its copy if it is shared and returns the
+    number of shared frames left.
+    """
+    shared = min(shared, len(stack))
+    if len(stack) == shared:
+        stack[-1] = stack[-1].copy()
+        shared -= 1
+    return shared
+
+
+def is_complete(frame: Frame, options: Options) -> bool:
+    return (
+        frame.leaves == options.max_direct_leaves
+        and frame.max_depth is not None
+        and frame.depth >= frame.max_depth
+    )
+
+
+def close(layout: Trickle, metadata: Optional[Metadata] = None) -> CloseResult:
+    # Close all the nodes on the path to the last leaf.
+    stack = layout.stack
+    last_id = layout.last_id
+    nodes: list[Branch] = []
+    # Each node links the node closed before it, which is not in its frame.
+    closed: list[NodeID] = []
+    for frame in reversed(stack[1:]):
+        last_id += 1
+        node = Branch(last_id, [*frame.children, *closed], None)
+        nodes.append(node)
+        closed = [node.id]
+
+    root = Branch(last_id + 1, [*stack[0].children, *closed], metadata)
+    return CloseResult(root, nodes, EMPTY)
@@ -0,0 +1,461 @@
+"""
+File writer ties together chunker, layout, link queue and encoders. Bytes are
+written into the writer, which cuts them into chunks, lays them out into a DAG
+and encodes nodes into blocks. Blocks are passed to the `BlockWriter` as soon
+as they are final and once writer is closed it returns a link to the file.
+
+```py
+from ipld_unixfs.file import writer as FileWriter
+
+blocks = []
+file = FileWriter.create(blocks)
+file.write(b"hello ")
+file.write(b"world")
+link = file.close()
+```
+"""
+
+import mmap
+import os
+import stat
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from dataclasses import dataclass, replace
+from typing import Any, Literal, Optional, Protocol, Sequence, Union
+from ipld_unixfs import codec
+import ipld_unixfs.file.chunker as Chunker
+from ipld_unixfs.file.chunker.api import Chunk, Chunker as ChunkerType
+from ipld_unixfs.file.chunker.buffer import BufferView
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.file.layout.api import (
+    Branch,
+    FileChunkEncoder,
+    FileEncoder,
+    LayoutEngine,
+    Leaf,
+)
+from ipld_unixfs.file.layout.balanced import MutableBalancedLayout
+from ipld_unixfs.file.layout.queue import MutableQueue
+from ipld_unixfs.multiformats import block as Block
+from ipld_unixfs.multiformats.block import Block as BlockType
+from ipld_unixfs.multiformats.codecs.api import BlockEncoder, ByteView
+from ipld_unixfs.multiformats.codecs import raw
+from ipld_unixfs.multiformats.hasher import MultihashHasher, sha256
+from ipld_unixfs.unixfs import (
+    AdvancedFile,
+    FileLink,
+    Metadata,
+    SimpleFile,
+)
+
+
+class UnixFSLeafEncoder(BlockEncoder[Literal[0x70], Union[bytes, BufferView]]):
+    """
+    Encodes file chunks as UnixFS file nodes (as opposed to raw blocks).
+    """
+
+    name = "UnixFSLeaf"
+    code: Literal[0x70] = codec.code
+
+    def encode(self, data: Union[bytes, BufferView]) -> ByteView:
+        return codec.encode_file_chunk(data)
+
+
+UnixFSLeaf = UnixFSLeafEncoder()
+UnixFSRawLeaf = raw.encoder
+
+
+@dataclass(frozen=True)
+class Config:
+    chunker: ChunkerType[Any]
+    file_chunk_encoder: FileChunkEncoder
+    """Encoder for the leaves of the file DAG."""
+    small_file_encoder: FileChunkEncoder
+    """Encoder for the files that fit a single chunk."""
+    file_encoder: FileEncoder
+    """Encoder for the branch nodes of the file DAG."""
+    file_layout: LayoutEngine[Any]
+    hasher: MultihashHasher
+
+
+def defaults() -> Config:
+    return Config(
+        chunker=FixedSizeChunker(),
+        file_chunk_encoder=UnixFSLeaf,
+        small_file_encoder=UnixFSLeaf,
+        file_encoder=codec.encoder,
+        # Writer owns the layout state and never goes back to the earlier
+        # state, so it can use one that is updated in place.
+        file_layout=MutableBalancedLayout(174),
+        hasher=sha256,
+    )
+
+
+def configure(
+    config: Optional[Config] = None,
+    *,
+    chunker: Optional[ChunkerType[Any]] = None,
+    file_chunk_encoder: Optional[FileChunkEncoder] = None,
+    small_file_encoder: Optional[FileChunkEncoder] = None,
+    file_encoder: Optional[FileEncoder] = None,
+    file_layout: Optional[LayoutEngine[Any]] = None,
+    hasher: Optional[MultihashHasher] = None,
+) -> Config:
+    """
+    Creates config by overriding given options of the `config` (or defaults).
+    """
+    base = defaults() if config is None else config
+    return replace(
+        base,
+        chunker=base.chunker if chunker is None else chunker,
+        file_chunk_encoder=(
+            base.file_chunk_encoder
+            if file_chunk_encoder is None
+            else file_chunk_encoder
+        ),
+        small_file_encoder=(
+            base.small_file_encoder
+            if small_file_encoder is None
+            else small_file_encoder
+        ),
+        file_encoder=base.file_encoder if file_encoder is None else file_encoder,
+        file_layout=base.file_layout if file_layout is None else file_layout,
+        hasher=base.hasher if hasher is None else hasher,
+    )
+
+
+class BlockWriter(Protocol):
+    """
+    Destination of the blocks produced by the writer, e.g. a CAR writer.
+    """
+
+    def write(self, block: BlockType, /) -> None: ...
+
+
+class BlockList(list[BlockType]):
+    """
+    `BlockWriter` collecting blocks into a list.
+    """
+
+    def write(self, block: BlockType, /) -> None:
+        self.append(block)
+
+
+class FileWriter:
+    """
+    Writer of a single file. Writer holds on to the bytes that did not make it
+    into a chunk yet, layout state and nodes waiting on links of their
+    children, which are all bounded by the chunk size and the layout width and
+    depth rather than the size of the file.
+
+    Note that chunks reference memory of the written bytes without copying it,
+    so bytes written should not be mutated afterwards.
+    """
+
+    config: Config
+    writer: BlockWriter
+    metadata: Optional[Metadata]
+    chunker: Chunker.State[Any]
+    layout: Any
+    queue: MutableQueue
+    root: Optional[int]
+    link: Optional[FileLink]
+
+    def __init__(
+        self,
+        writer: BlockWriter,
+        config: Optional[Config] = None,
+        metadata: Optional[Metadata] = None,
+    ) -> None:
+        self.config = defaults() if config is None else config
+        self.writer = writer
+        self.metadata = metadata
+        self.chunker = Chunker.open(self.config.chunker)
+        self.layout = self.config.file_layout.open()
+        self.queue = MutableQueue()
+        self.root = None
+        self.link = None
+
+    def write(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        if self.link is not None:
+            raise ValueError("Can not write into a closed file")
+        self.chunker = Chunker.write(self.chunker, memoryview(data))
+        self.add_chunks(self.chunker.chunks)
+
+    def close(self) -> FileLink:
+        """
+        Flushes remaining blocks and returns link to the file. Calling close
+        again returns the same link.
+        """
+        if self.link is not None:
+            return self.link
+
+        self.chunker = Chunker.close(self.chunker)
+        self.add_chunks(self.chunker.chunks)
+
+        result = self.config.file_layout.close(self.layout, self.metadata)
+        root = result.root
+        if isinstance(root, Leaf):
+            # File fits a single chunk, so no links will follow.
+            self.link = self.encode_small_file(root)
+            return self.link
+
+        self.root = root.id
+        self.add_leaves(result.leaves)
+        self.add_nodes([*result.nodes, root])
+        self.join()
+
+        link = self.link
+        if link is None:
+            raise RuntimeError("File root was not linked")
+        return link
+
+    def add_chunks(self, chunks: Sequence[Chunk]) -> None:
+        if len(chunks) > 0:
+            result = self.config.file_layout.write(self.layout, chunks)
+            self.layout = result.layout
+            self.add_leaves(result.leaves)
+            self.add_nodes(result.nodes)
+
+    def add_leaves(self, leaves: Sequence[Leaf]) -> None:
+        encoder = self.config.file_chunk_encoder
+        for leaf in leaves:
+            link = self.encode_leaf(leaf, encoder)
+            self.queue.add_link(leaf.id, link)
+        self.flush()
+
+    def add_nodes(self, nodes: Sequence[Branch]) -> None:
+        self.queue.add_nodes(nodes)
+        self.flush()
+
+    def join(self) -> None:
+        """
+        Waits for the leaves that are still being encoded. Leaves are encoded
+        as soon as they are added, so there is nothing to wait for.
+        """
+
+    def flush(self) -> None:
+        """
+        Encodes all the nodes that got their links. Linking a node may satisfy
+        its parent, so we keep going until no more nodes are ready.
+        """
+        queue = self.queue
+        while len(queue.linked) > 0:
+            for node in queue.drain():
+                if node.id == self.root:
+                    self.link = self.encode_branch(node.links, self.metadata)
+                else:
+                    queue.add_link(node.id, self.encode_branch(node.links, None))
+
+    def encode_leaf(self, leaf: Leaf, encoder: FileChunkEncoder) -> FileLink:
+        content = as_content(leaf.content)
+        block = encode_chunk(encoder, content, self.config.hasher)
+        self.writer.write(block)
+        return FileLink(block.cid, block.byte_length, content_length(content))
+
+    def encode_small_file(self, leaf: Leaf) -> FileLink:
+        metadata = leaf.metadata
+        content = as_content(leaf.content)
+        encoder = self.config.small_file_encoder
+        # Metadata can only be stored in the UnixFS node.
+        if metadata is not None and encoder.code == codec.code:
+            file_encoder = self.config.file_encoder
+            block = Block.create(
+                file_encoder.encode(SimpleFile(content, metadata)),
+                file_encoder.code,
+                self.config.hasher,
+            )
+            self.writer.write(block)
+            return FileLink(block.cid, block.byte_length, content_length(content))
+
+        return self.encode_leaf(leaf, encoder)
+
+    def encode_branch(
+        self, links: Sequence[FileLink], metadata: Optional[Metadata]
+    ) -> FileLink:
+        # Shards of the file are encoded same as file without metadata.
+        file_encoder = self.config.file_encoder
+        block = Block.create(
+            file_encoder.encode(AdvancedFile(links, metadata)),
+            file_encoder.code,
+            self.config.hasher,
+        )
+        self.writer.write(block)
+        dag_byte_length = block.byte_length
+        content_byte_length = 0
+        for link in links:
+            dag_byte_length += link.dagByteLength
+            content_byte_length += link.contentByteLength
+        return FileLink(block.cid, dag_byte_length, content_byte_length)
+
+
+DEFAULT_MMAP_WRITE_SIZE = 16 * 1024 * 1024
+"""Size of the mapped memory slices written into the file at a time."""
+
+DEFAULT_READ_SIZE = 1024 * 1024
+"""Size of the reads from files that can not be mapped."""
+
+DEFAULT_MAX_PENDING = 64
+"""Default number of leaves encoded by the parallel writer at a time."""
+
+
+class ParallelFileWriter(FileWriter):
+    """
+    File writer which encodes and hashes leaves on the executor. Links of the
+    encoded leaves are added to the queue in the order they complete, which
+    does not affect the resulting DAG, but blocks of the leaves are written in
+    that order as well.
+
+    Executor is expected to be a thread pool, `hashlib` releases the GIL while
+    hashing large buffers so hashing scales across cores. Chunks are views of
+    the written memory, which process pools would have to copy.
+    """
+
+    executor: Executor
+    max_pending: int
+    pending: dict["Future[BlockType]", tuple[int, int]]
+    """Leaves being encoded mapped to their id and content length."""
+
+    def __init__(
+        self,
+        writer: BlockWriter,
+        executor: Executor,
+        config: Optional[Config] = None,
+        metadata: Optional[Metadata] = None,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ) -> None:
+        super().__init__(writer, config, metadata)
+        self.executor = executor
+        self.max_pending = max_pending
+        self.pending = {}
+
+    def add_leaves(self, leaves: Sequence[Leaf]) -> None:
+        encoder = self.config.file_chunk_encoder
+        hasher = self.config.hasher
+        for leaf in leaves:
+            content = as_content(leaf.content)
+            task = self.executor.submit(encode_chunk, encoder, content, hasher)
+            self.pending[task] = (leaf.id, content_length(content))
+        self.collect(self.max_pending)
+
+    def join(self) -> None:
+        self.collect(0)
+
+    def collect(self, limit: int) -> None:
+        """
+        Links leaves that have been encoded. If more than `limit` leaves are
+        still pending, waits until enough of them complete.
+        """
+        pending = self.pending
+        while len(pending) > 0:
+            full = len(pending) > limit
+            done, _ = wait(
+                pending, timeout=None if full else 0, return_when=FIRST_COMPLETED
+            )
+            for task in done:
+                id, length = pending.pop(task)
+                leaf = task.result()
+                self.writer.write(leaf)
+                self.queue.add_link(id, FileLink(leaf.cid, leaf.byte_length, length))
+            self.flush()
+            if not full:
+                break
+
+
+EMPTY = BufferView()
+
+
+def encode_chunk(
+    encoder: FileChunkEncoder,
+    content: Union[bytes, BufferView],
+    hasher: MultihashHasher,
+) -> BlockType:
+    return Block.create(encoder.encode(content), encoder.code, hasher)
+
+
+def as_content(chunk: Optional[Chunk]) -> Union[bytes, BufferView]:
+    if chunk is None:
+        return EMPTY
+    if isinstance(chunk, BufferView):
+        return chunk
+    # Chunks produced by `Chunker` are always buffer views, but layout API
+    # allows any chunk.
+    target = memoryview(bytearray(chunk.byte_length))
+    chunk.copy_to(target, 0)
+    return BufferView.create([target])
+
+
+def content_length(content: Union[bytes, BufferView]) -> int:
+    return len(content) if isinstance(content, bytes) else content.byte_length
+
+
+def create(
+    writer: BlockWriter,
+    config: Optional[Config] = None,
+    metadata: Optional[Metadata] = None,
+    executor: Optional[Executor] = None,
+) -> FileWriter:
+    """
+    Creates a file writer. When `executor` is given leaves are encoded and
+    hashed on it in parallel.
+    """
+    if executor is None:
+        return FileWriter(writer, config, metadata)
+    return ParallelFileWriter(writer, executor, config, metadata)
+
+
+def import_mmap(
+    mm: mmap.mmap,
+    writer: BlockWriter,
+    config: Optional[Config] = None,
+    metadata: Optional[Metadata] = None,
+    executor: Optional[Executor] = None,
+    write_size: int = DEFAULT_MMAP_WRITE_SIZE,
+) -> FileLink:
+    """
+    Imports contents of the memory mapped file. Mapping is written in slices,
+    which chunker cuts into chunks that are views of the mapping, so with raw
+    leaves contents are never copied and pages are only read when hashed.
+
+    Blocks reference the mapped memory, so the mapping can not be closed until
+    written blocks are released.
+    """
+    file = create(writer, config, metadata, executor)
+    view = memoryview(mm)
+    for offset in range(0, len(view), write_size):
+        file.write(view[offset : offset + write_size])
+    return file.close()
+
+
+def import_path(
+    path: Union[str, "os.PathLike[str]"],
+    writer: BlockWriter,
+    config: Optional[Config] = None,
+    metadata: Optional[Metadata] = None,
+    executor: Optional[Executor] = None,
+) -> FileLink:
+    """
+    Imports file from the local disk by memory mapping it. Files other than
+    regular ones (e.g. pipes, devices or `/proc` files) are read instead,
+    since their size is unknown up front.
+    """
+    with open(path, "rb") as fd:
+        info = os.fstat(fd.fileno())
+        if not stat.S_ISREG(info.st_mode) or info.st_size == 0:
+            # Empty files can not be mapped either.
+            file = create(writer, config, metadata, executor)
+            for data in iter(lambda: fd.read(DEFAULT_READ_SIZE), b""):
+                file.write(data)
+            return file.close()
+        mm = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    try:
+        return import_mmap(mm, writer, config, metadata, executor)
+    finally:
+        try:
+            mm.close()
+        except BufferError:
+            # Blocks still reference the mapping, it is unmapped once they
+            # are released.
+            pass
@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+from typing import TypeVar
+from multiformats import CID, multibase, multicodec
+from ipld_unixfs.multiformats.codecs.api import BlockEncoder, ByteView, Code
+from ipld_unixfs.multiformats.hasher import MultihashHasher, sha256
+
+T = TypeVar("T")
+
+BASE32 = multibase.get("base32")
+BASE58BTC = multibase.get("base58btc")
+
+
+@dataclass
+class Block:
+    cid: CID
+    bytes: ByteView
+    """
+    Encoded block, which may be `SegmentedBytes` over the memory of the chunk
+    the block was encoded from.
+    """
+
+    @property
+    def byte_length(self) -> int:
+        data = self.bytes
+        return len(data) if isinstance(data, (bytes, bytearray)) else data.byte_length
+
+
+def encode(
+    value: T,
+    codec: BlockEncoder[Code, T],
+    hasher: MultihashHasher = sha256,
+    version: int = 1,
+) -> Block:
+    """
+    Encodes value with a given codec and creates a block addressed by the hash
+    of the encoded bytes.
+    """
+    return create(codec.encode(value), codec.code, hasher, version)
+
+
+def create(
+    data: ByteView, code: int, hasher: MultihashHasher = sha256, version: int = 1
+) -> Block:
+    """
+    Creates block for the encoded bytes of the given codec.
+    """
+    return Block(link(code, hasher, hasher.digest(data), version), data)
+
+
+def link(code: int, hasher: MultihashHasher, digest: bytes, version: int = 1) -> CID:
+    """
+    Creates CID for a block with a given codec and raw digest.
+    """
+    # Passing resolved multibase, multicodec & multihash (along with the raw
+    # digest) skips most of the lookups `CID` would otherwise do.
+    base = BASE32 if version == 1 else BASE58BTC
+    return CID(base, version, multicodec.get(code=code), (hasher.multihash, digest))
@@ -1,6 +1,6 @@
 # TODO: PR to multiformats?
 from abc import abstractmethod
-from typing import Generic, TypeVar
+from typing import Generic, Protocol, TypeVar, Union
 
 
 Code = TypeVar("Code", bound=int)
@@ -9,6 +9,27 @@ Code = TypeVar("Code", bound=int)
 Data = TypeVar("Data")
 
 
+class SegmentedBytes(Protocol):
+    """
+    Bytes spread across multiple segments of memory, e.g. the `BufferView` of
+    the chunks.
+    """
+
+    segments: list[memoryview]
+    byte_length: int
+
+    def copy_to(self, target: memoryview, offset: int = 0) -> memoryview:
+        """Copies bytes into the target at the given offset."""
+        ...
+
+
+ByteView = Union[bytes, bytearray, SegmentedBytes]
+"""
+Encoded block bytes. Blocks may be backed by the memory of the chunks they were
+created from, which is represented by the `SegmentedBytes`.
+"""
+
+
 class BlockEncoder(Generic[Code, Data]):
     """
     IPLD encoder part of the codec.
@@ -18,5 +39,5 @@ class BlockEncoder(Generic[Code, Data]):
     code: Code
 
     @abstractmethod
-    def encode(self, data: Data) -> bytes:
+    def encode(self, data: Data) -> ByteView:
         pass
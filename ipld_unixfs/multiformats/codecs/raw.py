@@ -0,0 +1,25 @@
+from typing import Literal, Union
+from ipld_unixfs.multiformats.codecs.api import BlockEncoder, ByteView, SegmentedBytes
+
+name = "raw"
+code: Literal[0x55] = 0x55
+
+
+class RawEncoder(BlockEncoder[Literal[0x55], Union[bytes, SegmentedBytes]]):
+    """
+    Raw block encoder. Raw block bytes are the data itself, so chunk is handed
+    out as is, without being copied into `bytes`.
+    """
+
+    name = name
+    code: Literal[0x55] = code
+
+    def encode(self, data: Union[bytes, SegmentedBytes]) -> ByteView:
+        return encode(data)
+
+
+encoder = RawEncoder()
+
+
+def encode(data: Union[bytes, SegmentedBytes]) -> ByteView:
+    return data
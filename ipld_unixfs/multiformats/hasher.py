@@ -0,0 +1,51 @@
+import hashlib
+from typing import Any, Callable, Protocol
+from multiformats import multihash
+from multiformats.multihash import Multihash
+from ipld_unixfs.multiformats.codecs.api import ByteView
+
+
+class MultihashHasher(Protocol):
+    name: str
+    code: int
+
+    def digest(self, data: ByteView) -> bytes:
+        """
+        Returns the raw digest of the given data, that is without the multihash
+        prefix.
+        """
+        ...
+
+    @property
+    def multihash(self) -> Multihash: ...
+
+
+class HashlibHasher:
+    """
+    Hasher backed by `hashlib`. `SegmentedBytes` are hashed segment by segment,
+    so chunk memory is never joined or copied.
+    """
+
+    name: str
+    code: int
+    new: Callable[[], Any]
+    multihash: Multihash
+
+    def __init__(self, name: str, new: Callable[[], Any]) -> None:
+        self.name = name
+        self.multihash = multihash.get(name)
+        self.code = self.multihash.code
+        self.new = new
+
+    def digest(self, data: ByteView) -> bytes:
+        hash = self.new()
+        if isinstance(data, (bytes, bytearray)):
+            hash.update(data)
+        else:
+            for segment in data.segments:
+                hash.update(segment)
+        digest: bytes = hash.digest()
+        return digest
+
+
+sha256 = HashlibHasher("sha2-256", hashlib.sha256)
@@ -0,0 +1,219 @@
+"""
+HAMT sharded directories, laid out the same way as in go-unixfs (kubo) so
+that same entries produce the same CIDs:
+
+- Entry names are hashed with 64 bit murmur3 (first half of the x64 128 bit
+  variant), which is read starting from the most significant bit.
+- Every level of the HAMT consumes `log2(fanout)` bits of the hash to pick a
+  slot of the shard.
+- Slot holds either a single entry or a subshard. When an entry lands in the
+  slot of another entry, both are moved into a new subshard. When removal
+  leaves a subshard with a single entry, the entry is moved back up.
+- Links are sorted by slot index and named by it, as an upper case hex number
+  padded to the width of `fanout - 1`, followed by the name for entries.
+- Bitfield of the slots in use is a big-endian number without leading zeros.
+"""
+
+from typing import Iterator, Optional, Union
+import mmh3
+from ipld_unixfs import codec
+from ipld_unixfs.file.writer import BlockWriter
+from ipld_unixfs.multiformats import block as Block
+from ipld_unixfs.multiformats.hasher import MultihashHasher
+from ipld_unixfs.unixfs import DAGLink, DirectoryEntryLink, DirectoryShard, Metadata
+
+HASH_TYPE = 0x22
+"""Multicodec code of murmur3-x64-64."""
+
+DEFAULT_FANOUT = 256
+
+HASH_BITS = 64
+
+
+def hash_name(name: str) -> int:
+    return mmh3.hash64(name.encode(), signed=False)[0]
+
+
+class Options:
+    """
+    Parameters shared by all the shards of a HAMT.
+    """
+
+    __slots__ = ("fanout", "bits", "prefixes")
+
+    fanout: int
+    bits: int
+    """Number of hash bits consumed per level."""
+    prefixes: list[str]
+    """Link name prefixes by slot index."""
+
+    def __init__(self, fanout: int = DEFAULT_FANOUT) -> None:
+        if fanout < 8 or fanout & (fanout - 1) != 0:
+            raise ValueError(
+                f"Fanout must be a power of two no less than 8, got {fanout}"
+            )
+        self.fanout = fanout
+        self.bits = fanout.bit_length() - 1
+        width = len(f"{fanout - 1:X}")
+        self.prefixes = [f"{index:0{width}X}" for index in range(fanout)]
+
+
+class Entry:
+    """
+    Directory entry along with the hash of its name.
+    """
+
+    __slots__ = ("hash", "link")
+
+    hash: int
+    link: DirectoryEntryLink
+
+    def __init__(self, hash: int, link: DirectoryEntryLink) -> None:
+        self.hash = hash
+        self.link = link
+
+
+class Shard:
+    """
+    Mutable HAMT node. Updates only touch the shards on the path to the slot
+    of the entry, clearing their cached `link`, so that encoding the HAMT
+    only re-encodes the shards that changed since it was last encoded.
+    """
+
+    __slots__ = ("options", "depth", "slots", "link")
+
+    options: Options
+    depth: int
+    slots: dict[int, Union["Shard", Entry]]
+    link: Optional[DAGLink]
+    """Link to the encoded shard, unless it changed since."""
+
+    def __init__(self, options: Options, depth: int = 0) -> None:
+        self.options = options
+        self.depth = depth
+        self.slots = {}
+        self.link = None
+
+    def index(self, hash: int) -> int:
+        bits = self.options.bits
+        end = (self.depth + 1) * bits
+        if end > HASH_BITS:
+            raise ValueError("HAMT is too deep, ran out of the hash bits")
+        return (hash >> (HASH_BITS - end)) & (self.options.fanout - 1)
+
+    def set(self, entry: Entry) -> None:
+        """
+        Adds entry, replacing the one with the same name if any.
+        """
+        shard = self
+        while True:
+            shard.link = None
+            index = shard.index(entry.hash)
+            child = shard.slots.get(index)
+            if child is None or (
+                isinstance(child, Entry) and child.link.name == entry.link.name
+            ):
+                shard.slots[index] = entry
+                return
+            if isinstance(child, Entry):
+                subshard = Shard(self.options, shard.depth + 1)
+                subshard.slots[subshard.index(child.hash)] = child
+                shard.slots[index] = subshard
+                child = subshard
+            shard = child
+
+    def get(self, name: str, hash: int) -> Optional[Entry]:
+        shard = self
+        while True:
+            child = shard.slots.get(shard.index(hash))
+            if child is None:
+                return None
+            if isinstance(child, Entry):
+                return child if child.link.name == name else None
+            shard = child
+
+    def remove(self, name: str, hash: int) -> Optional[Entry]:
+        """
+        Removes entry with a given name and returns it, or `None` if there is
+        no such entry.
+        """
+        index = self.index(hash)
+        child = self.slots.get(index)
+        if child is None:
+            return None
+        if isinstance(child, Entry):
+            if child.link.name != name:
+                return None
+            del self.slots[index]
+            self.link = None
+            return child
+
+        removed = child.remove(name, hash)
+        if removed is not None:
+            self.link = None
+            if len(child.slots) == 1:
+                (only,) = child.slots.values()
+                if isinstance(only, Entry):
+                    self.slots[index] = only
+        return removed
+
+    def __iter__(self) -> Iterator[Entry]:
+        """
+        Iterates over entries of the shard and its subshards.
+        """
+        for child in self.slots.values():
+            if isinstance(child, Entry):
+                yield child
+            else:
+                yield from child
+
+    def encode(
+        self,
+        writer: BlockWriter,
+        hasher: MultihashHasher,
+        metadata: Optional[Metadata] = None,
+    ) -> DAGLink:
+        """
+        Writes blocks of the shards that changed since they were last encoded
+        and returns link to this shard.
+        """
+        link = self.link
+        if link is not None:
+            return link
+
+        prefixes = self.options.prefixes
+        entries: list[DirectoryEntryLink] = []
+        bitfield = 0
+        dag_byte_length = 0
+        for index in sorted(self.slots):
+            child = self.slots[index]
+            bitfield |= 1 << index
+            entry: DAGLink
+            if isinstance(child, Entry):
+                entry = child.link
+                name = prefixes[index] + child.link.name
+            else:
+                entry = child.encode(writer, hasher)
+                name = prefixes[index]
+            entries.append(DirectoryEntryLink(entry.cid, entry.dagByteLength, name))
+            dag_byte_length += entry.dagByteLength
+
+        node = DirectoryShard(
+            entries,
+            bitfield.to_bytes((bitfield.bit_length() + 7) // 8, "big"),
+            self.options.fanout,
+            HASH_TYPE,
+            metadata,
+        )
+        block = Block.create(codec.encode_directory_shard(node), codec.code, hasher)
+        writer.write(block)
+        link = DAGLink(block.cid, block.byte_length + dag_byte_length)
+        self.link = link
+        return link
+
+
+def create(fanout: int = DEFAULT_FANOUT) -> Shard:
+    """
+    Creates an empty root shard.
+    """
+    return Shard(Options(fanout))
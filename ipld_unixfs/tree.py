@@ -0,0 +1,188 @@
+"""
+Directory tree keeps nested directories in memory along with the links to
+their last encoding, so that after the tree is flushed it can be updated and
+flushed again, writing only the blocks that changed. Those are the
+directories on the paths to the changed entries (and in sharded directories
+only the shards on those paths), which makes the cost of an update
+proportional to the depth of the tree rather than its size.
+
+```py
+from ipld_unixfs import tree as DirectoryTree
+
+blocks = FileWriter.BlockList()
+tree = DirectoryTree.create(blocks)
+tree.set("docs/readme.md", readme_link)
+tree.set("src/main.py", main_link)
+first = tree.flush()
+
+tree.set("docs/readme.md", updated_link)
+second = tree.flush()  # writes new blocks of `docs` and the root only
+```
+"""
+
+from typing import Optional
+from ipld_unixfs import directory as DirectoryWriter
+from ipld_unixfs import sharded_directory as ShardedDirectory
+from ipld_unixfs.file.writer import BlockWriter
+from ipld_unixfs.multiformats.hasher import MultihashHasher, sha256
+from ipld_unixfs.unixfs import DAGLink, DirectoryEntryLink, Metadata
+
+
+class Node:
+    """
+    Directory of the tree. Links to the subdirectories are only updated when
+    the tree is flushed, until then names of the subdirectories that changed
+    are collected in `changed`.
+    """
+
+    __slots__ = ("writer", "directories", "changed")
+
+    writer: DirectoryWriter.DirectoryWriter
+    directories: dict[str, "Node"]
+    changed: set[str]
+
+    def __init__(self, writer: DirectoryWriter.DirectoryWriter) -> None:
+        self.writer = writer
+        self.directories = {}
+        self.changed = set()
+
+    def flush(self) -> DAGLink:
+        writer = self.writer
+        for name in self.changed:
+            link = self.directories[name].flush()
+            current = writer.entries.get(name)
+            if current is None or current.cid != link.cid:
+                writer.set(name, link, overwrite=True)
+        self.changed.clear()
+        return writer.flush()
+
+
+class DirectoryTree:
+    """
+    Tree of directories addressed by `/` separated paths.
+    """
+
+    writer: BlockWriter
+    hasher: MultihashHasher
+    shard_threshold: Optional[int]
+    fanout: int
+    root: Node
+
+    def __init__(
+        self,
+        writer: BlockWriter,
+        metadata: Optional[Metadata] = None,
+        hasher: MultihashHasher = sha256,
+        shard_threshold: Optional[int] = DirectoryWriter.DEFAULT_SHARD_THRESHOLD,
+        fanout: int = ShardedDirectory.DEFAULT_FANOUT,
+    ) -> None:
+        self.writer = writer
+        self.hasher = hasher
+        self.shard_threshold = shard_threshold
+        self.fanout = fanout
+        self.root = self.create_node(metadata)
+
+    def set(self, path: str, link: DAGLink) -> None:
+        """
+        Adds entry at the given path, replacing the one that is there. Missing
+        parent directories are created.
+        """
+        *parents, name = split(path)
+        node = self.root
+        for parent in parents:
+            directory = node.directories.get(parent)
+            if directory is None:
+                if parent in node.writer.entries:
+                    raise ValueError(f"Can not create {path!r}, {parent!r} is a file")
+                directory = self.create_node(None)
+                node.directories[parent] = directory
+            node.changed.add(parent)
+            node = directory
+
+        if node.directories.pop(name, None) is not None:
+            node.changed.discard(name)
+        node.writer.set(name, link, overwrite=True)
+
+    def mkdir(self, path: str, metadata: Optional[Metadata] = None) -> None:
+        """
+        Creates an empty directory at the given path, along with the missing
+        parent directories. Does nothing if directory already exists.
+        """
+        names = split(path)
+        node = self.root
+        for depth, name in enumerate(names, 1):
+            directory = node.directories.get(name)
+            if directory is None:
+                if name in node.writer.entries:
+                    raise ValueError(f"Can not create {path!r}, {name!r} is a file")
+                directory = self.create_node(metadata if depth == len(names) else None)
+                node.directories[name] = directory
+            node.changed.add(name)
+            node = directory
+
+    def remove(self, path: str) -> None:
+        """
+        Removes entry at the given path, if there is one.
+        """
+        *parents, name = split(path)
+        nodes = [self.root]
+        for parent in parents:
+            directory = nodes[-1].directories.get(parent)
+            if directory is None:
+                return
+            nodes.append(directory)
+
+        node = nodes[-1]
+        if name not in node.writer.entries and name not in node.directories:
+            return
+        node.directories.pop(name, None)
+        node.changed.discard(name)
+        node.writer.remove(name)
+        for parent, directory in zip(parents, nodes):
+            directory.changed.add(parent)
+
+    def get(self, path: str) -> Optional[DirectoryEntryLink]:
+        """
+        Returns entry at the given path, if there is one. Entries of the
+        directories are only updated when the tree is flushed.
+        """
+        *parents, name = split(path)
+        node = self.root
+        for parent in parents:
+            directory = node.directories.get(parent)
+            if directory is None:
+                return None
+            node = directory
+        return node.writer.entries.get(name)
+
+    def flush(self) -> DAGLink:
+        """
+        Writes blocks of the directories that changed since the last flush and
+        returns link to the root.
+        """
+        return self.root.flush()
+
+    def create_node(self, metadata: Optional[Metadata]) -> Node:
+        return Node(
+            DirectoryWriter.create(
+                self.writer, metadata, self.hasher, self.shard_threshold, self.fanout
+            )
+        )
+
+
+def split(path: str) -> list[str]:
+    names = path.strip("/").split("/")
+    for name in names:
+        if name in ("", ".", ".."):
+            raise ValueError(f"Invalid path {path!r}")
+    return names
+
+
+def create(
+    writer: BlockWriter,
+    metadata: Optional[Metadata] = None,
+    hasher: MultihashHasher = sha256,
+    shard_threshold: Optional[int] = DirectoryWriter.DEFAULT_SHARD_THRESHOLD,
+    fanout: int = ShardedDirectory.DEFAULT_FANOUT,
+) -> DirectoryTree:
+    return DirectoryTree(writer, metadata, hasher, shard_threshold, fanout)
@@ -3,6 +3,7 @@ from enum import Enum
 from typing import Literal, Optional, Protocol, Sequence, Union
 
 from multiformats import CID
+from ipld_unixfs.file.chunker.api import Chunk
 
 
 class NodeType(Enum):
@@ -49,11 +50,42 @@ class MTime:
     secs: int
     nsecs: Optional[int]
 
+    def __init__(self, secs: int, nsecs: Optional[int] = None) -> None:
+        self.secs = secs
+        self.nsecs = nsecs
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, MTime)
+            and self.secs == other.secs
+            and (self.nsecs or 0) == (other.nsecs or 0)
+        )
+
 
 class Metadata:
     mode: Optional[Mode]
     mtime: Optional[MTime]
 
+    def __init__(
+        self, mode: Optional[Mode] = None, mtime: Optional[MTime] = None
+    ) -> None:
+        self.mode = mode
+        self.mtime = mtime
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, Metadata)
+            and self.mode == other.mode
+            and self.mtime == other.mtime
+        )
+
+
+Content = Union[bytes, bytearray, memoryview, Chunk]
+"""
+File content, either bytes-like or a chunk (e.g. `BufferView`) produced by
+the chunker which is copied into the block without being joined first.
+"""
+
 
 class SimpleFile:
     """
@@ -65,7 +97,13 @@ class SimpleFile:
     metadata: Optional[Metadata]
     type: Literal[NodeType.File]
     layout: Literal["simple"]
-    content: bytes
+    content: Content
+
+    def __init__(self, content: Content, metadata: Optional[Metadata] = None) -> None:
+        self.metadata = metadata
+        self.type = NodeType.File
+        self.layout = "simple"
+        self.content = content
 
 
 class FileChunk:
@@ -98,7 +136,13 @@ class FileChunk:
     metadata: Optional[Metadata]
     type: Literal[NodeType.File]
     layout: Literal["simple"]
-    content: bytes
+    content: Content
+
+    def __init__(self, content: Content) -> None:
+        self.metadata = None
+        self.type = NodeType.File
+        self.layout = "simple"
+        self.content = content
 
 
 @dataclass
@@ -146,6 +190,11 @@ class FileShard:
     layout: Literal["advanced"]
     parts: Sequence[FileLink]
 
+    def __init__(self, parts: Sequence[FileLink]) -> None:
+        self.type = NodeType.File
+        self.layout = "advanced"
+        self.parts = parts
+
 
 class AdvancedFile:
     """
@@ -160,5 +209,76 @@ class AdvancedFile:
     layout: Literal["advanced"]
     parts: Sequence[FileLink]
 
+    def __init__(
+        self, parts: Sequence[FileLink], metadata: Optional[Metadata] = None
+    ) -> None:
+        self.metadata = metadata
+        self.type = NodeType.File
+        self.layout = "advanced"
+        self.parts = parts
+
 
 File = Union[SimpleFile, AdvancedFile]
+
+
+@dataclass
+class DirectoryEntryLink(DAGLink):
+    name: str
+    """Name of the entry in the directory."""
+
+
+class FlatDirectory:
+    """
+    Logical representation of a directory that links to all of its entries
+    from a single block. Entries are encoded in the order given, which per
+    DAG-PB spec should be sorted by (UTF-8 encoded) names.
+    """
+
+    metadata: Optional[Metadata]
+    type: Literal[NodeType.Directory]
+    entries: Sequence[DirectoryEntryLink]
+
+    def __init__(
+        self,
+        entries: Sequence[DirectoryEntryLink],
+        metadata: Optional[Metadata] = None,
+    ) -> None:
+        self.metadata = metadata
+        self.type = NodeType.Directory
+        self.entries = entries
+
+
+class DirectoryShard:
+    """
+    Logical representation of a HAMT shard of a directory. Entries are links
+    to subshards, named by their slot index, and to directory entries, named
+    by their slot index followed by the entry name. Root shard represents the
+    whole directory and may have metadata.
+    """
+
+    metadata: Optional[Metadata]
+    type: Literal[NodeType.HAMTShard]
+    bitfield: bytes
+    """Bitfield of the slots in use as a big-endian number."""
+    fanout: int
+    hash_type: int
+    """Multicodec code of the hash function used to hash entry names."""
+    entries: Sequence[DirectoryEntryLink]
+
+    def __init__(
+        self,
+        entries: Sequence[DirectoryEntryLink],
+        bitfield: bytes,
+        fanout: int,
+        hash_type: int,
+        metadata: Optional[Metadata] = None,
+    ) -> None:
+        self.metadata = metadata
+        self.type = NodeType.HAMTShard
+        self.bitfield = bitfield
+        self.fanout = fanout
+        self.hash_type = hash_type
+        self.entries = entries
+
+
+Directory = Union[FlatDirectory, DirectoryShard]
@@ -0,0 +1,46 @@
+import os
+import shutil
+import subprocess
+from pathlib import Path
+import pytest
+from multiformats import CID
+
+
+class Kubo:
+    """
+    Runs `ipfs` commands of kubo against a throwaway repo, to check that
+    produced CIDs match the ones `ipfs add` computes.
+    """
+
+    env: dict[str, str]
+
+    def __init__(self, repo: Path) -> None:
+        self.env = {**os.environ, "IPFS_PATH": str(repo)}
+
+    def run(self, *args: str) -> str:
+        result = subprocess.run(
+            ["ipfs", *args], env=self.env, check=True, capture_output=True, text=True
+        )
+        return result.stdout.strip()
+
+    def add(self, path: Path, *options: str) -> CID:
+        """
+        Returns CID `ipfs add` computes for the file or directory at the path.
+        """
+        options += ("--quieter", "--only-hash", "--offline")
+        if path.is_dir():
+            options += ("--recursive",)
+        return CID.decode(self.run("add", *options, str(path)))
+
+
+@pytest.fixture(scope="session")
+def kubo(tmp_path_factory: pytest.TempPathFactory) -> Kubo:
+    """
+    Kubo with an initialized repo. Tests using it are skipped unless `ipfs` is
+    installed.
+    """
+    if shutil.which("ipfs") is None:
+        pytest.skip("kubo is not installed")
+    kubo = Kubo(tmp_path_factory.mktemp("ipfs"))
+    kubo.run("init", "--profile=test", "--empty-repo")
+    return kubo
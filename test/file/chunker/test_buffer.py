@@ -1,3 +1,4 @@
+import hashlib
 import pytest
 from ipld_unixfs.file.chunker.buffer import BufferView
 
@@ -11,6 +12,10 @@ def test_concat_two_bytes() -> None:
     assert buffer[19] == 2
     with pytest.raises(IndexError):
         buffer[20]
+    assert buffer[-1] == 2
+    assert buffer[-20] == 1
+    with pytest.raises(IndexError):
+        buffer[-21]
 
 
 def test_slice() -> None:
@@ -50,3 +55,111 @@ def test_create() -> None:
     assert buffer[19] == 2
     with pytest.raises(IndexError):
         buffer[20]
+
+
+def test_copy_to() -> None:
+    buffer = BufferView().extend(bytes([1] * 12)).extend(bytes([2] * 8))
+    target = memoryview(bytearray(24))
+    out = buffer[10:14].copy_to(target, 2)
+    assert out is target
+    assert bytes(target[0:8]) == bytes([0, 0, 1, 1, 2, 2, 0, 0])
+
+
+def test_tobytes() -> None:
+    buffer = BufferView().extend(bytes([1] * 12)).extend(bytes([2] * 8))
+    expect = bytes([1] * 12 + [2] * 8)
+    assert buffer.tobytes() == expect
+    assert bytes(buffer) == expect
+    assert buffer[11:13].tobytes() == bytes([1, 2])
+    assert BufferView().tobytes() == b""
+
+
+def test_slice_matches_bytes() -> None:
+    expect = bytes(range(40))
+    buffer = BufferView()
+    for size in [3, 0, 1, 7, 4, 4, 11, 10]:
+        offset = buffer.byte_length
+        buffer = buffer.extend(memoryview(expect[offset : offset + size]))
+    assert len(buffer) == len(expect)
+
+    for start in range(-42, 42):
+        for end in range(-42, 42):
+            view = buffer[start:end]
+            assert bytes(view) == expect[start:end], f"[{start}:{end}]"
+            assert view.byte_length == len(expect[start:end])
+
+    for index in range(len(expect)):
+        assert buffer[index] == expect[index]
+        assert buffer[3:31][index % 28] == expect[3:31][index % 28]
+
+
+def test_extend_derives_index() -> None:
+    buffer = BufferView().extend(bytes([1] * 12)).extend(bytes([2] * 8))
+    assert buffer[13] == 2
+    extended = buffer.extend(bytes([3] * 4))
+    assert extended[21] == 3
+    assert buffer.byte_length == 20
+    with pytest.raises(IndexError):
+        buffer[21]
+
+
+def test_equals() -> None:
+    buffer = BufferView().extend(bytes([1, 2, 3])).extend(bytes([4, 5]))
+    assert buffer == bytes([1, 2, 3, 4, 5])
+    assert buffer == BufferView.create([memoryview(bytes([1, 2])), bytes([3, 4, 5])])
+    assert buffer[1:4] == BufferView().extend(bytes([2])).extend(bytes([3, 4]))
+    assert buffer != bytes([1, 2, 3, 4])
+    assert buffer != bytes([1, 2, 3, 4, 5, 6])
+    assert buffer != bytes([1, 2, 3, 4, 6])
+    assert BufferView() == b""
+
+
+def test_equals_sequence() -> None:
+    buffer = BufferView().extend(bytes([1, 2])).extend(bytes([3]))
+    assert buffer == [1, 2, 3]
+    assert buffer == (1, 2, 3)
+    assert buffer != [1, 2, 4]
+    assert buffer != [1, 2]
+    assert buffer != [1, 2, 3, 256]
+    assert buffer.startswith([1, 2])
+
+
+def test_startswith() -> None:
+    buffer = BufferView().extend(bytes([1, 2, 3])).extend(bytes([4, 5]))
+    assert buffer.startswith(b"")
+    assert buffer.startswith(bytes([1, 2, 3, 4]))
+    assert buffer.startswith(buffer[0:2])
+    assert not buffer.startswith(bytes([2]))
+    assert not buffer.startswith(bytes([1, 2, 3, 4, 5, 6]))
+
+
+def test_find() -> None:
+    expect = b"abcabcdabxyzabcd"
+    buffer = BufferView()
+    for size in [2, 1, 3, 0, 5, 1, 4]:
+        offset = buffer.byte_length
+        buffer = buffer.extend(memoryview(expect[offset : offset + size]))
+
+    for sub in [b"", b"a", b"abcd", b"cab", b"bxyza", b"d", b"zz", expect, expect + b"a"]:
+        for start in range(-3, len(expect) + 2):
+            assert buffer.find(sub, start) == expect.find(sub, start), (sub, start)
+            assert buffer.find(sub, 0, start) == expect.find(sub, 0, start), (sub, start)
+
+
+def test_find_byte() -> None:
+    expect = b"\x00\x01\x02\x01"
+    buffer = BufferView().extend(expect[:2]).extend(expect[2:])
+    for sub in [0, 1, 2, 3]:
+        assert buffer.find(sub) == expect.find(sub)
+        assert buffer.find(sub, 2) == expect.find(sub, 2)
+    for sub in [-1, 256]:
+        with pytest.raises(ValueError):
+            buffer.find(sub)
+
+
+def test_update_hash() -> None:
+    buffer = BufferView().extend(bytes([1] * 12)).extend(bytes([2] * 8))
+    assert (
+        buffer.update_hash(hashlib.sha256()).digest()
+        == hashlib.sha256(bytes(buffer)).digest()
+    )
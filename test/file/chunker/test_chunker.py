@@ -0,0 +1,45 @@
+import ipld_unixfs.file.chunker as Chunker
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+
+
+def test_write_appends_to_buffer() -> None:
+    state = Chunker.open(FixedSizeChunker(4))
+    state = Chunker.write(state, memoryview(bytes([1, 2, 3])))
+    assert list(state.chunks) == []
+    assert state.buffer.byte_length == 3
+
+    state = Chunker.write(state, memoryview(bytes([4, 5, 6, 7, 8, 9])))
+    assert [bytes(chunk) for chunk in state.chunks] == [
+        bytes([1, 2, 3, 4]),
+        bytes([5, 6, 7, 8]),
+    ]
+    assert bytes(state.buffer) == bytes([9])
+
+    state = Chunker.write(state, memoryview(bytes()))
+    assert list(state.chunks) == []
+    assert bytes(state.buffer) == bytes([9])
+
+    state = Chunker.close(state)
+    assert [bytes(chunk) for chunk in state.chunks] == [bytes([9])]
+    assert state.buffer.byte_length == 0
+
+
+def test_close_empty() -> None:
+    state = Chunker.close(Chunker.open(FixedSizeChunker(4)))
+    assert list(state.chunks) == []
+
+
+def test_stream() -> None:
+    content = bytes(range(256)) * 4
+    reads = [memoryview(content[offset : offset + 7]) for offset in range(0, 1024, 7)]
+    chunks = list(Chunker.stream(FixedSizeChunker(100), reads))
+    assert [chunk.byte_length for chunk in chunks] == [100] * 10 + [24]
+    assert b"".join(bytes(chunk) for chunk in chunks) == content
+
+
+def test_stream_carries_only_tail() -> None:
+    state = Chunker.open(FixedSizeChunker(100))
+    for _ in range(50):
+        state = Chunker.write(state, memoryview(bytes(7)))
+        assert state.buffer.byte_length < 100
+        assert len(state.buffer.segments) <= 16
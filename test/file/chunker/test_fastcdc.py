@@ -0,0 +1,73 @@
+import pytest
+import ipld_unixfs.file.chunker as Chunker
+from ipld_unixfs.file.chunker.fastcdc import FastCDCChunker, FastCDCContext
+from test.file.chunker.util import create_buffer, create_bytes
+
+
+def test_api() -> None:
+    chunker = FastCDCChunker(256, 1024, 4096)
+    assert chunker.name == "fastcdc"
+    assert chunker.type == "Stateless"
+    assert isinstance(chunker.context, FastCDCContext)
+    assert chunker.context.min_chunk_size == 256
+    assert chunker.context.avg_chunk_size == 1024
+    assert chunker.context.max_chunk_size == 4096
+
+
+def test_invalid_sizes() -> None:
+    with pytest.raises(ValueError):
+        FastCDCChunker(32, 1024, 4096)
+    with pytest.raises(ValueError):
+        FastCDCChunker(2048, 1024, 4096)
+
+
+def test_cut_respects_bounds() -> None:
+    chunker = FastCDCChunker(256, 1024, 4096, vectorize=False)
+    data = create_bytes(100_000)
+    sizes = chunker.cut(chunker.context, create_buffer(data, 100_000), True)
+    assert sum(sizes) == len(data)
+    assert all(256 <= size <= 4096 for size in sizes[:-1])
+    assert 0 < sizes[-1] <= 4096
+    # Content defined chunks should not all be cut at max size.
+    assert len(set(sizes)) > 10
+
+
+def test_cut_waits_for_max_chunk_size() -> None:
+    chunker = FastCDCChunker(256, 1024, 4096, vectorize=False)
+    buffer = create_buffer(create_bytes(4095), 4095)
+    assert chunker.cut(chunker.context, buffer) == []
+    assert sum(chunker.cut(chunker.context, buffer, True)) == 4095
+
+
+@pytest.mark.parametrize("segment_size", [1, 63, 64, 1000, 65_537, 100_000])
+def test_vectorized_matches_python(segment_size: int) -> None:
+    data = create_bytes(100_000, 1)
+    buffer = create_buffer(data, segment_size)
+    python = FastCDCChunker(256, 1024, 4096, vectorize=False)
+    numpy = FastCDCChunker(256, 1024, 4096, vectorize=True)
+    for end in [False, True]:
+        assert python.cut(python.context, buffer, end) == numpy.cut(
+            numpy.context, buffer, end
+        )
+
+
+def test_stream_matches_cut() -> None:
+    data = create_bytes(50_000, 2)
+    chunker = FastCDCChunker(256, 1024, 4096)
+    expect = chunker.cut(chunker.context, create_buffer(data, len(data)), True)
+    reads = [memoryview(data[offset : offset + 777]) for offset in range(0, len(data), 777)]
+    assert [chunk.byte_length for chunk in Chunker.stream(chunker, reads)] == expect
+
+
+def test_insert_only_changes_nearby_chunks() -> None:
+    data = create_bytes(200_000, 3)
+    edited = data[0:1000] + b"inserted" + data[1000:]
+    chunker = FastCDCChunker(256, 1024, 4096)
+
+    def chunks(content: bytes) -> set[bytes]:
+        reads = [memoryview(content)]
+        return {bytes(chunk) for chunk in Chunker.stream(chunker, reads)}
+
+    before = chunks(data)
+    after = chunks(edited)
+    assert len(before - after) <= 3
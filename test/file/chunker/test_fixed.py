@@ -1,6 +1,10 @@
 import pytest
 from ipld_unixfs.file.chunker import Chunk
-from ipld_unixfs.file.chunker.fixed import FixedSizeChunker, FixedSizeContext
+from ipld_unixfs.file.chunker.fixed import (
+    FixedSizeChunker,
+    FixedSizeContext,
+    FixedSizes,
+)
 
 
 class _TestChunk(Chunk):
@@ -54,3 +58,46 @@ def test_copy_to_non_zero_offset() -> None:
     chunk = _TestChunk(chunk_bytes)
     out = chunk.copy_to(memoryview(bytearray(2)), 5)
     assert bytes(out) == bytes([5, 6])
+
+
+def test_cut_is_lazy() -> None:
+    chunker = FixedSizeChunker(1024)
+    chunk = _TestChunk(bytes())
+    chunk.byte_length = 2**60 + 1
+    cuts = chunker.cut(chunker.context, chunk, True)
+    assert len(cuts) == 2**50 + 1
+    assert cuts[0] == 1024
+    assert cuts[2**50 - 1] == 1024
+    assert cuts[-1] == 1
+    with pytest.raises(IndexError):
+        cuts[2**50 + 1]
+
+
+def test_cut_uses_integer_division() -> None:
+    chunker = FixedSizeChunker(3)
+    chunk = _TestChunk(bytes())
+    chunk.byte_length = 3 * (2**55) - 1
+    cuts = chunker.cut(chunker.context, chunk, True)
+    assert len(cuts) == 2**55
+    assert cuts[-1] == 2
+
+
+def test_cut_sequence() -> None:
+    chunker = FixedSizeChunker(2)
+    cuts = chunker.cut(chunker.context, _TestChunk(bytes(7)), True)
+    assert list(cuts) == [2, 2, 2, 1]
+    assert cuts[1:] == [2, 2, 1]
+    assert cuts == chunker.cut(chunker.context, _TestChunk(bytes(7)), True)
+    assert cuts != [2, 2, 2]
+    assert chunker.cut(chunker.context, _TestChunk(bytes(6)), True) == [2, 2, 2, 0]
+    assert chunker.cut(chunker.context, _TestChunk(bytes(1))) == []
+
+
+def test_sizes_equality() -> None:
+    huge = 1 << 50
+    assert FixedSizes(huge, 4, 4) == FixedSizes(huge + 1, 4)
+    assert FixedSizes(huge, 4, 3) != FixedSizes(huge + 1, 4)
+    assert FixedSizes(huge, 4) != FixedSizes(huge, 5)
+    assert FixedSizes(0, 4, 7) == FixedSizes(1, 7) == [7]
+    assert FixedSizes(0, 4) == FixedSizes(0, 9) == []
+    assert FixedSizes(0, 4, 0) == FixedSizes(1, 0) != FixedSizes(0, 4)
@@ -0,0 +1,111 @@
+from pathlib import Path
+import pytest
+import ipld_unixfs.file.chunker as Chunker
+from ipld_unixfs.file import writer as FileWriter
+from ipld_unixfs.file.chunker.rabin import (
+    RabinChunker,
+    RabinContext,
+    default_polynomial,
+    mod,
+    with_avg,
+)
+from test.conftest import Kubo
+from test.file.chunker.util import create_buffer, create_bytes
+
+
+def naive_cut(context: RabinContext, data: bytes) -> list[int]:
+    """
+    Computes fingerprint of every window from scratch.
+    """
+    sizes = []
+    offset = 0
+    while offset < len(data):
+        limit = min(len(data) - offset, context.max_chunk_size)
+        size = limit
+        for n in range(context.min_chunk_size, limit + 1):
+            window = data[offset + n - context.window_size : offset + n]
+            if mod(int.from_bytes(window, "big"), context.polynomial) & context.mask == 0:
+                size = n
+                break
+        sizes.append(size)
+        offset += size
+    return sizes
+
+
+def test_api() -> None:
+    chunker = RabinChunker()
+    assert chunker.name == "rabin"
+    assert chunker.type == "Stateless"
+    assert isinstance(chunker.context, RabinContext)
+    assert chunker.context.polynomial == default_polynomial
+    assert chunker.context.window_size == 16
+    assert chunker.context.min_chunk_size == 262144 // 3
+    assert chunker.context.avg_chunk_size == 262144
+    assert chunker.context.max_chunk_size == 262144 + 262144 // 2
+
+    chunker = with_avg(1024)
+    assert chunker.context.min_chunk_size == 341
+    assert chunker.context.max_chunk_size == 1536
+    assert chunker.context.mask == 1023
+
+
+def test_invalid_sizes() -> None:
+    with pytest.raises(ValueError):
+        RabinChunker(8, 1024, 4096)
+    with pytest.raises(ValueError):
+        RabinChunker(2048, 1024, 4096)
+
+
+@pytest.mark.parametrize("vectorize", [False, True])
+def test_matches_naive_fingerprint(vectorize: bool) -> None:
+    data = create_bytes(20_000)
+    chunker = RabinChunker(64, 256, 1024, vectorize=vectorize)
+    sizes = chunker.cut(chunker.context, create_buffer(data, 1000), True)
+    assert sizes == naive_cut(chunker.context, data)
+    assert all(64 <= size <= 1024 for size in sizes[:-1])
+
+
+@pytest.mark.parametrize("segment_size", [1, 15, 16, 4096, 300_000])
+def test_vectorized_matches_python(segment_size: int) -> None:
+    data = create_bytes(300_000, 1)
+    buffer = create_buffer(data, segment_size)
+    python = RabinChunker(256, 1024, 4096, vectorize=False)
+    numpy = RabinChunker(256, 1024, 4096, vectorize=True)
+    for end in [False, True]:
+        assert python.cut(python.context, buffer, end) == numpy.cut(
+            numpy.context, buffer, end
+        )
+
+
+def test_stream_matches_cut() -> None:
+    data = create_bytes(50_000, 2)
+    chunker = RabinChunker(256, 1024, 4096)
+    expect = chunker.cut(chunker.context, create_buffer(data, len(data)), True)
+    reads = [memoryview(data[offset : offset + 777]) for offset in range(0, len(data), 777)]
+    assert [chunk.byte_length for chunk in Chunker.stream(chunker, reads)] == expect
+
+
+def test_small_input() -> None:
+    chunker = RabinChunker(256, 1024, 4096)
+    buffer = create_buffer(create_bytes(100), 100)
+    assert chunker.cut(chunker.context, buffer) == []
+    assert chunker.cut(chunker.context, buffer, True) == [100]
+
+
+@pytest.mark.parametrize(
+    "seed, sizes",
+    [(0, (16384, 65536, 131072)), (1, (87381, 262144, 393216))],
+)
+def test_kubo(
+    kubo: Kubo, tmp_path: Path, seed: int, sizes: tuple[int, int, int]
+) -> None:
+    path = tmp_path / "file"
+    path.write_bytes(create_bytes(3_000_000, seed))
+    config = FileWriter.configure(
+        chunker=RabinChunker(*sizes),
+        file_chunk_encoder=FileWriter.UnixFSRawLeaf,
+        small_file_encoder=FileWriter.UnixFSRawLeaf,
+    )
+    link = FileWriter.import_path(path, FileWriter.BlockList(), config)
+    chunker = "rabin-" + "-".join(str(size) for size in sizes)
+    assert link.cid == kubo.add(path, "--cid-version=1", f"--chunker={chunker}")
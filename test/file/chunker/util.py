@@ -0,0 +1,13 @@
+import random
+from ipld_unixfs.file.chunker.buffer import BufferView
+
+
+def create_bytes(size: int, seed: int = 0) -> bytes:
+    return random.Random(seed).randbytes(size)
+
+
+def create_buffer(data: bytes, segment_size: int) -> BufferView:
+    view = memoryview(data)
+    return BufferView.create(
+        [view[offset : offset + segment_size] for offset in range(0, len(data), segment_size)]
+    )
@@ -1,4 +1,6 @@
-from ipld_unixfs.file.layout.api import Branch, Leaf
+from random import Random
+from typing import Any, Union
+from ipld_unixfs.file.layout.api import Branch, CloseResult, Leaf, Node, WriteResult
 import ipld_unixfs.file.layout.balanced as Balanced
 from ipld_unixfs.file.chunker.buffer import BufferView
 
@@ -114,3 +116,191 @@ def test_overflows_into_second_node_at_width_boundary() -> None:
     assert list(result.leaves) == []
     assert result.nodes == [Branch(6, [4], None)]
     assert result.root == Branch(7, [5, 6], None)
+
+
+def chunks(start: int, end: int) -> list[BufferView]:
+    return [BufferView.create([n.to_bytes(4, "big")]) for n in range(start, end)]
+
+
+def test_mutable_updates_state_in_place() -> None:
+    layout = Balanced.open_mutable(3)
+    result = Balanced.write_mutable(layout, chunks(0, 1))
+    assert result.layout is layout
+    assert layout.head is not None
+
+    result = Balanced.write_mutable(layout, chunks(1, 4))
+    assert result.layout is layout
+    assert layout.head is None
+    assert [leaf.id for leaf in result.leaves] == [1, 2, 3, 4]
+    assert result.nodes == [Branch(5, [1, 2, 3], None)]
+    assert layout.leaf_index == [4]
+    assert layout.node_index == [[5]]
+
+
+def test_mutable_builds_multi_level_tree() -> None:
+    # Same tree as in the `Balanced` docstring
+    layout = Balanced.open_mutable(3)
+    nodes: list[Branch] = []
+    leaves: list[Leaf] = []
+    for n in range(10):
+        result = Balanced.write_mutable(layout, chunks(n, n + 1))
+        nodes.extend(result.nodes)
+        leaves.extend(result.leaves)
+
+    assert [leaf.id for leaf in leaves] == [1, 2, 3, 4, 6, 7, 8, 10, 11, 12]
+    assert nodes == [
+        Branch(5, [1, 2, 3], None),
+        Branch(9, [4, 6, 7], None),
+        Branch(13, [8, 10, 11], None),
+    ]
+
+    closed = Balanced.close_mutable(layout)
+    assert closed.nodes == [
+        Branch(14, [12], None),
+        Branch(15, [5, 9, 13], None),
+        Branch(16, [14], None),
+    ]
+    assert closed.root == Branch(17, [15, 16], None)
+
+
+def test_mutable_matches_immutable() -> None:
+    for width in [2, 3, 4]:
+        for count in range(0, width**4 + 2):
+            for batch in [1, 2, 5]:
+                layout = Balanced.open(width)
+                state = Balanced.open_mutable(width)
+                for offset in range(0, count, batch):
+                    batch_chunks = chunks(offset, min(offset + batch, count))
+                    expected = Balanced.write(layout, batch_chunks)
+                    actual = Balanced.write_mutable(state, batch_chunks)
+                    assert list(actual.nodes) == list(expected.nodes)
+                    assert list(actual.leaves) == list(expected.leaves)
+                    layout = expected.layout
+
+                assert Balanced.close_mutable(state) == Balanced.close(layout)
+
+
+def test_mutable_layout_engine() -> None:
+    engine = Balanced.mutable(2)
+    result = engine.write(engine.open(), chunks(0, 3))
+    assert result.nodes == [Branch(4, [1, 2], None)]
+    closed = engine.close(result.layout)
+    assert closed.nodes == [Branch(5, [3], None)]
+    assert closed.root == Branch(6, [4, 5], None)
+
+
+Tree = Union[int, list[Any]]
+
+
+def model(count: int, width: int) -> Tree:
+    """
+    Balanced tree of `count` leaves: every row is packed into nodes of `width`
+    children from left to right until a single row of at most `width` nodes
+    remains, which is linked from the root.
+    """
+    if count == 1:
+        return 0
+    row: list[Tree] = list(range(count))
+    while True:
+        row = [row[offset : offset + width] for offset in range(0, len(row), width)]
+        if len(row) <= width:
+            return row[0] if len(row) == 1 else row
+
+
+def resolve(results: list[WriteResult[Any]], closed: CloseResult) -> Tree:
+    nodes: dict[int, Node] = {}
+    for result in [*results, closed]:
+        for node in [*result.nodes, *result.leaves]:
+            assert node.id not in nodes
+            nodes[node.id] = node
+    assert closed.root.id not in nodes
+    nodes[closed.root.id] = closed.root
+
+    def build(id: int) -> Tree:
+        node = nodes.pop(id)
+        if isinstance(node, Leaf):
+            assert node.content is not None
+            return int.from_bytes(node.content.tobytes(), "big")
+        return [build(child) for child in node.children]
+
+    tree = build(closed.root.id)
+    assert nodes == {}
+    return tree
+
+
+def test_matches_model() -> None:
+    random = Random(0)
+    for _ in range(300):
+        width = random.randint(2, 6)
+        count = random.randint(1, width**4 * 2)
+        leaves = chunks(0, count)
+        results: list[WriteResult[Any]] = []
+        mutable_results: list[WriteResult[Any]] = []
+        layout = Balanced.open(width)
+        state = Balanced.open_mutable(width)
+        offset = 0
+        while offset < count:
+            size = random.choice([0, 1, 1, 2, 3, width, width + 1, 3 * width])
+            batch = leaves[offset : offset + size]
+            offset += size
+            result = Balanced.write(layout, batch)
+            # Persistent layout is not changed by writes
+            again = Balanced.write(layout, batch)
+            assert (again.nodes, again.leaves) == (result.nodes, result.leaves)
+            layout = result.layout
+            results.append(result)
+            mutable_results.append(Balanced.write_mutable(state, batch))
+
+        expected = model(count, width)
+        assert resolve(results, Balanced.close(layout)) == expected
+        assert resolve(mutable_results, Balanced.close_mutable(state)) == expected
+
+
+def check(count: int, width: int, batch: int, engine: Any) -> None:
+    """
+    Streams `count` leaves through the layout and checks that every emitted
+    branch links a contiguous range of equally deep subtrees, that all but the
+    last node of every level is full and that root covers all the leaves.
+    """
+    # Tracks (depth, first leaf, leaf count) of every node by id.
+    info: dict[int, tuple[int, int, int]] = {}
+    partial: dict[int, int] = {}
+    leaf = 0
+    chunk = BufferView.create([b"\0"])
+
+    def add(nodes: Any, leaves: Any) -> None:
+        nonlocal leaf
+        for node in leaves:
+            info[node.id] = (0, leaf, 1)
+            leaf += 1
+        for node in nodes:
+            children = [info.pop(child) for child in node.children]
+            assert 0 < len(children) <= width
+            depth = children[0][0]
+            first = children[0][1]
+            size = 0
+            for child in children:
+                assert child[0] == depth
+                assert child[1] == first + size
+                size += child[2]
+            if len(children) < width:
+                assert depth not in partial
+                partial[depth] = node.id
+            info[node.id] = (depth + 1, first, size)
+
+    layout = engine.open()
+    for offset in range(0, count, batch):
+        result = engine.write(layout, [chunk] * min(batch, count - offset))
+        layout = result.layout
+        add(result.nodes, result.leaves)
+
+    closed = engine.close(layout)
+    add([*closed.nodes, closed.root], closed.leaves)
+    assert leaf == count
+    assert info == {closed.root.id: (info[closed.root.id][0], 0, count)}
+
+
+def test_million_leaves() -> None:
+    check(1 << 20, 2, 1000, Balanced.BalancedLayout(2))
+    check(1 << 20, 3, 1000, Balanced.mutable(3))
+    check(1_000_003, 5, 7, Balanced.mutable(5))
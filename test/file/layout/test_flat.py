@@ -0,0 +1,96 @@
+from typing import Any, Sequence
+from ipld_unixfs.file.layout.api import Branch, Leaf, Node
+import ipld_unixfs.file.layout.balanced as Balanced
+import ipld_unixfs.file.layout.flat as Flat
+from ipld_unixfs.file.chunker.buffer import BufferView
+from ipld_unixfs.unixfs import Metadata
+
+
+def chunk(n: int) -> BufferView:
+    return BufferView.create([n.to_bytes(4, "big")])
+
+
+def normalize(nodes: Sequence[Node]) -> list[Any]:
+    return [
+        (node.id, list(node.children)) if isinstance(node, Branch) else node
+        for node in nodes
+    ]
+
+
+def test_empty_produces_empty_leaf_node() -> None:
+    result = Flat.close(Flat.open())
+    assert result.root == Leaf(1, None, None)
+    assert list(result.nodes) == []
+    assert list(result.leaves) == []
+
+
+def test_single_leaf_does_not_produce_root() -> None:
+    result = Flat.write(Flat.open(), [chunk(1)])
+    assert list(result.nodes) == []
+    assert list(result.leaves) == []
+
+    closed = Flat.close(result.layout)
+    assert closed.root == Leaf(1, chunk(1), None)
+
+
+def test_root_links_all_leaves() -> None:
+    metadata = Metadata()
+    metadata.mode = 0o644
+    metadata.mtime = None
+    result = Flat.write(Flat.open(width=4), [chunk(1)])
+    result = Flat.write(result.layout, [chunk(2), chunk(3)])
+    assert result.leaves == [
+        Leaf(1, chunk(1), None),
+        Leaf(2, chunk(2), None),
+        Leaf(3, chunk(3), None),
+    ]
+    result = Flat.write(result.layout, [chunk(4)])
+    assert result.leaves == [Leaf(4, chunk(4), None)]
+    assert list(result.nodes) == []
+    assert result.layout.balanced is None
+
+    closed = Flat.close(result.layout, metadata)
+    assert isinstance(closed.root, Branch)
+    assert closed.root.id == 5
+    assert list(closed.root.children) == [1, 2, 3, 4]
+    assert closed.root.metadata == metadata
+    assert list(closed.nodes) == []
+
+
+def test_falls_back_to_balanced() -> None:
+    result = Flat.write(Flat.open(width=3), [chunk(n) for n in range(1, 5)])
+    assert result.layout.balanced is not None
+    assert result.nodes == [Branch(5, [1, 2, 3], None)]
+    assert [leaf.id for leaf in result.leaves] == [1, 2, 3, 4]
+
+
+def test_matches_balanced() -> None:
+    for width in [2, 3, 5]:
+        for count in range(0, 40):
+            for batch in [1, 2, 7]:
+                flat = Flat.open(width)
+                balanced = Balanced.open(width)
+                for offset in range(0, count, batch):
+                    chunks = [
+                        chunk(n) for n in range(offset, min(offset + batch, count))
+                    ]
+                    left = Flat.write(flat, chunks)
+                    right = Balanced.write(balanced, chunks)
+                    assert normalize(left.nodes) == normalize(right.nodes)
+                    assert left.leaves == right.leaves
+                    flat = left.layout
+                    balanced = right.layout
+
+                closed = Flat.close(flat)
+                expected = Balanced.close(balanced)
+                assert normalize([closed.root]) == normalize([expected.root])
+                assert normalize(closed.nodes) == normalize(expected.nodes)
+                assert closed.leaves == expected.leaves
+
+
+def test_flat_layout_engine() -> None:
+    engine = Flat.with_width(4)
+    result = engine.write(engine.open(), [chunk(1), chunk(2)])
+    closed = engine.close(result.layout)
+    assert isinstance(closed.root, Branch)
+    assert list(closed.root.children) == [1, 2]
@@ -1,4 +1,5 @@
-from typing import Literal, MutableSequence, Sequence, TypedDict, Union
+from random import Random
+from typing import Any, Literal, MutableSequence, Sequence, TypedDict, Union
 import pytest
 from ipld_unixfs.file.layout.api import Branch, Node
 import ipld_unixfs.file.layout.queue as Queue
@@ -289,3 +290,113 @@ def test_random_operation_order(order: Sequence[Op]) -> None:
     ].sort(key=lambda l: len(l.links))
 
     assert list(queue.linked).sort(key=lambda l: len(l.links)) == expectedLinks
+
+
+def test_mutable_queue_needs_first_child() -> None:
+    queue = Queue.MutableQueue()
+    assert queue.is_empty() is True
+
+    queue.add_node(Branch(0, [1, 2]))
+    assert queue.is_empty() is False
+    assert queue.to_result() == Result(
+        mutable=False,
+        needs={1: 0, 2: 0},
+        links={},
+        nodes={0: PendingChildren([1, 2], 2)},
+        linked=[],
+    )
+
+    queue.add_link(2, create_link("b"))
+    assert queue.to_result() == Result(
+        mutable=False,
+        needs={1: 0},
+        links={2: create_link("b")},
+        nodes={0: PendingChildren([1, 2], 1)},
+        linked=[],
+    )
+
+    queue.add_link(1, create_link("a"))
+    assert queue.is_empty() is True
+    assert queue.drain() == [create_node(0, [create_link("a"), create_link("b")])]
+    assert queue.drain() == []
+
+
+def test_mutable_queue_links_ahead() -> None:
+    queue = Queue.MutableQueue()
+    queue.add_links([(1, create_link("a")), (2, create_link("b"))])
+    queue.add_nodes([Branch(0, [1, 2]), Branch(3, [])])
+    assert queue.is_empty() is True
+    assert queue.drain() == [
+        create_node(0, [create_link("a"), create_link("b")]),
+        create_node(3, []),
+    ]
+
+
+def test_mutable_queue_from_queue() -> None:
+    source = Queue.add_node(Branch(0, [1, 2]), Queue.empty())
+    queue = Queue.MutableQueue(source)
+    queue.add_links([(1, create_link("a")), (2, create_link("b"))])
+    assert queue.drain() == [create_node(0, [create_link("a"), create_link("b")])]
+    assert source.nodes == {0: PendingChildren([1, 2], 2)}
+
+
+@pytest.mark.parametrize("order", orders, ids=titles)
+def test_mutable_queue_matches_immutable(order: Sequence[Op]) -> None:
+    queue = Queue.empty()
+    mutable = Queue.MutableQueue()
+    for op in order:
+        if op.get("type") == "addLink":
+            queue = Queue.add_link(op.get("id"), op.get("link"), queue)
+            mutable.add_link(op.get("id"), op.get("link"))
+        else:
+            queue = Queue.add_node(op.get("node"), queue)
+            mutable.add_node(op.get("node"))
+        assert mutable.to_result() == queue
+
+
+def test_mutable_queue_fills_slots_in_place() -> None:
+    queue = Queue.MutableQueue()
+    queue.add_link(3, create_link("c"))
+    queue.add_node(Branch(0, [1, 2, 3]))
+    pending = queue.nodes[0]
+    assert pending.slots == [None, None, create_link("c")]
+    assert queue.needs == {1: (pending, 0), 2: (pending, 1)}
+
+    queue.add_link(2, create_link("b"))
+    assert pending.slots == [None, create_link("b"), create_link("c")]
+    assert pending.count == 1
+
+    queue.add_link(1, create_link("a"))
+    [linked] = queue.drain()
+    assert linked.links is pending.slots
+    assert linked == create_node(
+        0, [create_link("a"), create_link("b"), create_link("c")]
+    )
+    assert queue.needs == {}
+    assert queue.is_empty()
+
+
+def test_mutable_queue_random_order() -> None:
+    random = Random(1)
+    for _ in range(20):
+        width = random.randint(1, 8)
+        count = random.randint(1, 200)
+        ops: list[tuple[str, Any]] = [
+            ("link", (id, create_link(str(id)))) for id in range(count)
+        ]
+        for offset in range(0, count, width):
+            children = list(range(offset, min(offset + width, count)))
+            ops.append(("node", Branch(count + offset, children)))
+        random.shuffle(ops)
+
+        queue = Queue.empty()
+        mutable = Queue.MutableQueue()
+        for kind, op in ops:
+            if kind == "link":
+                queue = Queue.add_link(op[0], op[1], queue)
+                mutable.add_link(op[0], op[1])
+            else:
+                queue = Queue.add_node(op, queue)
+                mutable.add_node(op)
+        assert mutable.to_result() == queue
+        assert mutable.is_empty()
@@ -0,0 +1,161 @@
+from typing import Any, Iterator, Optional, Union
+from ipld_unixfs.file.layout.api import Branch, Leaf, Node
+import ipld_unixfs.file.layout.trickle as Trickle
+from ipld_unixfs.file.chunker.buffer import BufferView
+
+Tree = Union[int, list[Any]]
+
+
+def chunk(n: int) -> BufferView:
+    return BufferView.create([n.to_bytes(4, "big")])
+
+
+def reference(
+    leaves: Iterator[int], options: Trickle.Options, max_depth: Optional[int] = None
+) -> Optional[list[Tree]]:
+    """
+    Recursive trickle builder following `fillTrickleRec` of go-unixfs, returns
+    the tree as nested lists of leaf numbers or `None` if there were no leaves
+    for a subtree. Root is returned even if there were no leaves.
+    """
+    children: list[Tree] = []
+    for _ in range(options.max_direct_leaves):
+        leaf = next(leaves, None)
+        if leaf is None:
+            return children if len(children) > 0 or max_depth is None else None
+        children.append(leaf)
+
+    depth = 1
+    while max_depth is None or depth < max_depth:
+        for _ in range(options.layer_repeat):
+            subtree = reference(leaves, options, depth)
+            if subtree is None:
+                return children
+            children.append(subtree)
+        depth += 1
+
+    return children
+
+
+def build(count: int, options: Trickle.Options, batch: int = 3) -> Tree:
+    """
+    Writes `count` chunks in batches of `batch` and reassembles the emitted
+    nodes into nested lists of leaf numbers.
+    """
+    layout = Trickle.open(options)
+    nodes: dict[int, Node] = {}
+    chunks = [chunk(n) for n in range(1, count + 1)]
+    for offset in range(0, count, batch):
+        result = Trickle.write(layout, chunks[offset : offset + batch])
+        layout = result.layout
+        for node in [*result.nodes, *result.leaves]:
+            assert node.id not in nodes
+            nodes[node.id] = node
+
+    closed = Trickle.close(layout)
+    for node in [*closed.nodes, *closed.leaves]:
+        assert node.id not in nodes
+        nodes[node.id] = node
+    nodes[closed.root.id] = closed.root
+
+    def resolve(id: int) -> Tree:
+        node = nodes.pop(id)
+        if isinstance(node, Leaf):
+            assert node.content is not None
+            return int.from_bytes(node.content.tobytes(), "big")
+        return [resolve(child) for child in node.children]
+
+    tree = resolve(closed.root.id)
+    assert nodes == {}
+    return tree
+
+
+def test_empty_produces_root_without_children() -> None:
+    result = Trickle.close(Trickle.open())
+    assert result.root == Branch(1, [], None)
+    assert list(result.nodes) == []
+    assert list(result.leaves) == []
+
+
+def test_single_leaf_produces_a_root() -> None:
+    result = Trickle.write(Trickle.open(), [chunk(1)])
+    assert list(result.nodes) == []
+    assert result.leaves == [Leaf(1, chunk(1), None)]
+
+    closed = Trickle.close(result.layout)
+    assert closed.root == Branch(2, [1], None)
+    assert list(closed.nodes) == []
+
+
+def test_two_leaves_produce_a_root() -> None:
+    result = Trickle.write(Trickle.open(), [chunk(1), chunk(2)])
+    assert list(result.nodes) == []
+    assert result.leaves == [Leaf(1, chunk(1), None), Leaf(2, chunk(2), None)]
+
+    closed = Trickle.close(result.layout)
+    assert closed.root == Branch(3, [1, 2], None)
+    assert list(closed.nodes) == []
+
+
+def test_emits_complete_subtrees_eagerly() -> None:
+    options = Trickle.Options(max_direct_leaves=2, layer_repeat=1)
+    result = Trickle.write(Trickle.open(options), [chunk(n) for n in range(1, 5)])
+    # Root holds leaves 1 and 2 and the depth 1 subtree of leaves 3 and 4 is
+    # complete once the 4th leaf is written.
+    assert result.nodes == [Branch(5, [3, 4], None)]
+    assert [leaf.id for leaf in result.leaves] == [1, 2, 3, 4]
+
+    result = Trickle.write(result.layout, [chunk(n) for n in range(5, 9)])
+    assert result.nodes == [Branch(10, [8, 9], None), Branch(11, [6, 7, 10], None)]
+    assert [leaf.id for leaf in result.leaves] == [6, 7, 8, 9]
+
+    closed = Trickle.close(result.layout)
+    assert closed.root == Branch(12, [1, 2, 5, 11], None)
+    assert list(closed.nodes) == []
+
+
+def test_state_is_bounded_by_depth() -> None:
+    options = Trickle.Options(max_direct_leaves=4, layer_repeat=2)
+    layout = Trickle.open(options)
+    for n in range(1, 2000):
+        layout = Trickle.write(layout, [chunk(n)]).layout
+        assert len(layout.stack) <= 8
+
+
+def test_write_does_not_mutate_layout() -> None:
+    options = Trickle.Options(max_direct_leaves=2, layer_repeat=2)
+    first = Trickle.write(Trickle.open(options), [chunk(n) for n in range(1, 6)])
+    second = Trickle.write(first.layout, [chunk(n) for n in range(6, 12)])
+    Trickle.close(first.layout)
+    again = Trickle.write(first.layout, [chunk(n) for n in range(6, 12)])
+    assert second.nodes == again.nodes
+    assert Trickle.close(second.layout) == Trickle.close(again.layout)
+
+
+def test_matches_reference() -> None:
+    for options in [
+        Trickle.Options(max_direct_leaves=1, layer_repeat=1),
+        Trickle.Options(max_direct_leaves=2, layer_repeat=1),
+        Trickle.Options(max_direct_leaves=3, layer_repeat=2),
+        Trickle.Options(max_direct_leaves=4, layer_repeat=4),
+    ]:
+        for count in range(0, 200):
+            expected = reference(iter(range(1, count + 1)), options)
+            for batch in [1, 4, 7]:
+                assert build(count, options, batch) == expected, (options, count)
+
+
+def test_matches_reference_with_defaults() -> None:
+    for count in [0, 1, 2, 174, 175, 174 * 5, 174 * 5 + 1, 174 * 9 + 17]:
+        expected = reference(iter(range(1, count + 1)), Trickle.defaults)
+        assert build(count, Trickle.defaults, 64) == expected
+
+
+def test_trickle_layout_engine() -> None:
+    engine = Trickle.configure(max_direct_leaves=2, layer_repeat=1)
+    layout = engine.open()
+    result = engine.write(layout, [chunk(n) for n in range(1, 4)])
+    closed = engine.close(result.layout)
+    assert isinstance(closed.root, Branch)
+    assert closed.nodes == [Branch(4, [3], None)]
+    assert closed.root == Branch(5, [1, 2, 4], None)
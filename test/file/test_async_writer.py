@@ -0,0 +1,166 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from ipld_unixfs.file import async_writer as AsyncFileWriter
+from ipld_unixfs.file import writer as FileWriter
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.multiformats.block import Block
+from ipld_unixfs.unixfs import FileLink, Metadata
+from test.file.test_writer import read_file, write_file
+
+CONTENT = bytes(range(251)) * 40
+CONFIG = FileWriter.configure(chunker=FixedSizeChunker(100))
+
+
+async def collect(file: AsyncFileWriter.AsyncFileWriter) -> list[Block]:
+    return [block async for block in file]
+
+
+async def ingest(
+    file: AsyncFileWriter.AsyncFileWriter, content: bytes, write_size: int
+) -> FileLink:
+    for offset in range(0, len(content), write_size):
+        await file.write(content[offset : offset + write_size])
+    return await file.close()
+
+
+def test_matches_sync_writer() -> None:
+    async def main() -> tuple[FileLink, list[Block]]:
+        file = AsyncFileWriter.create(CONFIG, Metadata(mode=0o600))
+        link, blocks = await asyncio.gather(ingest(file, CONTENT, 333), collect(file))
+        return link, blocks
+
+    link, blocks = asyncio.run(main())
+    expect, expect_blocks = write_file(CONTENT, CONFIG, Metadata(mode=0o600))
+    assert link == expect
+    assert [block.cid for block in blocks] == [block.cid for block in expect_blocks]
+    assert read_file({block.cid: block for block in blocks}, link.cid) == CONTENT
+
+
+def test_executor() -> None:
+    async def main() -> tuple[FileLink, list[Block]]:
+        with ThreadPoolExecutor(1) as executor:
+            file = AsyncFileWriter.create(CONFIG, executor=executor)
+            link, blocks = await asyncio.gather(
+                ingest(file, CONTENT, 1000), collect(file)
+            )
+            return link, blocks
+
+    link, blocks = asyncio.run(main())
+    assert link == write_file(CONTENT, CONFIG)[0]
+    assert read_file({block.cid: block for block in blocks}, link.cid) == CONTENT
+
+
+def test_backpressure() -> None:
+    async def main() -> None:
+        file = AsyncFileWriter.create(CONFIG, high_water_mark=4)
+        # Single chunk is buffered by the chunker and fits the queue
+        await asyncio.wait_for(file.write(CONTENT[:450]), 1)
+        assert file.blocks.qsize() == 4
+        # Next write does not fit, so it waits on the consumer
+        write = asyncio.ensure_future(file.write(CONTENT[450:1000]))
+        await asyncio.sleep(0.01)
+        assert not write.done()
+        assert file.blocks.full()
+
+        # Every read lets one more block in
+        reader = file.read()
+        reads = 0
+        while not write.done():
+            await reader.__anext__()
+            reads += 1
+            await asyncio.sleep(0)
+        assert reads == 6
+        assert file.blocks.qsize() == 4
+
+        close = asyncio.ensure_future(file.close())
+        blocks = [block async for block in reader]
+        link = await close
+        assert blocks[-1].cid == link.cid
+        assert link.contentByteLength == 1000
+
+    asyncio.run(main())
+
+
+def test_cancelled_write() -> None:
+    async def main() -> None:
+        file = AsyncFileWriter.create(CONFIG, high_water_mark=2)
+        # Write does not fit the queue and gets cancelled while waiting on it
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(file.write(CONTENT[:1000]), 0.01)
+        assert file.blocks.full()
+        assert len(file.pending) > 0
+
+        blocks, link = await asyncio.gather(collect(file), file.close())
+        expect, expect_blocks = write_file(CONTENT[:1000], CONFIG)
+        assert link == expect
+        assert [block.cid for block in blocks] == [
+            block.cid for block in expect_blocks
+        ]
+
+    asyncio.run(main())
+
+
+def test_cancelled_executor_write() -> None:
+    started = threading.Event()
+    release = threading.Event()
+    running = 0
+    overlaps = 0
+
+    async def main() -> FileLink:
+        nonlocal running, overlaps
+        with ThreadPoolExecutor(2) as executor:
+            file = AsyncFileWriter.create(CONFIG, executor=executor)
+            write = file.writer.write
+
+            def blocking_write(data: bytes) -> None:
+                nonlocal running, overlaps
+                running += 1
+                overlaps += running > 1
+                started.set()
+                release.wait(1)
+                write(data)
+                running -= 1
+
+            file.writer.write = blocking_write  # type: ignore[method-assign]
+            first = asyncio.ensure_future(file.write(CONTENT[:500]))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 1)
+            # Write is cancelled while its bytes are written on the executor
+            first.cancel()
+            second = asyncio.ensure_future(file.write(CONTENT[500:1000]))
+            await asyncio.sleep(0.01)
+            assert not first.done()
+            assert not second.done()
+
+            release.set()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            await second
+            link, _ = await asyncio.gather(file.close(), collect(file))
+            return link
+
+    link = asyncio.run(main())
+    assert overlaps == 0
+    assert link == write_file(CONTENT[:1000], CONFIG)[0]
+
+
+def test_close() -> None:
+    async def main() -> None:
+        file = AsyncFileWriter.create()
+        await file.write(b"hello")
+        link = await file.close()
+        assert await file.close() == link
+        assert [block.cid for block in await collect(file)] == [link.cid]
+        with pytest.raises(ValueError):
+            await file.write(b"world")
+
+    asyncio.run(main())
+
+
+def test_high_water_mark() -> None:
+    async def main() -> None:
+        with pytest.raises(ValueError):
+            AsyncFileWriter.create(high_water_mark=0)
+
+    asyncio.run(main())
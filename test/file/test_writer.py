@@ -0,0 +1,342 @@
+import gc
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator, Optional
+import pytest
+from multiformats import CID, multihash
+from ipld_unixfs import codec
+from ipld_unixfs.file import writer as FileWriter
+from ipld_unixfs.file.chunker.buffer import BufferView
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.file.layout.balanced import BalancedLayout
+from ipld_unixfs.file.layout.trickle import TrickleLayout
+from ipld_unixfs.multiformats.block import Block
+from ipld_unixfs.unixfs import Metadata, MTime
+from test.conftest import Kubo
+
+
+def read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            return value, offset
+
+
+def read_fields(data: bytes) -> Iterator[tuple[int, Any]]:
+    offset = 0
+    while offset < len(data):
+        key, offset = read_varint(data, offset)
+        if key & 7 == 0:
+            value, offset = read_varint(data, offset)
+        elif key & 7 == 2:
+            length, offset = read_varint(data, offset)
+            value = data[offset : offset + length]
+            offset += length
+        else:
+            raise ValueError(f"unexpected wire type {key & 7}")
+        yield key >> 3, value
+
+
+def as_bytes(block: Block) -> bytes:
+    data = block.bytes
+    return data.tobytes() if isinstance(data, BufferView) else bytes(data)
+
+
+def read_file(blocks: dict[CID, Block], cid: CID) -> bytes:
+    """
+    Reads the file content and checks that sizes recorded in the file nodes
+    match sizes of the linked blocks.
+    """
+    block = blocks[cid]
+    data = as_bytes(block)
+    if cid.codec.name == "raw":
+        return data
+
+    links: list[tuple[CID, int]] = []
+    unixfs = b""
+    for field, value in read_fields(data):
+        if field == 2:
+            link = dict(read_fields(value))
+            assert link[2] == b""
+            links.append((CID.decode(link[1]), link[3]))
+        elif field == 1:
+            unixfs = value
+
+    content = b""
+    filesize = None
+    blocksizes = []
+    for field, value in read_fields(unixfs):
+        if field == 1:
+            assert value == 2
+        elif field == 2:
+            content = value
+        elif field == 3:
+            filesize = value
+        elif field == 4:
+            blocksizes.append(value)
+
+    for (child, tsize), blocksize in zip(links, blocksizes):
+        part = read_file(blocks, child)
+        assert len(part) == blocksize
+        assert tsize == dag_size(blocks, child)
+        content += part
+
+    assert len(links) == len(blocksizes)
+    assert filesize == len(content)
+    return content
+
+
+def dag_size(blocks: dict[CID, Block], cid: CID) -> int:
+    size = blocks[cid].byte_length
+    if cid.codec.name != "raw":
+        for field, value in read_fields(as_bytes(blocks[cid])):
+            if field == 2:
+                size += dag_size(blocks, CID.decode(dict(read_fields(value))[1]))
+    return size
+
+
+def write_file(
+    content: bytes,
+    config: Optional[FileWriter.Config] = None,
+    metadata: Optional[Metadata] = None,
+    write_size: int = 7,
+) -> tuple[FileWriter.FileLink, list[Block]]:
+    blocks = FileWriter.BlockList()
+    file = FileWriter.create(blocks, config, metadata)
+    for offset in range(0, len(content), write_size):
+        file.write(content[offset : offset + write_size])
+    return file.close(), blocks
+
+
+def test_empty_file() -> None:
+    link, blocks = write_file(b"")
+    digest = multihash.digest(bytes.fromhex("0a0408021800"), "sha2-256")
+    assert link.cid == CID("base32", 1, "dag-pb", digest)
+    assert link.contentByteLength == 0
+    assert link.dagByteLength == 6
+    assert [block.cid for block in blocks] == [link.cid]
+
+
+def test_small_file() -> None:
+    link, blocks = write_file(b"hello world\n", write_size=3)
+    assert link.cid.set(version=0, base="base58btc") == CID.decode(
+        "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o"
+    )
+    assert link.contentByteLength == 12
+    assert len(blocks) == 1
+
+
+def test_small_file_metadata() -> None:
+    metadata = Metadata(mode=0o755, mtime=MTime(1, 2))
+    link, blocks = write_file(b"hello", metadata=metadata)
+    assert as_bytes(blocks[0]) == codec.encode_simple_file(b"hello", metadata)
+
+
+def test_multi_block_file() -> None:
+    content = bytes(range(256)) * 40
+    config = FileWriter.configure(
+        chunker=FixedSizeChunker(100), file_layout=BalancedLayout(4)
+    )
+    link, blocks = write_file(content, config, write_size=333)
+    index = {block.cid: block for block in blocks}
+    assert len(index) < len(blocks), "duplicate leaves are written as is"
+    assert blocks[-1].cid == link.cid
+    assert link.contentByteLength == len(content)
+    assert link.dagByteLength == dag_size(index, link.cid)
+    assert read_file(index, link.cid) == content
+
+
+def test_root_metadata() -> None:
+    metadata = Metadata(mode=0o600)
+    config = FileWriter.configure(chunker=FixedSizeChunker(4))
+    link, blocks = write_file(b"hello world", config, metadata)
+    unixfs = dict(read_fields(dict(read_fields(as_bytes(blocks[-1])))[1]))
+    assert unixfs[7] == 0o600
+    # Shards have no metadata
+    for block in blocks[:-1]:
+        unixfs = dict(read_fields(dict(read_fields(as_bytes(block)))[1]))
+        assert 7 not in unixfs
+
+
+def test_raw_leaves() -> None:
+    content = b"0123456789" * 100
+    config = FileWriter.configure(
+        chunker=FixedSizeChunker(64),
+        file_chunk_encoder=FileWriter.UnixFSRawLeaf,
+        small_file_encoder=FileWriter.UnixFSRawLeaf,
+    )
+    link, blocks = write_file(content, config, write_size=100)
+    leaves = [block for block in blocks if block.cid.codec.name == "raw"]
+    assert len(leaves) == 16
+    # Raw leaves are backed by the written memory
+    assert all(isinstance(leaf.bytes, BufferView) for leaf in leaves)
+    assert read_file({block.cid: block for block in blocks}, link.cid) == content
+
+    small, blocks = write_file(b"hi", config)
+    assert small.cid.codec.name == "raw"
+    assert small.dagByteLength == 2
+
+
+def test_layouts_agree_on_content() -> None:
+    content = bytes(range(251)) * 50
+    links = []
+    for layout in [
+        BalancedLayout(3),
+        FileWriter.MutableBalancedLayout(3),
+        TrickleLayout(3, 2),
+    ]:
+        config = FileWriter.configure(chunker=FixedSizeChunker(50), file_layout=layout)
+        link, blocks = write_file(content, config, write_size=1000)
+        index = {block.cid: block for block in blocks}
+        assert read_file(index, link.cid) == content
+        links.append(link)
+
+    assert links[0] == links[1]
+    assert links[0].cid != links[2].cid
+
+
+def test_trickle_small_files() -> None:
+    config = FileWriter.configure(
+        file_chunk_encoder=FileWriter.UnixFSRawLeaf,
+        small_file_encoder=FileWriter.UnixFSRawLeaf,
+        file_layout=TrickleLayout(),
+    )
+    # Empty root has no links, so it is encoded same as the empty file.
+    empty, blocks = write_file(b"", config)
+    assert empty == write_file(b"")[0]
+    assert len(blocks) == 1
+
+    # Root links the single leaf instead of being the leaf.
+    link, blocks = write_file(b"hello world\n", config)
+    index = {block.cid: block for block in blocks}
+    assert link.cid.codec.name == "dag-pb"
+    assert read_file(index, link.cid) == b"hello world\n"
+    assert [block.cid.codec.name for block in blocks] == ["raw", "dag-pb"]
+
+
+def test_close_is_idempotent() -> None:
+    blocks = FileWriter.BlockList()
+    file = FileWriter.create(blocks)
+    file.write(b"hello")
+    link = file.close()
+    assert file.close() == link
+    assert len(blocks) == 1
+    with pytest.raises(ValueError):
+        file.write(b"world")
+
+
+def test_parallel_matches_serial() -> None:
+    content = bytes(range(251)) * 40
+    with ThreadPoolExecutor(4) as executor:
+        for leaf in [FileWriter.UnixFSLeaf, FileWriter.UnixFSRawLeaf]:
+            for layout in [FileWriter.MutableBalancedLayout(5), TrickleLayout(3, 2)]:
+                config = FileWriter.configure(
+                    chunker=FixedSizeChunker(97),
+                    file_chunk_encoder=leaf,
+                    file_layout=layout,
+                )
+                expect, expect_blocks = write_file(content, config)
+                for max_pending in [1, 8, 64]:
+                    blocks = FileWriter.BlockList()
+                    file = FileWriter.ParallelFileWriter(
+                        blocks, executor, config, max_pending=max_pending
+                    )
+                    for offset in range(0, len(content), 1000):
+                        file.write(content[offset : offset + 1000])
+                    link = file.close()
+                    assert link == expect
+                    assert blocks[-1].cid == link.cid
+                    assert sorted(str(block.cid) for block in blocks) == sorted(
+                        str(block.cid) for block in expect_blocks
+                    )
+                    assert file.pending == {}
+
+
+def test_parallel_small_file() -> None:
+    with ThreadPoolExecutor(2) as executor:
+        for content in [b"", b"hello world\n"]:
+            blocks = FileWriter.BlockList()
+            file = FileWriter.create(blocks, executor=executor)
+            file.write(content)
+            assert file.close() == write_file(content)[0]
+            assert len(blocks) == 1
+
+
+def test_import_path(tmp_path: Path) -> None:
+    content = bytes(range(251)) * 40
+    path = tmp_path / "file"
+    path.write_bytes(content)
+    config = FileWriter.configure(
+        chunker=FixedSizeChunker(100), file_layout=BalancedLayout(4)
+    )
+    blocks = FileWriter.BlockList()
+    link = FileWriter.import_path(path, blocks, config, Metadata(mode=0o600))
+    expect, expect_blocks = write_file(content, config, Metadata(mode=0o600))
+    assert link == expect
+    assert {block.cid for block in blocks} == {block.cid for block in expect_blocks}
+
+    empty = tmp_path / "empty"
+    empty.write_bytes(b"")
+    assert FileWriter.import_path(empty, FileWriter.BlockList()) == write_file(b"")[0]
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requires named pipes")
+def test_import_path_pipe(tmp_path: Path) -> None:
+    content = bytes(range(251)) * 40
+    path = tmp_path / "pipe"
+    os.mkfifo(path)
+    thread = threading.Thread(target=path.write_bytes, args=(content,))
+    thread.start()
+    config = FileWriter.configure(chunker=FixedSizeChunker(100))
+    link = FileWriter.import_path(path, FileWriter.BlockList(), config)
+    thread.join()
+    assert link == write_file(content, config)[0]
+
+
+def test_import_mmap_raw_leaves(tmp_path: Path) -> None:
+    content = b"0123456789" * 100
+    path = tmp_path / "file"
+    path.write_bytes(content)
+    config = FileWriter.configure(
+        chunker=FixedSizeChunker(64), file_chunk_encoder=FileWriter.UnixFSRawLeaf
+    )
+    with open(path, "rb") as fd:
+        mm = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+    blocks = FileWriter.BlockList()
+    link = FileWriter.import_mmap(mm, blocks, config, write_size=100)
+    assert link == write_file(content, config)[0]
+    # Raw leaves are views of the mapping
+    leaves = [block for block in blocks if block.cid.codec.name == "raw"]
+    assert len(leaves) == 16
+    for leaf in leaves:
+        assert isinstance(leaf.bytes, BufferView)
+        assert all(segment.obj is mm for segment in leaf.bytes.segments)
+    with pytest.raises(BufferError):
+        mm.close()
+    del leaves, leaf, blocks
+    # CID validation leaves reference cycles holding on to encoded leaves.
+    gc.collect()
+    mm.close()
+
+
+@pytest.mark.parametrize("size", [0, 1000, 200_000, 2_000_000])
+def test_trickle_kubo(kubo: Kubo, tmp_path: Path, size: int) -> None:
+    path = tmp_path / "file"
+    path.write_bytes(bytes(range(251)) * (size // 251))
+    config = FileWriter.configure(
+        chunker=FixedSizeChunker(1024),
+        file_chunk_encoder=FileWriter.UnixFSRawLeaf,
+        small_file_encoder=FileWriter.UnixFSRawLeaf,
+        file_layout=TrickleLayout(),
+    )
+    link = FileWriter.import_path(path, FileWriter.BlockList(), config)
+    options = ["--cid-version=1", "--chunker=size-1024", "--trickle"]
+    assert link.cid == kubo.add(path, *options)
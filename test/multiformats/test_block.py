@@ -0,0 +1,72 @@
+import hashlib
+from multiformats import CID, multihash
+from ipld_unixfs import codec
+from ipld_unixfs.file.chunker.buffer import BufferView
+from ipld_unixfs.multiformats import block as Block
+from ipld_unixfs.multiformats.codecs import raw
+from ipld_unixfs.multiformats.hasher import sha256
+from ipld_unixfs.unixfs import SimpleFile
+
+
+def test_raw_encoder_hands_out_chunk() -> None:
+    chunk = BufferView.create([b"hello ", b"world"])
+    assert raw.encoder.encode(chunk) is chunk
+    assert raw.encoder.code == 0x55
+
+
+def test_raw_block_is_backed_by_chunk() -> None:
+    source = bytearray(b"hello world")
+    chunk = BufferView.create([memoryview(source)[0:6], memoryview(source)[6:]])
+    block = Block.encode(chunk, raw.encoder)
+    assert block.bytes is chunk
+    assert block.byte_length == 11
+    assert block.cid == CID(
+        "base32", 1, "raw", multihash.digest(b"hello world", "sha2-256")
+    )
+    # Block shares memory with the source
+    source[0:5] = b"HELLO"
+    assert isinstance(block.bytes, BufferView)
+    assert block.bytes.tobytes() == b"HELLO world"
+
+
+def test_hashes_segments() -> None:
+    chunk = BufferView.create([b"a" * 1000, b"b" * 10, b"c"])
+    assert sha256.digest(chunk) == hashlib.sha256(chunk.tobytes()).digest()
+    assert sha256.digest(b"abc") == hashlib.sha256(b"abc").digest()
+    assert sha256.code == 0x12
+
+
+class Segments:
+    """
+    Segmented bytes other than the `BufferView`.
+    """
+
+    def __init__(self, *segments: bytes) -> None:
+        self.segments = [memoryview(segment) for segment in segments]
+        self.byte_length = sum(len(segment) for segment in segments)
+
+    def copy_to(self, target: memoryview, offset: int = 0) -> memoryview:
+        for segment in self.segments:
+            target[offset : offset + len(segment)] = segment
+            offset += len(segment)
+        return target
+
+
+def test_segmented_bytes() -> None:
+    block = Block.encode(Segments(b"hello", b" ", b"world"), raw.encoder)
+    assert block.byte_length == 11
+    assert block.cid == Block.encode(b"hello world", raw.encoder).cid
+
+
+def test_raw_bytes_block() -> None:
+    block = Block.encode(b"hello world", raw.encoder)
+    assert block.bytes == b"hello world"
+    assert str(block.cid) == str(
+        CID("base32", 1, "raw", multihash.digest(b"hello world", "sha2-256"))
+    )
+
+
+def test_dag_pb_block() -> None:
+    block = Block.encode(SimpleFile(b"hello world\n"), codec.encoder, version=0)
+    assert str(block.cid) == "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o"
+    assert block.byte_length == len(codec.encode_simple_file(b"hello world\n"))
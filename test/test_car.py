@@ -0,0 +1,242 @@
+import io
+import os
+from itertools import accumulate
+from pathlib import Path
+from typing import BinaryIO, Callable, Sequence
+import dag_cbor
+import pytest
+from multiformats import CID, varint
+from ipld_unixfs import car as CarWriter
+from ipld_unixfs.file import writer as FileWriter
+from ipld_unixfs.file.chunker.fixed import FixedSizeChunker
+from ipld_unixfs.multiformats.block import Block, create as create_block
+from ipld_unixfs.multiformats.hasher import sha256
+from ipld_unixfs.unixfs import FileLink
+from test.file.test_writer import as_bytes, read_file
+
+CONTENT = bytes(range(256)) * 100
+CONFIG = FileWriter.configure(
+    chunker=FixedSizeChunker(1000), file_chunk_encoder=FileWriter.UnixFSRawLeaf
+)
+
+
+def read_car(data: bytes) -> tuple[list[CID], list[tuple[CID, bytes]]]:
+    stream = io.BytesIO(data)
+    length = varint.decode(stream)
+    header = dag_cbor.decode(stream.read(length))
+    assert isinstance(header, dict) and header["version"] == 1
+    blocks = []
+    while stream.tell() < len(data):
+        length = varint.decode(stream)
+        section = stream.read(length)
+        cid = CID.decode(section[:36])
+        blocks.append((cid, section[36:]))
+    roots = header["roots"]
+    assert isinstance(roots, list)
+    return [root for root in roots if isinstance(root, CID)], blocks
+
+
+def write_file(car: CarWriter.CarWriter) -> tuple[FileLink, list[Block]]:
+    blocks = FileWriter.BlockList()
+
+    class Tee:
+        def write(self, block: Block, /) -> None:
+            blocks.write(block)
+            car.write(block)
+
+    file = FileWriter.create(Tee(), CONFIG)
+    for offset in range(0, len(CONTENT), 4096):
+        file.write(CONTENT[offset : offset + 4096])
+    return file.close(), blocks
+
+
+def check(data: bytes, roots: Sequence[CID], blocks: list[Block]) -> None:
+    car_roots, car_blocks = read_car(data)
+    assert car_roots == list(roots)
+    assert car_blocks == [(block.cid, as_bytes(block)) for block in blocks]
+
+
+def test_descriptor(tmp_path: Path) -> None:
+    path = tmp_path / "file.car"
+    with open(path, "wb") as fd:
+        car = CarWriter.create(fd.fileno(), buffer_size=10_000)
+        link, blocks = write_file(car)
+        size = car.close([link.cid])
+    data = path.read_bytes()
+    assert len(data) == size
+    check(data, [link.cid], blocks)
+    index = {cid: Block(cid, data) for cid, data in read_car(data)[1]}
+    assert read_file(index, link.cid) == CONTENT
+
+
+def test_file_object() -> None:
+    file = io.BytesIO()
+    car = CarWriter.create(file)
+    link, blocks = write_file(car)
+    car.close([link.cid])
+    check(file.getvalue(), [link.cid], blocks)
+
+    # Without roots header keeps the placeholder
+    file = io.BytesIO()
+    car = CarWriter.create(file, roots=[])
+    link, blocks = write_file(car)
+    assert car.close() == len(file.getvalue())
+    check(file.getvalue(), [], blocks)
+
+
+def test_header() -> None:
+    header = CarWriter.encode_header([CarWriter.PLACEHOLDER_ROOT])
+    assert header == bytes.fromhex(
+        "3aa265726f6f747381d82a58250001701220"
+        + "00" * 32
+        + "6776657273696f6e01"
+    )
+
+
+def test_roots_of_different_size() -> None:
+    file = io.BytesIO()
+    car = CarWriter.create(file)
+    v0 = CarWriter.PLACEHOLDER_ROOT.set(version=0, base="base58btc")
+    with pytest.raises(ValueError):
+        car.close([v0])
+    with pytest.raises(ValueError):
+        car.close([CarWriter.PLACEHOLDER_ROOT, CarWriter.PLACEHOLDER_ROOT])
+    # Failed close leaves the writer open and the header intact
+    assert not car.closed
+    block = create_block(b"hello", 0x55, sha256)
+    car.write(block)
+    assert car.close([block.cid]) == len(file.getvalue())
+    check(file.getvalue(), [block.cid], [block])
+    with pytest.raises(ValueError):
+        car.write(block)
+
+
+def test_partial_writes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    writev = os.writev
+
+    def short_writev(fd: int, buffers: Sequence[bytes]) -> int:
+        # Write a bit less than asked, cutting through the buffers
+        size = sum(len(buffer) for buffer in buffers)
+        view = memoryview(b"".join(buffers))[: max(size * 2 // 3, 1)]
+        return writev(fd, [view])
+
+    monkeypatch.setattr(os, "writev", short_writev)
+    buffers = [bytes([n]) * (n * 37 % 500 + 1) for n in range(100)]
+    path = tmp_path / "data"
+    with open(path, "wb") as fd:
+        CarWriter.DescriptorSink(fd.fileno(), iov_max=7).writelines(buffers)
+    assert path.read_bytes() == b"".join(buffers)
+
+
+def write_shards(
+    shard_size: int, open_shard: Callable[[int], BinaryIO]
+) -> tuple[FileLink, list[Block], list[CarWriter.CarShard], list[int]]:
+    shards: list[CarWriter.CarShard] = []
+    # Number of blocks written when each shard was handed over
+    written: list[int] = []
+    blocks = FileWriter.BlockList()
+
+    def on_shard(shard: CarWriter.CarShard) -> None:
+        shards.append(shard)
+        written.append(len(blocks))
+
+    car = CarWriter.shard(open_shard, on_shard, shard_size, buffer_size=3000)
+
+    class Tee:
+        def write(self, block: Block, /) -> None:
+            car.write(block)
+            blocks.write(block)
+
+    file = FileWriter.create(Tee(), CONFIG)
+    file.write(CONTENT)
+    link = file.close()
+    assert car.close([link.cid]) == len(shards)
+    return link, blocks, shards, written
+
+
+def test_shards(tmp_path: Path) -> None:
+    link, blocks, shards, written = write_shards(
+        5000, CarWriter.files(str(tmp_path), "upload")
+    )
+    assert len(shards) == 7
+    # Each CAR is handed over before blocks of the next one are written
+    assert written == list(accumulate(len(shard.blocks) for shard in shards))
+
+    all_blocks = []
+    for index, shard in enumerate(shards):
+        assert shard.index == index
+        shard.file.close()
+        data = (tmp_path / f"upload-{index}.car").read_bytes()
+        assert len(data) == shard.byte_length <= 5000
+        roots, car_blocks = read_car(data)
+        assert [cid for cid, _ in car_blocks] == [cid for cid, _, _ in shard.blocks]
+        for (cid, offset, length), (_, content) in zip(shard.blocks, car_blocks):
+            assert data[offset : offset + length] == content
+        # Only the last CAR is rooted at the file root
+        root = link.cid if shard is shards[-1] else CarWriter.PLACEHOLDER_ROOT
+        assert roots == list(shard.roots) == [root]
+        all_blocks.extend(car_blocks)
+    assert shards[-1].roots == [link.cid]
+    assert all_blocks == [(block.cid, as_bytes(block)) for block in blocks]
+
+
+def test_shards_file_objects() -> None:
+    files: list[io.BytesIO] = []
+
+    def open_shard(index: int) -> BinaryIO:
+        files.append(io.BytesIO())
+        return files[-1]
+
+    link, blocks, shards, _ = write_shards(8000, open_shard)
+    assert [shard.file for shard in shards] == files
+    all_blocks = []
+    for shard in shards:
+        data = files[shard.index].getvalue()
+        assert len(data) == shard.byte_length <= 8000
+        all_blocks.extend(read_car(data)[1])
+    assert all_blocks == [(block.cid, as_bytes(block)) for block in blocks]
+
+
+def test_shard_limits() -> None:
+    shards: list[CarWriter.CarShard] = []
+    car = CarWriter.shard(lambda index: io.BytesIO(), shards.append, 150)
+    block = create_block(b"x" * 10, 0x55, sha256)
+    car.write(block)
+    with pytest.raises(ValueError):
+        car.write(create_block(b"x" * 150, 0x55, sha256))
+    # Block that does not fit does not finish the current CAR
+    assert shards == []
+    assert car.close([block.cid]) == 1
+    assert len(shards) == 1 and shards[0].roots == [block.cid]
+    with pytest.raises(ValueError):
+        car.write(block)
+
+    # Roots get a CAR even when there are no blocks
+    car = CarWriter.shard(lambda index: io.BytesIO(), shards.append, 150)
+    assert car.close([block.cid]) == 1
+    data = shards[-1].file
+    assert isinstance(data, io.BytesIO)
+    assert read_car(data.getvalue()) == ([block.cid], [])
+
+
+def test_shard_roots() -> None:
+    shards: list[CarWriter.CarShard] = []
+    car = CarWriter.shard(lambda index: io.BytesIO(), shards.append, 120)
+    v0 = create_block(b"v0", 0x70, sha256, 0)
+    block = create_block(b"hello", 0x55, sha256)
+    car.write(v0)
+    # CARs other than the last keep the placeholder root
+    car.write(block)
+    assert shards[0].roots == (CarWriter.PLACEHOLDER_ROOT,)
+    assert [cid for cid, _, _ in shards[0].blocks] == [v0.cid]
+
+    for roots in [[v0.cid], [block.cid, block.cid], []]:
+        with pytest.raises(ValueError):
+            car.close(roots)
+    # Failed close does not finish the last CAR
+    assert len(shards) == 1 and car.car is not None and not car.car.closed
+    assert car.close([block.cid]) == 2
+    assert shards[1].roots == [block.cid]
+    file = shards[1].file
+    assert isinstance(file, io.BytesIO)
+    assert read_car(file.getvalue())[0] == [block.cid]
@@ -0,0 +1,144 @@
+import pytest
+from multiformats import CID, multihash
+from ipld_unixfs import codec
+from ipld_unixfs.file.chunker.buffer import BufferView
+from ipld_unixfs.unixfs import (
+    AdvancedFile,
+    FileChunk,
+    FileLink,
+    FileShard,
+    Metadata,
+    MTime,
+    SimpleFile,
+)
+
+
+def cid_v0(data: bytes) -> str:
+    return str(CID("base58btc", 0, "dag-pb", multihash.digest(data, "sha2-256")))
+
+
+def raw_cid(data: bytes) -> CID:
+    return CID("base32", 1, "raw", multihash.digest(data, "sha2-256"))
+
+
+def test_empty_file() -> None:
+    block = codec.encode_simple_file(b"")
+    assert block == bytes.fromhex("0a0408021800")
+    assert cid_v0(block) == "QmbFMke1KXqnYyBBWxB74N4c5SBnJMVAiMNRcGu6x1AwQH"
+
+
+def test_simple_file() -> None:
+    block = codec.encode_simple_file(b"hello world\n")
+    assert cid_v0(block) == "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o"
+    block = codec.encode_simple_file(b"hello world")
+    assert cid_v0(block) == "Qmf412jQZiuVUtdgnB36FXFX7xg5V6KEbSJ4dpQuhkLyfD"
+
+
+def test_content_is_copied_from_buffer_view() -> None:
+    content = BufferView.create([b"hello ", b"world\n"])
+    assert codec.encode_simple_file(content) == codec.encode_simple_file(
+        b"hello world\n"
+    )
+    assert codec.encode_file_chunk(content) == codec.encode_simple_file(
+        b"hello world\n"
+    )
+
+
+def test_encode_file_dispatch() -> None:
+    link = FileLink(raw_cid(b"a"), 1, 1)
+    assert codec.encode_file(SimpleFile(b"a")) == codec.encode_simple_file(b"a")
+    assert codec.encode_file(FileChunk(b"a")) == codec.encode_file_chunk(b"a")
+    assert codec.encode_file(FileShard([link])) == codec.encode_file_shard([link])
+    assert codec.encode_file(AdvancedFile([link])) == codec.encode_advanced_file(
+        [link]
+    )
+    assert codec.encoder.encode(SimpleFile(b"a")) == codec.encode_simple_file(b"a")
+    assert codec.encoder.code == 0x70
+
+
+def test_advanced_file() -> None:
+    a = raw_cid(b"a" * 300)
+    b = raw_cid(b"b" * 20)
+    block = codec.encode_advanced_file([FileLink(a, 300, 300), FileLink(b, 20, 20)])
+
+    def link(cid: CID, tsize: bytes) -> bytes:
+        hash = bytes(cid)
+        body = b"\x0a" + bytes([len(hash)]) + hash + b"\x12\x00" + b"\x18" + tsize
+        return b"\x12" + bytes([len(body)]) + body
+
+    # Type: File, filesize: 320, blocksizes: [300, 20]
+    data = b"\x08\x02" + b"\x18\xc0\x02" + b"\x20\xac\x02" + b"\x20\x14"
+    assert block == (
+        link(a, b"\xac\x02") + link(b, b"\x14") + b"\x0a" + bytes([len(data)]) + data
+    )
+
+
+def test_many_links() -> None:
+    parts = [
+        FileLink(raw_cid(n.to_bytes(4, "big")), 262144 + 14, 262144)
+        for n in range(174)
+    ]
+    block = codec.encode_file_shard(parts)
+    # Every link takes 2 + (2 + 36) + 2 + (1 + 3) bytes
+    data_length = 2 + 5 + 174 * 4
+    assert len(block) == 174 * 46 + 1 + 2 + data_length
+    assert block.endswith(b"\x20\x80\x80\x10")
+
+
+def test_mode() -> None:
+    # Default mode is omitted
+    assert codec.encode_simple_file(b"", Metadata(mode=0o644)) == bytes.fromhex(
+        "0a0408021800"
+    )
+    assert codec.encode_simple_file(b"", Metadata(mode=0o755)) == bytes.fromhex(
+        "0a070802180038ed03"
+    )
+    # Bits without defined meaning are preserved
+    assert codec.encode_simple_file(
+        b"", Metadata(mode=0xFFFFF000 | 0o644)
+    ) == bytes.fromhex("0a0a0802180038a4e3ffff0f")
+
+
+def test_mtime() -> None:
+    assert codec.encode_simple_file(
+        b"", Metadata(mtime=MTime(10))
+    ) == bytes.fromhex("0a08080218004202080a")
+    assert codec.encode_simple_file(
+        b"", Metadata(mtime=MTime(10, 0))
+    ) == bytes.fromhex("0a08080218004202080a")
+    assert codec.encode_simple_file(
+        b"", Metadata(mtime=MTime(10, 5))
+    ) == bytes.fromhex("0a0d080218004207080a1505000000")
+    # Negative seconds are encoded as 64 bit two's complement
+    assert codec.encode_simple_file(
+        b"", Metadata(mtime=MTime(-1))
+    ) == bytes.fromhex("0a1108021800420b08ffffffffffffffffff01")
+
+
+def test_mtime_nanoseconds_range() -> None:
+    for nsecs in [-1, 1_000_000_000, 1 << 32]:
+        with pytest.raises(ValueError):
+            codec.encode_simple_file(b"", Metadata(mtime=MTime(10, nsecs)))
+    assert codec.encode_simple_file(
+        b"", Metadata(mtime=MTime(10, 999_999_999))
+    ) == bytes.fromhex("0a0d080218004207080a15ffc99a3b")
+
+
+def test_bytes_like_content() -> None:
+    expect = codec.encode_simple_file(b"hello")
+    assert codec.encode_simple_file(bytearray(b"hello")) == expect
+    assert codec.encode_simple_file(memoryview(b"hello")) == expect
+    assert codec.encode_file_chunk(memoryview(b"hello")) == codec.encode_file_chunk(
+        b"hello"
+    )
+
+
+def test_varint() -> None:
+    for value in [0, 1, 127, 128, 300, 16383, 16384, 2**32, 2**63 - 1]:
+        buffer = bytearray(codec.varint_size(value))
+        assert codec.write_varint(buffer, 0, value) == len(buffer)
+        decoded = 0
+        for n, byte in enumerate(buffer):
+            decoded |= (byte & 0x7F) << (7 * n)
+        assert decoded == value
+        assert buffer[-1] < 0x80
@@ -0,0 +1,137 @@
+from random import Random
+import pytest
+from multiformats import CID, multihash
+from ipld_unixfs import codec
+from ipld_unixfs import directory as DirectoryWriter
+from ipld_unixfs.file import writer as FileWriter
+from ipld_unixfs.unixfs import (
+    DAGLink,
+    DirectoryEntryLink,
+    FileLink,
+    FlatDirectory,
+    Metadata,
+    MTime,
+)
+from test.file.test_writer import read_fields
+
+
+def raw_link(data: bytes) -> FileLink:
+    cid = CID("base32", 1, "raw", multihash.digest(data, "sha2-256"))
+    return FileLink(cid, len(data), len(data))
+
+
+def read_links(data: bytes) -> list[tuple[CID, bytes, int]]:
+    links = []
+    for field, value in read_fields(data):
+        if field == 2:
+            link = dict(read_fields(value))
+            links.append((CID.decode(link[1]), link[2], link[3]))
+    return links
+
+
+def test_empty_directory() -> None:
+    blocks = FileWriter.BlockList()
+    link = DirectoryWriter.create(blocks).close()
+    assert blocks[0].bytes == bytes.fromhex("0a020801")
+    assert link.cid.set(version=0, base="base58btc") == CID.decode(
+        "QmUNLLsPACCz1vLxQVkXqqLX5R1X345qqfHbsf67hvA3Nn"
+    )
+    assert link.dagByteLength == 4
+
+
+def test_entries_are_sorted() -> None:
+    names = ["b", "a", "B", "ä", "ab", "a b", "😀", "z"]
+    blocks = FileWriter.BlockList()
+    directory = DirectoryWriter.create(blocks)
+    for name in names:
+        directory.set(name, raw_link(name.encode()))
+    link = directory.close()
+
+    expect = sorted(names, key=lambda name: name.encode())
+    assert [entry.name for entry in directory] == expect
+    links = read_links(bytes(blocks[0].bytes))
+    assert [name for _, name, _ in links] == [name.encode() for name in expect]
+    cids = [raw_link(name.encode()).cid for name in expect]
+    assert [cid for cid, _, _ in links] == cids
+    assert link.dagByteLength == blocks[0].byte_length + sum(
+        len(name.encode()) for name in names
+    )
+
+
+def test_set_remove() -> None:
+    blocks = FileWriter.BlockList()
+    directory = DirectoryWriter.create(blocks)
+    directory.set("a", raw_link(b"a"))
+    directory.set("b", raw_link(b"bb"))
+    with pytest.raises(ValueError):
+        directory.set("a", raw_link(b"aaa"))
+    directory.set("a", raw_link(b"aaa"), overwrite=True)
+    assert [entry.name for entry in directory] == ["a", "b"]
+    directory.remove("b")
+    directory.remove("missing")
+    directory.set("c", raw_link(b"c"))
+    directory.remove("a")
+    directory.set("a", raw_link(b"a"))
+    assert len(directory) == 2
+    link = directory.close()
+
+    expect = FlatDirectory(
+        [
+            DirectoryEntryLink(raw_link(b"a").cid, 1, "a"),
+            DirectoryEntryLink(raw_link(b"c").cid, 1, "c"),
+        ]
+    )
+    assert blocks[0].bytes == codec.encode_directory(expect)
+    assert link.dagByteLength == blocks[0].byte_length + 2
+    assert directory.close() == link
+    with pytest.raises(ValueError):
+        directory.set("d", raw_link(b"d"))
+    with pytest.raises(ValueError):
+        directory.remove("a")
+
+
+def test_matches_sorted_model() -> None:
+    random = Random(7)
+    directory = DirectoryWriter.create(FileWriter.BlockList())
+    model: dict[str, DAGLink] = {}
+    for n in range(2000):
+        name = str(random.randrange(500))
+        if random.random() < 0.3:
+            directory.remove(name)
+            model.pop(name, None)
+        else:
+            link = raw_link(str(n).encode())
+            directory.set(name, link, overwrite=True)
+            model[name] = link
+        if random.random() < 0.05:
+            assert [entry.name for entry in directory] == sorted(model)
+
+    assert [(entry.name, entry.cid) for entry in directory] == [
+        (name, model[name].cid) for name in sorted(model)
+    ]
+    assert directory.dag_byte_length == sum(
+        link.dagByteLength for link in model.values()
+    )
+
+
+def test_metadata() -> None:
+    blocks = FileWriter.BlockList()
+    DirectoryWriter.create(blocks, Metadata(mode=0o755)).close()
+    assert blocks[0].bytes == bytes.fromhex("0a020801")
+
+    blocks = FileWriter.BlockList()
+    DirectoryWriter.create(blocks, Metadata(mode=0o700, mtime=MTime(5))).close()
+    # Type: Directory, mode: 0o700, mtime: 5
+    assert blocks[0].bytes == bytes.fromhex("0a09080138c00342020805")
+
+
+def test_nested_directories() -> None:
+    blocks = FileWriter.BlockList()
+    file = FileWriter.create(blocks)
+    file.write(b"hello world\n")
+    inner = DirectoryWriter.create(blocks)
+    inner.set("hello.txt", file.close())
+    outer = DirectoryWriter.create(blocks)
+    outer.set("docs", inner.close())
+    link = outer.close()
+    assert link.dagByteLength == sum(block.byte_length for block in blocks)
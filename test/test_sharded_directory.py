@@ -0,0 +1,236 @@
+from pathlib import Path
+from random import Random
+from typing import Optional
+import pytest
+from multiformats import CID, multihash
+from ipld_unixfs import codec
+from ipld_unixfs import directory as DirectoryWriter
+from ipld_unixfs import sharded_directory as ShardedDirectory
+from ipld_unixfs.file import writer as FileWriter
+from ipld_unixfs.multiformats import block as Block
+from ipld_unixfs.multiformats.hasher import sha256
+from ipld_unixfs.unixfs import DAGLink, DirectoryEntryLink, DirectoryShard, Metadata
+from test.conftest import Kubo
+from test.file.test_writer import read_fields
+
+
+def raw_link(data: bytes) -> DAGLink:
+    return DAGLink(CID("base32", 1, "raw", multihash.digest(data, "sha2-256")), 1)
+
+
+def build(
+    entries: dict[str, DAGLink],
+    fanout: int,
+    blocks: FileWriter.BlockList,
+    depth: int = 0,
+    metadata: Optional[Metadata] = None,
+) -> DAGLink:
+    """
+    Builds HAMT from scratch by splitting entries into buckets, recursing into
+    the ones with more than one entry.
+    """
+    bits = fanout.bit_length() - 1
+    width = len(f"{fanout - 1:X}")
+    buckets: dict[int, dict[str, DAGLink]] = {}
+    for name, link in entries.items():
+        hash = ShardedDirectory.hash_name(name)
+        index = (hash >> (64 - (depth + 1) * bits)) % fanout
+        buckets.setdefault(index, {})[name] = link
+
+    links = []
+    bitfield = 0
+    for index, bucket in sorted(buckets.items()):
+        bitfield |= 1 << index
+        prefix = f"{index:0{width}X}"
+        if len(bucket) == 1:
+            ((name, link),) = bucket.items()
+            name = prefix + name
+            links.append(DirectoryEntryLink(link.cid, link.dagByteLength, name))
+        else:
+            link = build(bucket, fanout, blocks, depth + 1)
+            links.append(DirectoryEntryLink(link.cid, link.dagByteLength, prefix))
+
+    size = (bitfield.bit_length() + 7) // 8
+    node = DirectoryShard(links, bitfield.to_bytes(size, "big"), fanout, 0x22, metadata)
+    block = Block.create(codec.encode_directory(node), codec.code)
+    blocks.write(block)
+    return DAGLink(
+        block.cid, block.byte_length + sum(link.dagByteLength for link in links)
+    )
+
+
+def test_hash() -> None:
+    # Sum64 test vector of github.com/spaolacci/murmur3 used by go-unixfs
+    assert ShardedDirectory.hash_name("hello") == 0xCBD8A7B341BD9B02
+
+
+def test_options() -> None:
+    assert ShardedDirectory.Options(256).prefixes[10] == "0A"
+    assert ShardedDirectory.Options(256).bits == 8
+    assert ShardedDirectory.Options(16).prefixes[10] == "A"
+    assert ShardedDirectory.Options(1024).prefixes[255] == "0FF"
+    for fanout in [0, 4, 100]:
+        with pytest.raises(ValueError):
+            ShardedDirectory.Options(fanout)
+
+
+def test_shard_node() -> None:
+    blocks = FileWriter.BlockList()
+    directory = DirectoryWriter.create(blocks, shard_threshold=0)
+    directory.set("hello", raw_link(b"hello"))
+    link = directory.close()
+
+    assert len(blocks) == 1
+    fields = list(read_fields(bytes(blocks[0].bytes)))
+    assert [field for field, _ in fields] == [2, 1]
+    entry = dict(read_fields(fields[0][1]))
+    # Top 8 bits of the hash pick the slot 0xCB
+    assert entry[2] == b"CBhello"
+    # Type: HAMTShard, Data: bitfield, hashType: murmur3-x64-64, fanout: 256
+    bitfield = (1 << 0xCB).to_bytes(26, "big")
+    assert fields[1][1] == b"\x08\x05\x12\x1a" + bitfield + b"\x28\x22\x30\x80\x02"
+    assert link.dagByteLength == blocks[0].byte_length + 1
+
+
+@pytest.mark.parametrize("fanout", [8, 16, 256])
+def test_matches_model(fanout: int) -> None:
+    random = Random(fanout)
+    blocks = FileWriter.BlockList()
+    directory = DirectoryWriter.create(blocks, shard_threshold=0, fanout=fanout)
+    model: dict[str, DAGLink] = {}
+    for n in range(600):
+        name = f"file-{random.randrange(300)}"
+        if random.random() < 0.3:
+            directory.remove(name)
+            model.pop(name, None)
+        else:
+            link = raw_link(str(n).encode())
+            directory.set(name, link, overwrite=True)
+            model[name] = link
+
+    shard = directory.shard
+    assert shard is not None
+    assert {entry.link.name for entry in shard} == set(model)
+    for name in model:
+        entry = shard.get(name, ShardedDirectory.hash_name(name))
+        assert entry is not None and entry.link.cid == model[name].cid
+    assert shard.get("missing", ShardedDirectory.hash_name("missing")) is None
+
+    link = directory.close()
+    expect_blocks = FileWriter.BlockList()
+    assert link == build(model, fanout, expect_blocks)
+    assert [block.cid for block in blocks] == [block.cid for block in expect_blocks]
+
+
+def test_removal_collapses_shards() -> None:
+    random = Random(1)
+    names = [f"{n}" for n in range(200)]
+    shard = ShardedDirectory.create(8)
+    for name in names:
+        entry = DirectoryEntryLink(raw_link(name.encode()).cid, 1, name)
+        shard.set(ShardedDirectory.Entry(ShardedDirectory.hash_name(name), entry))
+    random.shuffle(names)
+    for name in names[:-1]:
+        assert shard.remove(name, ShardedDirectory.hash_name(name)) is not None
+        assert shard.remove(name, ShardedDirectory.hash_name(name)) is None
+    # Root is left with a single entry
+    ((slot, entry),) = shard.slots.items()
+    assert isinstance(entry, ShardedDirectory.Entry)
+    assert entry.link.name == names[-1]
+
+
+def test_only_changed_shards_are_encoded() -> None:
+    blocks = FileWriter.BlockList()
+    shard = ShardedDirectory.create(16)
+    for n in range(1000):
+        name = f"{n}"
+        entry = DirectoryEntryLink(raw_link(name.encode()).cid, 1, name)
+        shard.set(ShardedDirectory.Entry(ShardedDirectory.hash_name(name), entry))
+    first = shard.encode(blocks, sha256)
+    assert shard.encode(blocks, sha256) == first
+    count = len(blocks)
+
+    name = "1"
+    shard.remove(name, ShardedDirectory.hash_name(name))
+    second = shard.encode(blocks, sha256)
+    assert second != first
+    # Only the shards on the path to the entry are written again
+    path = 0
+    node = shard
+    hash = ShardedDirectory.hash_name(name)
+    while True:
+        path += 1
+        child = node.slots.get(node.index(hash))
+        if not isinstance(child, ShardedDirectory.Shard):
+            break
+        node = child
+    assert len(blocks) - count == path
+
+
+def test_sharding_threshold() -> None:
+    links = {f"{n:04}": raw_link(f"{n}".encode()) for n in range(100)}
+    # Every entry is estimated at 4 bytes of name and 36 bytes of CID
+    threshold = 40 * 50
+    blocks = FileWriter.BlockList()
+    directory = DirectoryWriter.create(blocks, shard_threshold=threshold)
+    for n, (name, link) in enumerate(links.items()):
+        directory.set(name, link)
+        assert directory.estimated_size == 40 * (n + 1)
+        assert (directory.shard is not None) == (n + 1 >= 50)
+
+    directory.remove("0000")
+    assert directory.shard is not None
+    assert directory.close() == build(
+        {name: link for name, link in links.items() if name != "0000"},
+        256,
+        FileWriter.BlockList(),
+    )
+
+    # Back under the threshold directory is flat again
+    flat = DirectoryWriter.create(FileWriter.BlockList(), shard_threshold=threshold)
+    for name, link in list(links.items())[:50]:
+        flat.set(name, link)
+    assert flat.shard is not None
+    flat.remove("0000")
+    assert flat.shard is None
+    assert flat.close().cid.codec.name == "dag-pb"
+    unsharded = DirectoryWriter.create(FileWriter.BlockList(), shard_threshold=None)
+    for name, link in list(links.items())[1:50]:
+        unsharded.set(name, link)
+    assert flat.link == unsharded.close()
+
+
+def test_root_metadata() -> None:
+    blocks = FileWriter.BlockList()
+    metadata = Metadata(mode=0o700)
+    directory = DirectoryWriter.create(blocks, metadata, shard_threshold=0, fanout=8)
+    entries = {f"{n}": raw_link(f"{n}".encode()) for n in range(20)}
+    for name, link in entries.items():
+        directory.set(name, link)
+    expect = FileWriter.BlockList()
+    assert directory.close() == build(entries, 8, expect, metadata=metadata)
+    assert blocks[-1].bytes == expect[-1].bytes
+    # Subshards have no metadata
+    assert all(bytes(block.bytes).endswith(b"\x30\x08") for block in blocks[:-1])
+
+
+def test_kubo(kubo: Kubo, tmp_path: Path) -> None:
+    root = tmp_path / "directory"
+    root.mkdir()
+    blocks = FileWriter.BlockList()
+    directory = DirectoryWriter.create(blocks)
+    for n in range(8000):
+        name = f"file-{n:05}"
+        content = f"{n}\n".encode()
+        (root / name).write_bytes(content)
+        block = Block.create(content, 0x55, sha256)
+        directory.set(name, DAGLink(block.cid, len(content)))
+
+    # Directory is sharded and some names share a slot of the root shard
+    assert directory.shard is not None
+    assert any(
+        isinstance(child, ShardedDirectory.Shard)
+        for child in directory.shard.slots.values()
+    )
+    link = directory.close()
+    assert link.cid == kubo.add(root, "--cid-version=1")
@@ -0,0 +1,175 @@
+from random import Random
+from typing import Optional
+import pytest
+from multiformats import CID, multihash
+from ipld_unixfs import directory as DirectoryWriter
+from ipld_unixfs import sharded_directory as ShardedDirectory
+from ipld_unixfs import tree as DirectoryTree
+from ipld_unixfs.file import writer as FileWriter
+from ipld_unixfs.unixfs import DAGLink, Metadata
+
+Files = dict[str, DAGLink]
+
+
+def raw_link(data: bytes) -> DAGLink:
+    cid = CID("base32", 1, "raw", multihash.digest(data, "sha2-256"))
+    return DAGLink(cid, len(data))
+
+
+def build(
+    files: Files, shard_threshold: Optional[int] = None, fanout: int = 256
+) -> DAGLink:
+    """
+    Builds the tree from scratch, writing every directory bottom up.
+    """
+    entries: dict[str, DAGLink] = {}
+    directories: dict[str, Files] = {}
+    for path, link in files.items():
+        name, _, rest = path.partition("/")
+        if rest:
+            directories.setdefault(name, {})[rest] = link
+        else:
+            entries[name] = link
+    for name, children in directories.items():
+        entries[name] = build(children, shard_threshold, fanout)
+
+    directory = DirectoryWriter.create(
+        FileWriter.BlockList(), shard_threshold=shard_threshold, fanout=fanout
+    )
+    for name, link in entries.items():
+        directory.set(name, link)
+    return directory.close()
+
+
+def generate(random: Random, count: int) -> Files:
+    files = {}
+    for n in range(count):
+        depth = random.randrange(1, 4)
+        path = "/".join(f"d{random.randrange(4)}" for _ in range(depth))
+        files[f"{path}/f{n}"] = raw_link(str(n).encode())
+    return files
+
+
+def test_matches_fresh_build() -> None:
+    random = Random(3)
+    files = generate(random, 300)
+    tree = DirectoryTree.create(FileWriter.BlockList(), shard_threshold=None)
+    for path, link in files.items():
+        tree.set(path, link)
+    assert tree.flush() == build(files)
+
+    for n in range(50):
+        path = random.choice(list(files))
+        directory = path.rpartition("/")[0]
+        siblings = [other for other in files if other.startswith(directory + "/")]
+        # Model has no empty directories, so only files with siblings are removed
+        if random.random() < 0.5 and len(siblings) > 1:
+            tree.remove(path)
+            del files[path]
+        else:
+            files[path] = raw_link(f"{path}-{n}".encode())
+            tree.set(path, files[path])
+        if random.random() < 0.2:
+            assert tree.flush() == build(files)
+    assert tree.flush() == build(files)
+
+
+def test_only_changed_path_is_written() -> None:
+    blocks = FileWriter.BlockList()
+    tree = DirectoryTree.create(blocks)
+    files = generate(Random(5), 200)
+    for path, link in files.items():
+        tree.set(path, link)
+    tree.flush()
+
+    count = len(blocks)
+    assert tree.flush() == tree.flush()
+    assert len(blocks) == count
+
+    path = max(files, key=lambda path: path.count("/"))
+    tree.set(path, raw_link(b"updated"))
+    files[path] = raw_link(b"updated")
+    assert tree.flush() == build(files, DirectoryWriter.DEFAULT_SHARD_THRESHOLD)
+    # Parent directories of the file and the root
+    assert len(blocks) - count == path.count("/") + 1
+
+
+def test_sharded_directory_update() -> None:
+    blocks = FileWriter.BlockList()
+    tree = DirectoryTree.create(blocks, shard_threshold=1000, fanout=8)
+    files = {f"big/file-{n}": raw_link(str(n).encode()) for n in range(500)}
+    files["other/file"] = raw_link(b"other")
+    for path, link in files.items():
+        tree.set(path, link)
+    tree.flush()
+
+    count = len(blocks)
+    tree.set("big/file-7", raw_link(b"updated"))
+    files["big/file-7"] = raw_link(b"updated")
+    assert tree.flush() == build(files, 1000, 8)
+    # Shards on the path to the entry and the root directory
+    path = 0
+    shard = tree.root.directories["big"].writer.shard
+    hash = ShardedDirectory.hash_name("file-7")
+    while isinstance(shard, ShardedDirectory.Shard):
+        path += 1
+        shard = shard.slots.get(shard.index(hash))
+    assert path > 1
+    assert len(blocks) - count == path + 1
+
+
+def test_directories() -> None:
+    blocks = FileWriter.BlockList()
+    tree = DirectoryTree.create(blocks)
+    tree.mkdir("a/b/c", Metadata(mode=0o700))
+    tree.set("a/file", raw_link(b"file"))
+    expect = DirectoryWriter.create(FileWriter.BlockList(), Metadata(mode=0o700))
+    c = expect.close()
+    b = DirectoryWriter.create(FileWriter.BlockList())
+    b.set("c", c)
+    a = DirectoryWriter.create(FileWriter.BlockList())
+    a.set("b", b.close())
+    a.set("file", raw_link(b"file"))
+    root = DirectoryWriter.create(FileWriter.BlockList())
+    root.set("a", a.close())
+    assert tree.flush() == root.close()
+    entry = tree.get("a/b/c")
+    assert entry is not None and entry.cid == c.cid
+    assert tree.get("a/missing/c") is None
+
+    # Directory is replaced by the file
+    tree.set("a/b", raw_link(b"b"))
+    assert tree.flush() == build({"a/b": raw_link(b"b"), "a/file": raw_link(b"file")})
+    with pytest.raises(ValueError):
+        tree.set("a/b/c", raw_link(b"c"))
+    with pytest.raises(ValueError):
+        tree.mkdir("a/b")
+
+    tree.remove("a/missing/file")
+    tree.remove("a/b")
+    tree.remove("a/b")
+    assert tree.flush() == build({"a/file": raw_link(b"file")})
+    tree.remove("a")
+    assert tree.flush() == build({})
+
+
+def test_mkdir_in_flushed_directory() -> None:
+    tree = DirectoryTree.create(FileWriter.BlockList())
+    tree.mkdir("a")
+    tree.flush()
+    tree.mkdir("a/b")
+    b = DirectoryWriter.create(FileWriter.BlockList())
+    a = DirectoryWriter.create(FileWriter.BlockList())
+    a.set("b", b.close())
+    root = DirectoryWriter.create(FileWriter.BlockList())
+    root.set("a", a.close())
+    assert tree.flush() == root.close()
+
+
+def test_invalid_paths() -> None:
+    tree = DirectoryTree.create(FileWriter.BlockList())
+    for path in ["", "/", "a//b", "a/./b", "../a"]:
+        with pytest.raises(ValueError):
+            tree.set(path, raw_link(b""))
+    tree.set("/a/b/", raw_link(b"b"))
+    assert tree.get("a/b") is not None